@@ -5,8 +5,6 @@
 from dataclasses import dataclass
 from enum import IntEnum, auto
 
-from tap import Tap
-
 
 class ZeroIndexedEnum(IntEnum):
     """zero-indexed int enum."""
@@ -61,6 +59,10 @@ class INSTRUCTIONS(ZeroIndexedEnum):
     CALL = auto()
     RET  = auto()
     BCP = auto()
+    INT  = auto()
+    IRET = auto()
+    CLI  = auto()
+    STI  = auto()
 
 
 class REGISTERS(ZeroIndexedEnum):
@@ -150,6 +152,12 @@ INSTRUCTION_MODES: dict[INSTRUCTIONS, list[tuple[MODES, ...]]] = {
     INSTRUCTIONS.NOP:  [ () ],
 
     INSTRUCTIONS.BCP: [ (MODES.REG, MODES.REG, MODES.IMM) ],
+
+    # interrupts. appended last so existing opcodes keep their numbers.
+    INSTRUCTIONS.INT:  [ (MODES.REG, ), (MODES.IMM, ) ],
+    INSTRUCTIONS.IRET: [ () ],
+    INSTRUCTIONS.CLI:  [ () ],
+    INSTRUCTIONS.STI:  [ () ],
 }
 
 
@@ -277,6 +285,12 @@ _FORMAT_DATA: dict[tuple[INSTRUCTIONS, tuple[MODES, ...]], tuple[int | None, int
     (INSTRUCTIONS.SWP, (MODES.REG, MODES.REG)):           (0,    1,    None),
 
     (INSTRUCTIONS.BCP, (MODES.REG, MODES.REG, MODES.IMM)): (1, 0, 2),
+
+    (INSTRUCTIONS.INT, (MODES.REG,)):                      (0,    None, None),
+    (INSTRUCTIONS.INT, (MODES.IMM,)):                      (None, None, 0   ),
+    (INSTRUCTIONS.IRET, ()):                               (None, None, None),
+    (INSTRUCTIONS.CLI,  ()):                               (None, None, None),
+    (INSTRUCTIONS.STI,  ()):                               (None, None, None),
 }
 
 
@@ -310,88 +324,3 @@ def generate_opcode_string(opcode: int) -> str | None:
 
     operand_str = ", ".join(mode_string[m] for m in fmt.modes)
     return f"{fmt.mnemonic.name} {operand_str}".strip()
-
-
-def generate_opcode_encoding_string(opcode: int) -> str:
-    """ 
-    Generate a string representation of the instruction encoding for the given opcode.
-
-    String representation format is:
-
-    mnemonic [operand] [operand] oooooooo ssss dddd xxxxxxxx xxxxxxxx 
-    """
-
-    mode_syntax_string_map: dict[MODES, str] = {
-        MODES.REG:         "a",
-        MODES.IMM:         "0xff",
-        MODES.RELATIVE:    "label",
-        MODES.REG_POINTER: "[a]",
-        MODES.OFF_POINTER: "[label + a]",
-        MODES.REL_POINTER: "[label]",
-    }
-
-    mode_name_map: dict[MODES, str] = {
-        MODES.REG:         "reg",
-        MODES.IMM:         "imm",
-        MODES.RELATIVE:    "imm",
-        MODES.REG_POINTER: "[reg]",
-        MODES.OFF_POINTER: "[imm + reg]",
-        MODES.REL_POINTER: "[imm]",
-    }
-
-    fmt = OPCODE_FORMATS.get(opcode)
-    if not fmt:
-        return f"no opcode found for {opcode:#04x}"
-
-    mnemonic: str = fmt.mnemonic.name.lower()
-    operand_1_mode = mode_name_map[fmt.modes[0]] if len(fmt.modes) > 0 else ""
-    operand_2_mode = mode_name_map[fmt.modes[1]] if len(fmt.modes) > 1 else ""
-
-    operand_1_syntax: str = mode_syntax_string_map[fmt.modes[0]] if len(fmt.modes) > 0 else ""
-    operand_2_syntax: str = mode_syntax_string_map[fmt.modes[1]] if len(fmt.modes) > 1 else ""
-    full_syntax: str = f"{mnemonic} {operand_1_syntax}{', ' if operand_1_syntax and operand_2_syntax else ''}{operand_2_syntax}"
-
-    # this is checking "is the source register used?"
-    opcode_binary: str = "oooooooo"
-    source_reg_binary: str = "ssss" if fmt.src_operand is not None else "----"
-    dest_reg_binary: str = "dddd" if fmt.dest_operand is not None else "----"
-    immediate_binary: str = "xxxxxxxxxxxxxxxx" if fmt.imm_operand is not None else ""
-
-    return (
-        f"{full_syntax:<14}   "
-        + f"{operand_1_mode:<7}{operand_2_mode:<7}   "
-        + f"{opcode_binary} {source_reg_binary} {dest_reg_binary} {immediate_binary}"
-    )
-
-
-class InstructionArguments(Tap):
-    """argparser for generating spec docs"""
-
-    opcode_map: bool = False
-    full_spec: bool = False
-
-
-if __name__ == "__main__":
-
-    args = InstructionArguments(underscores_to_dashes=True).parse_args()
-
-    if args.full_spec:
-        print("JASM SPECIFICATION\nVERSION 0.5\n")
-        print("instruction      src    dest      word 1            word 2")
-        print("-------------    -----  -----     ----------------- -----------------\n")
-
-
-    for mnemonic in INSTRUCTIONS:
-        for (instr, modes), opcode in OPCODE_MAP.items():
-
-            if instr == mnemonic and args.opcode_map:
-                print(f"{opcode:#04x}\t{generate_opcode_string(opcode)}")
-
-            if instr == mnemonic and args.full_spec:
-                print(f"{generate_opcode_encoding_string(opcode)}")
-
-        print()
-    print(f"generated data for {len(INSTRUCTIONS)} instructions.")
-
-    if not args.opcode_map and not args.full_spec:
-        print("no arguments provided.")
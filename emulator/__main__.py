@@ -6,9 +6,15 @@ import os
 
 from tap import Tap
 
+from .coverage import Coverage
 from .emulator import Emulator
+from .exceptions import EmulatorException
+from .hostprof import HostProfiler
+from .profiler import Profiler
 from .repl import run_interactive
+from .trace import TraceWriter
 from .util.logger import logger
+from .util.symbols import SymbolTable
 
 
 class EmulatorArgumentParser(Tap):
@@ -16,6 +22,10 @@ class EmulatorArgumentParser(Tap):
     run: bool = False  # run the binary file immediately
     verbosity: int = logger.log_level.INFO  # verbosity level (0-3)
 
+    # speed
+    clock_hz: int = 0  # target guest clock speed in hz (0 = unlimited)
+    unlimited: bool = False  # turbo mode, ignore --clock-hz and run as fast as possible
+
     # devices
     pit: bool = False
     rtc: bool = False
@@ -23,6 +33,25 @@ class EmulatorArgumentParser(Tap):
     disk: bool = False
     image: str = ""
 
+    # debugging and profiling
+    symbols: str = ""  # symbol table from jasm --symbols, for names in the debugger and profiler
+    profile: int = 0  # profile the guest, sampling the pc every n instructions (0 = off)
+    host_profile: str = ""  # profile the emulator's run loop with cProfile, and write pstats here on exit
+    trace: str = ""  # stream a binary execution trace to this file (see python -m emulator.trace)
+    trace_compress: bool = False  # zlib-compress the trace, on a background thread
+    coverage: str = ""  # record which guest code runs, and write lcov line coverage here on exit (needs --symbols)
+
+    # record/replay
+    record: str = ""  # log keyboard and rtc input to this file
+    replay: str = ""  # replay input logged with --record, headless and unpaced
+
+    # boot snapshots
+    boot_snapshot: str = ""  # snapshot the boot when it reaches this label or pc, and restore it on later runs
+    boot_cache: str = ""  # where boot snapshots are kept (default: ~/.cache/jaide/boot)
+
+    # run the cpu in its own process, sharing memory and vram with this one (the repl and window)
+    cpu_process: bool = False
+
     def configure(self):
         # configure short flags
         self.add_argument("binary", nargs="?")
@@ -46,9 +75,9 @@ def check_files(file: str) -> None:
         logger.warning("file does not have a valid binary extension. are you sure you want to continue?", scope, choice=True)
 
 
-def main():
-    """main entry point for the emulator."""
-    args = EmulatorArgumentParser().parse_args()
+def create_emulator(args: EmulatorArgumentParser, storage: memoryview | None = None) -> Emulator:
+    """Build the emulator the arguments describe, with the binary loaded (already checked by main())."""
+    scope = "__main__.py:create_emulator()"
 
     devices: dict[str, bool] = {
         "pit": args.pit,
@@ -57,22 +86,69 @@ def main():
         "disk": args.disk,
     }
 
-    emulator = Emulator(verbosity=args.verbosity, enabled_devices=devices, image_file=args.image)
+    clock_hz = 0 if args.unlimited else args.clock_hz
+    emulator = Emulator(verbosity=args.verbosity, enabled_devices=devices, image_file=args.image, clock_hz=clock_hz, record=args.record, replay=args.replay, storage=storage)
+
+    if args.symbols:
+        try:
+            emulator.symbols = SymbolTable.load(args.symbols)
+        except EmulatorException as e:
+            logger.fatal(e.message, scope)
+    if args.profile:
+        emulator.profiler = Profiler(emulator, args.profile)
+    if args.host_profile:
+        emulator.host_profiler = HostProfiler(args.host_profile)
+    if args.trace:
+        emulator.tracer = TraceWriter(emulator, args.trace, args.trace_compress)
+    if args.coverage:
+        emulator.coverage = Coverage(emulator, args.coverage)
 
     # load binary file if provided
     if args.binary:
-        check_files(args.binary)
         emulator.load_binary(args.binary)
     else:
-        logger.warning("no binary file provided, you will need to load one manually.", "__main__.py:main()")
+        logger.warning("no binary file provided, you will need to load one manually.", scope)
+
+    if args.boot_snapshot and args.binary:
+        from . import bootcache  # hashing and zlib are only needed for this
+        try:
+            enabled = [name for name, on in devices.items() if on]
+            bootcache.start(emulator, args.binary, args.image if args.disk else "", enabled, args.boot_snapshot, args.boot_cache)
+        except (EmulatorException, OSError) as e:
+            logger.fatal(str(e), scope)
+    return emulator
+
+
+def main():
+    """main entry point for the emulator."""
+    args = EmulatorArgumentParser(underscores_to_dashes=True).parse_args()
+
+    if args.record and args.replay:
+        logger.fatal("--record and --replay can't be used together.", "__main__.py:main()")
+    if args.boot_snapshot and (args.record or args.replay):
+        # a recording starts from reset, and would go out of step with a restored boot
+        logger.fatal("--boot-snapshot can't be combined with --record or --replay.", "__main__.py:main()")
+    if args.coverage and not args.symbols:
+        # coverage is reported per source line, which only the symbol table knows
+        logger.fatal("--coverage needs the binary's symbol table, see --symbols.", "__main__.py:main()")
+    if args.binary:
+        check_files(args.binary)
+
+    if args.cpu_process:
+        # imported here, multiprocessing is only needed for this
+        from .remote import run_remote
+        run_remote(args)
+        return
+
+    emulator = create_emulator(args)
 
     if args.run:
         logger.info("starting execution...")
-        emulator.run()  # auto-run
 
     try:
-        # read terminal input off-thread while the main thread services graphics
-        run_interactive(emulator)
+        # read terminal input off-thread while the main thread services graphics,
+        # with the guest on a worker thread (already running, for auto-run)
+        run_interactive(emulator, running=args.run)
 
     except KeyboardInterrupt:
         # the user has pressed ctrl+c inside the repl,
@@ -81,6 +157,9 @@ def main():
         logger.info("")
         emulator.shutdown()
 
+    finally:
+        emulator.close()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,283 @@
+# bench.py
+# throughput benchmarks for the emulator, with json results and baseline comparison.
+# josiah bergen, october 2026
+
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from dataclasses import asdict, dataclass
+from time import perf_counter
+
+from tap import Tap
+
+from jasm.jasm import assemble, assemble_string
+from jasm.util.logger import logger as jasm_logger
+
+from .devices.keyboard import Keyboard
+from .emulator import Emulator
+from .exceptions import EmulatorException
+from .util.logger import logger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KERNEL = os.path.join(ROOT, "kernel", "boot.jasm")
+DISK_IMAGE = os.path.join(ROOT, "jfs", "images", "disk.img")
+KEYBOARD_STATUS = 0xFE02  # the shell polls this once it's waiting at the prompt
+SLICE = 10_000
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    description: str
+    source: str = ""  # jasm, assembled with assemble_string and loaded at 0
+    devices: tuple[str, ...] = ()
+
+
+@dataclass
+class Result:
+    name: str
+    instructions: int
+    seconds: float  # wall time of the fastest run, excluding assembly and setup
+
+    @property
+    def ips(self) -> float:
+        return self.instructions / self.seconds if self.seconds else 0.0
+
+
+BENCHMARKS: list[Benchmark] = [
+    Benchmark("alu", "arithmetic and logic in a tight loop", """
+        mov b, 3
+        mov c, 0
+    loop:
+        add a, 3
+        xor a, 0x5a5a
+        lsh a, 1
+        sub a, b
+        mul b, 7
+        and a, 0x7fff
+        inc c
+        cmp c, 6000
+        jnz loop
+        halt
+    """),
+    Benchmark("memcpy", "word-at-a-time copy with get/put", """
+        mov d, 0
+    outer:
+        mov a, 0x1000
+        mov b, 0x2000
+        mov c, 0
+    inner:
+        get e, [a]
+        put [b], e
+        inc a
+        inc b
+        inc c
+        cmp c, 2048
+        jnz inner
+        inc d
+        cmp d, 4
+        jnz outer
+        halt
+    """),
+    Benchmark("recursion", "call/ret-heavy recursive fibonacci", """
+        mov sp, 0xfdff
+        mov a, 17
+        call fib
+        halt
+    fib:
+        cmp a, 2
+        jb fib_done
+        push a
+        dec a
+        call fib
+        pop b
+        push a
+        mov a, b
+        sub a, 2
+        call fib
+        pop b
+        add a, b
+    fib_done:
+        ret
+    """),
+    Benchmark("mmio", "polling a device register", """
+        mov b, 0xfe10
+        mov c, 0
+    loop:
+        get a, [b]
+        inc c
+        cmp c, 12000
+        jnz loop
+        halt
+    """, devices=("pit",)),
+    Benchmark("banks", "switching banks and touching the bank window", """
+        mov d, 0
+        mov a, 0x7000
+    outer:
+        mov c, 1
+    inner:
+        mov mb, c
+        put [a], c
+        get e, [a]
+        inc c
+        cmp c, 32
+        jnz inner
+        inc d
+        cmp d, 200
+        jnz outer
+        mov mb, 0
+        halt
+    """),
+    Benchmark("bcp", "block copies with bcp", """
+        mov d, 0
+    loop:
+        mov a, 0x1000
+        mov b, 0x2000
+        bcp b, a, 256
+        inc d
+        cmp d, 2000
+        jnz loop
+        halt
+    """),
+    Benchmark("boot", "the kernel, from reset to the shell prompt", devices=("pit", "rtc", "disk")),
+]
+
+
+def _assemble(benchmark: Benchmark, workdir: str) -> bytes:
+    level, warnings = jasm_logger.level, jasm_logger.warnings
+    jasm_logger.set_level(0)
+    jasm_logger.set_warnings(False)
+    try:
+        if benchmark.source:
+            return assemble_string(benchmark.source, {"linkable": False})
+
+        # the kernel imports its sources, which assemble_string can't do, so it goes through a file
+        output = os.path.join(workdir, "boot.bin")
+        assemble(KERNEL, output, {"linkable": False, "write": True})
+        with open(output, "rb") as f:
+            return f.read()
+    finally:
+        jasm_logger.set_level(level)
+        jasm_logger.set_warnings(warnings)
+
+
+def _setup(benchmark: Benchmark, binary: bytes, workdir: str) -> Emulator:
+    image = ""
+    if "disk" in benchmark.devices:
+        # the disk writes back to its image, so every run gets a fresh copy
+        image = os.path.join(workdir, "disk.img")
+        shutil.copyfile(DISK_IMAGE, image)
+
+    emu = Emulator(verbosity=logger.log_level.ERROR, enabled_devices={device: True for device in benchmark.devices}, image_file=image)
+    emu.bus.load_bytes(0, binary)
+
+    if benchmark.name == "boot":
+        # headless, so add the keyboard by hand and stop at the first status poll
+        emu.devices.append(Keyboard(emu.key_queue))
+        mmio_read = emu.bus.mmio_read
+
+        def prompt(addr: int) -> int:
+            if addr == KEYBOARD_STATUS:
+                raise EmulatorException("reached the shell prompt")
+            return mmio_read(addr)
+
+        emu.bus.mmio_read = prompt
+    return emu
+
+
+def _execute(emu: Emulator, benchmark: Benchmark) -> float:
+    # the same slices the run loop uses, without pacing or logging
+    started = perf_counter()
+    try:
+        while True:
+            emu._run_slice(SLICE)
+    except EmulatorException as e:
+        elapsed = perf_counter() - started
+        if not emu.halted and e.message != "reached the shell prompt":
+            raise EmulatorException(f"{benchmark.name} stopped at 0x{emu.pc.value:04X}: {e.message}")
+    return elapsed
+
+
+def run(benchmark: Benchmark, repeat: int = 3) -> Result:
+    """Run a benchmark repeat times, keeping the fastest run."""
+    with tempfile.TemporaryDirectory() as workdir:
+        binary = _assemble(benchmark, workdir)
+
+        best: Result | None = None
+        for _ in range(max(1, repeat)):
+            emu = _setup(benchmark, binary, workdir)
+            seconds = _execute(emu, benchmark)
+            if best is None or seconds < best.seconds:
+                best = Result(benchmark.name, emu.cycles, seconds)
+            emu.close()
+        assert best is not None
+        return best
+
+
+def save(results: list[Result], path: str) -> None:
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {result.name: {**asdict(result), "ips": result.ips} for result in results},
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def compare(results: list[Result], baseline_path: str, threshold: float) -> list[str]:
+    """Compare against an earlier saved run. Returns the benchmarks that got slower than threshold allows."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    print(f"\n{'benchmark':<12} {'baseline ips':>14} {'ips':>14} {'change':>9}")
+    for result in results:
+        if result.name not in baseline:
+            print(f"{result.name:<12} {'-':>14} {result.ips:>14,.0f} {'new':>9}")
+            continue
+        before = baseline[result.name]["ips"]
+        change = result.ips / before - 1 if before else 0.0
+        regressed = change < -threshold
+        print(f"{result.name:<12} {before:>14,.0f} {result.ips:>14,.0f} {change:>+8.1%}{'  SLOWER' if regressed else ''}")
+        if regressed:
+            regressions.append(f"{result.name} is {-change:.1%} slower than the baseline (threshold {threshold:.0%}).")
+    return regressions
+
+
+class BenchArgumentParser(Tap):
+    """emulator throughput benchmarks"""
+
+    only: list[str] = []  # run only these benchmarks
+    repeat: int = 3  # runs per benchmark, the fastest one counts
+    output: str = ""  # write the results to this json file
+    baseline: str = ""  # compare against results saved earlier with --output
+    threshold: float = 0.10  # slowdown allowed before a benchmark counts as a regression
+
+
+if __name__ == "__main__":
+
+    args = BenchArgumentParser(underscores_to_dashes=True).parse_args()
+
+    selected = [benchmark for benchmark in BENCHMARKS if not args.only or benchmark.name in args.only]
+    unknown = set(args.only) - {benchmark.name for benchmark in BENCHMARKS}
+    if unknown:
+        logger.fatal(f"unknown benchmarks: {', '.join(sorted(unknown))}.", "bench.py")
+
+    print(f"{'benchmark':<12} {'instructions':>13} {'wall':>10} {'ips':>12}  description")
+    results = []
+    for benchmark in selected:
+        result = run(benchmark, args.repeat)
+        results.append(result)
+        print(f"{result.name:<12} {result.instructions:>13,} {result.seconds * 1000:>8.1f}ms {result.ips:>12,.0f}  {benchmark.description}")
+
+    if args.output:
+        save(results, args.output)
+        print(f"\nwrote {len(results)} results to {args.output}.")
+
+    regressions = compare(results, args.baseline, args.threshold) if args.baseline else []
+    for regression in regressions:
+        print(regression)
+    sys.exit(1 if regressions else 0)
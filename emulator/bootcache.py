@@ -0,0 +1,224 @@
+# bootcache.py
+# post-boot snapshots, cached on disk under a hash of everything that went into the boot.
+# josiah bergen, october 2026
+
+import hashlib
+import json
+import os
+import struct
+import zlib
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from .constants import BANK_SIZE, MEMORY_SIZE, NUM_BANKS, VRAM_SIZE
+from .exceptions import EmulatorException
+from .hooks import Hook
+from .snapshot import Snapshot, check_device_state, device_state, restore_device_state
+from .util.cache import cache_directory
+from .util.logger import logger
+
+if TYPE_CHECKING:
+    from .devices.device import Device
+    from .emulator import Emulator
+
+# file layout: header, json metadata (registers, counters, device state), then
+# main memory, vram and the banks back to back, zlib compressed.
+HEADER  = struct.Struct("<4sHI")  # magic, version, metadata length
+MAGIC   = b"JBOT"
+VERSION = 1
+
+EXTENSION = ".jboot"
+KEEP = 16  # snapshots kept in the cache, the least recently used go first
+
+
+def cache_key(binary: bytes, image: bytes | None, devices: Iterable[str], trigger: int) -> str:
+    """Names a boot: the same binary, disk image, devices and trigger always boot to the same state."""
+    parts = [
+        f"jboot v{VERSION}",
+        hashlib.sha256(binary).hexdigest(),
+        hashlib.sha256(image).hexdigest() if image is not None else "no disk",
+        ",".join(sorted(devices)),
+        f"{trigger:04X}",
+    ]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:32]
+
+
+class BootCache:
+    def __init__(self, emu: "Emulator", key: str, trigger: int, directory: str = ""):
+        """Skips the boot on later runs, by snapshotting it the first time execution reaches trigger.
+
+        the key comes from cache_key(), so rebuilding the kernel or changing the disk image or
+        devices simply misses the cache, and stale snapshots age out of it. the snapshot holds
+        the registers, all of memory and the devices' plain state, but not the disk image,
+        which the key already pins down.
+        """
+        self.emu = emu
+        self.key = key
+        self.trigger = trigger & 0xFFFF
+        self.directory = directory or cache_directory("boot")
+        self.path = os.path.join(self.directory, key + EXTENSION)
+        self._watch: Hook | None = None  # the override installed by arm(), until it fires
+
+    # restoring
+
+    def restore(self) -> bool:
+        """Restore the cached snapshot, if there is one. Returns true if it was."""
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(HEADER.size)
+                if len(header) != HEADER.size:
+                    raise EmulatorException("truncated header")
+                magic, version, length = HEADER.unpack(header)
+                if (magic, version) != (MAGIC, VERSION):
+                    raise EmulatorException("not a boot snapshot, or an older version")
+                meta = json.loads(f.read(length))
+                storage = zlib.decompress(f.read())
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, zlib.error, EmulatorException) as e:
+            logger.warning(f"ignoring unreadable boot snapshot {self.path}: {e}")
+            self._remove()
+            return False
+
+        if len(storage) != MEMORY_SIZE + VRAM_SIZE + NUM_BANKS * BANK_SIZE:
+            logger.warning(f"ignoring boot snapshot {self.path}: it's for a different memory layout.")
+            self._remove()
+            return False
+
+        # devices are matched up by type, in order. ones the snapshot doesn't know keep their reset state.
+        saved: dict[str, list[dict[str, object]]] = {}
+        for name, state in meta["devices"]:
+            saved.setdefault(name, []).append(state)
+        matched: list[tuple["Device", dict[str, object]]] = []
+        for device in self.emu.devices:
+            states = saved.get(type(device).__name__)
+            if states:
+                matched.append((device, states.pop(0)))
+        try:
+            for device, state in matched:
+                check_device_state(device, state)
+        except EmulatorException as e:
+            logger.warning(f"ignoring boot snapshot {self.path}: {e}")
+            self._remove()
+            return False
+
+        banks_start = MEMORY_SIZE + VRAM_SIZE
+        self.emu.restore(Snapshot(
+            registers=tuple(meta["registers"]),
+            memory=storage[:MEMORY_SIZE],
+            vram=storage[MEMORY_SIZE:banks_start],
+            banks=tuple(storage[start:start + BANK_SIZE] for start in range(banks_start, len(storage), BANK_SIZE)),
+            cycles=meta["cycles"],
+            halted=meta["halted"],
+            pending_interrupts=meta["pending_interrupts"],
+        ))
+        for device, state in matched:
+            restore_device_state(device, state)
+
+        os.utime(self.path)  # recently used, see _prune()
+        logger.info(f"restored the boot from its snapshot at 0x{self.trigger:04X} ({meta['cycles']:,} cycles skipped).")
+        return True
+
+    # taking
+
+    def arm(self) -> None:
+        """Take the snapshot before the first instruction at the trigger, then get out of the way."""
+        emu, trigger = self.emu, self.trigger
+        slice_start, steps = -1, 0  # emu.cycles only moves between slices, so steps counts within one
+
+        def watch() -> None:
+            nonlocal slice_start, steps
+            hook.inner()
+            if emu.cycles != slice_start:
+                slice_start, steps = emu.cycles, 0
+            if emu.pc.value == trigger:
+                self._disarm()
+                self.save(emu.cycles + steps)
+            steps += 1
+
+        hook = self._watch = emu.hook("_check_overrides", watch)
+
+    def _disarm(self) -> None:
+        if self._watch is not None:
+            self._watch.remove()
+            self._watch = None
+
+    def save(self, cycles: int) -> None:
+        emu = self.emu
+        snapshot = emu.snapshot()
+        meta = {
+            "registers": list(snapshot.registers),
+            "cycles": cycles,
+            "halted": snapshot.halted,
+            "pending_interrupts": snapshot.pending_interrupts,
+            "devices": [[type(device).__name__, device_state(device)] for device in emu.devices],
+        }
+        encoded = json.dumps(meta).encode()
+        storage = zlib.compress(snapshot.memory + snapshot.vram + b"".join(snapshot.banks), 1)
+
+        # written aside and renamed into place, so a half-written snapshot is never restored
+        partial = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(partial, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, len(encoded)))
+                f.write(encoded)
+                f.write(storage)
+            os.replace(partial, self.path)
+        except OSError as e:
+            logger.warning(f"couldn't save the boot snapshot to {self.path}: {e}")
+            return
+        logger.debug(f"saved a boot snapshot at 0x{self.trigger:04X} after {cycles:,} cycles to {self.path}.")
+        self._prune()
+
+    # cache housekeeping
+
+    def _remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _prune(self) -> None:
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(EXTENSION)]
+            paths = sorted((os.path.join(self.directory, name) for name in names), key=os.path.getmtime, reverse=True)
+            for path in paths[KEEP:]:
+                os.remove(path)
+        except OSError:
+            pass  # another session got there first
+
+
+def resolve_trigger(emu: "Emulator", trigger: str) -> int:
+    """A label (needs symbols) or a hexadecimal pc."""
+    if emu.symbols is not None:
+        address = emu.symbols.address(trigger)
+        if address is not None:
+            return address
+    try:
+        address = int(trigger, 16)
+    except ValueError:
+        hint = "" if emu.symbols is not None else ", load symbols with --symbols to use labels"
+        raise EmulatorException(f'unknown boot snapshot trigger "{trigger}"{hint}.')
+    if not 0 <= address <= 0xFFFF:
+        raise EmulatorException(f"boot snapshot trigger 0x{address:X} is out of range.")
+    return address
+
+
+def start(emu: "Emulator", binary: str, image: str, devices: Iterable[str], trigger: str, directory: str = "") -> BootCache:
+    """Restore the boot of binary from the cache, or arm a snapshot of it. Call once the binary is loaded."""
+    if emu.inputs is not None:
+        # a recording starts from reset, and would go out of step with a restored boot
+        raise EmulatorException("boot snapshots can't be combined with --record or --replay.")
+    address = resolve_trigger(emu, trigger)
+    with open(binary, "rb") as f:
+        binary_data = f.read()
+    image_data = None
+    if image:
+        with open(image, "rb") as f:
+            image_data = f.read()
+
+    cache = BootCache(emu, cache_key(binary_data, image_data, devices, address), address, directory)
+    if not cache.restore():
+        cache.arm()
+    return cache
@@ -1,3 +1,5 @@
+import mmap
+from collections.abc import Iterator
 from typing import Callable
 
 from .constants import (
@@ -14,20 +16,47 @@ from .constants import (
     VRAM_SIZE,
     VRAM_START,
 )
+from .hooks import Hook, install
 from .util.logger import logger
 
+# bytes needed to back main memory, vram, and every bank, laid out in that order
+STORAGE_SIZE = MEMORY_SIZE + VRAM_SIZE + NUM_BANKS * BANK_SIZE
+
+# a run of words that live in one storage: (storage, or None for mmio, byte offset, word address, word count)
+Span = tuple[bytearray | memoryview | None, int, int, int]
+
 
 class MemoryBus:
     
-    def __init__(self, current_bank: Callable[[], int],mmio_read:  Callable[[int], int], mmio_write: Callable[[int, int], None]):
+    def __init__(self, current_bank: Callable[[], int],mmio_read:  Callable[[int], int], mmio_write: Callable[[int, int], None], storage: memoryview | None = None):
         # functions supplied by the cpu/devices
         self.current_bank = current_bank
         self.mmio_read = mmio_read
         self.mmio_write = mmio_write
-        # initialize bytearrays for main memory, vram, and banks
-        self.memory = bytearray(MEMORY_SIZE)
-        self.vram = bytearray(VRAM_SIZE)
-        self.banks = [bytearray(BANK_SIZE) for _ in range(NUM_BANKS)]
+
+        if storage is None:
+            # initialize bytearrays for main memory, vram, and banks
+            self.memory: bytearray | memoryview = bytearray(MEMORY_SIZE)
+            self.vram: bytearray | memoryview = bytearray(VRAM_SIZE)
+            self.banks: list[bytearray | memoryview] = [bytearray(BANK_SIZE) for _ in range(NUM_BANKS)]
+            return
+
+        # or carve them out of a buffer someone else owns, i.e. shared memory (see remote.py)
+        if len(storage) < STORAGE_SIZE:
+            raise ValueError(f"storage must be at least {STORAGE_SIZE} bytes, got {len(storage)}")
+        self.memory = storage[:MEMORY_SIZE]
+        self.vram = storage[MEMORY_SIZE:MEMORY_SIZE + VRAM_SIZE]
+        self.banks = [storage[start:start + BANK_SIZE] for start in range(MEMORY_SIZE + VRAM_SIZE, STORAGE_SIZE, BANK_SIZE)]
+
+    def release(self) -> None:
+        # let go of views into external storage, so its owner can close it
+        for view in (self.memory, self.vram, *self.banks):
+            if isinstance(view, memoryview):
+                view.release()
+
+    def hook(self, name: str, wrapper: Callable) -> Hook:
+        # wrap read16, write16, mmio_read or mmio_write, see hooks.py
+        return install(self, name, wrapper)
 
     @property
     def vram_view(self) -> memoryview:
@@ -72,36 +101,140 @@ class MemoryBus:
             return 0 # reading from mmio, exit early
 
         # not reading from mmio, so read as normal.
-        return self.read16(address, bank=bank)
+        # goes through the class so instrumentation hooked onto this bus doesn't count it.
+        return MemoryBus.read16(self, address, bank=bank)
 
     def load_bytes(self, address: int, data: bytes, *, bank: int | None = None) -> None:
         # DEBUG FUNCTION: directly load words to memory, bypassing rom protection and mmio dispatching.
         # not implemented in hardware, used only for debugging.
         if len(data) % 2:
             raise ValueError("binary data must contain a whole number of 16-bit words")
+        self.write_block(address, data, bank=bank, rom=True, scope="MemoryBus.load_bytes")
+
+    # bulk operations. like peek16 and load_bytes, these are debugger and loader accesses:
+    # mmio reads as zero and is never written, and nothing hooked onto read16/write16 sees them.
+    # every range is in words, wraps at 0xFFFF like read16, and is split wherever the storage
+    # behind it changes, so each piece is a single slice operation.
+
+    def read_block(self, address: int, length: int, *, bank: int | None = None) -> memoryview:
+        """length words from address, as little-endian bytes.
+
+        a range within one storage comes back as a read-only view of it, so it follows later
+        writes (and holds a reference to the buffer), take bytes() of it to keep a copy.
+        """
+        spans = list(self._spans(address, length, bank))
+        if len(spans) == 1 and spans[0][0] is not None:
+            storage, offset, _, count = spans[0]
+            return memoryview(storage)[offset:offset + count * 2].toreadonly()
+        return memoryview(b"".join(bytes(count * 2) if storage is None else storage[offset:offset + count * 2] for storage, offset, _, count in spans))
+
+    def write_block(self, address: int, data: bytes | bytearray | memoryview, *, bank: int | None = None, rom: bool = False, scope: str = "MemoryBus.write_block") -> None:
+        """Write little-endian words from data, starting at address. rom is skipped unless rom is set."""
+        if len(data) % 2:
+            raise ValueError("data must contain a whole number of 16-bit words")
+        data = memoryview(data).cast("B")
+        start = 0
+        for storage, offset, word_address, count in self._writable_spans(address, len(data) // 2, bank, rom, scope):
+            start = ((word_address - address) & 0xFFFF) * 2
+            storage[offset:offset + count * 2] = data[start:start + count * 2]
 
-        for byte in range(0, len(data), 2):
-            # parse word address and assemble little-endian word from its two bytes
-            value = data[byte] | (data[byte + 1] << 8)
-            word_address = (address + byte // 2) & 0xFFFF
+    def fill(self, address: int, length: int, value: int, *, bank: int | None = None) -> None:
+        """Set length words from address to value. rom is skipped."""
+        word = (value & 0xFFFF).to_bytes(2, "little")
+        for storage, offset, _, count in self._writable_spans(address, length, bank, False, "MemoryBus.fill"):
+            storage[offset:offset + count * 2] = word * count
 
-            if MMIO_BASE <= word_address <= MMIO_END:
-                # skip mmio, but don't crash.
-                logger.warning(f"unable to load binary data into MMIO at 0x{word_address:04X}.", "MemoryBus.load_bytes")
-                continue
+    def copy(self, destination: int, source: int, length: int, *, bank: int | None = None, source_bank: int | None = None) -> None:
+        """Copy length words from source to destination, correctly when they overlap (memmove).
 
-            # write word to storage
-            storage, offset = self.resolve_storage(word_address, bank)
-            storage[offset] = value & 0xFF
-            storage[offset + 1] = value >> 8
+        bank selects the bank for both ends, source_bank overrides it for the source.
+        """
+        data = bytes(self.read_block(source, length, bank=bank if source_bank is None else source_bank))
+        self.write_block(destination, data, bank=bank, scope="MemoryBus.copy")
+
+    def compare(self, first: int, second: int, length: int, *, bank: int | None = None, second_bank: int | None = None) -> int | None:
+        """Index of the first word that differs between two ranges, or None if they're equal."""
+        a = self.read_block(first, length, bank=bank)
+        b = self.read_block(second, length, bank=bank if second_bank is None else second_bank)
+        if a == b:
+            return None
+
+        # a[:low] == b[:low] and a[:high] != b[:high]. halving with slice compares keeps it in c.
+        low, high = 0, len(a)
+        while high - low > 2:
+            middle = (low + high) // 4 * 2
+            if a[low:middle] == b[low:middle]:
+                low = middle
+            else:
+                high = middle
+        return low // 2
+
+    def find(self, pattern: int | bytes, address: int = 0, length: int | None = None, *, bank: int | None = None) -> int | None:
+        """Word address of the first occurrence of pattern (a word, or little-endian words) in a range.
+
+        the range defaults to everything from address to 0xFFFF. mmio reads as zero here too.
+        """
+        if isinstance(pattern, int):
+            pattern = (pattern & 0xFFFF).to_bytes(2, "little")
+        if not pattern or len(pattern) % 2:
+            raise ValueError("pattern must contain a whole number of 16-bit words")
+        address &= 0xFFFF
+        haystack = bytes(self.read_block(address, 0x10000 - address if length is None else length, bank=bank))
+
+        index = haystack.find(pattern)
+        while index != -1 and index % 2:
+            index = haystack.find(pattern, index + 1)  # only word-aligned matches count
+        return None if index == -1 else (address + index // 2) & 0xFFFF
+
+    def _spans(self, address: int, length: int, bank: int | None) -> Iterator[Span]:
+        if not 0 <= length <= 0x10000:
+            raise ValueError(f"length must be between 0 and 0x10000 words, got {length}")
+        selected = (self.current_bank() if bank is None else bank) % (NUM_BANKS + 1)
+
+        # regions that can't share a slice with their neighbours
+        regions = [(0, ROM_END), (VRAM_START, VRAM_END), (MMIO_BASE, MMIO_END)]
+        if selected:
+            regions.append((BANK_WINDOW_START, BANK_WINDOW_END))
+
+        address &= 0xFFFF
+        while length > 0:
+            end = 0xFFFF
+            for start, last in regions:
+                if start <= address <= last:
+                    end = last
+                    break
+                if address < start:
+                    end = min(end, start - 1)
+            count = min(length, end - address + 1)
+
+            if MMIO_BASE <= address <= MMIO_END:
+                yield None, 0, address, count
+            else:
+                storage, offset = self.resolve_storage(address, selected)
+                yield storage, offset, address, count
+            address = (address + count) & 0xFFFF
+            length -= count
+
+    def _writable_spans(self, address: int, length: int, bank: int | None, rom: bool, scope: str) -> Iterator[Span]:
+        # the spans a bulk write may change, warning once about each piece of mmio or rom it skips
+        for span in self._spans(address, length, bank):
+            storage, _, word_address, count = span
+            if storage is None:
+                logger.warning(f"unable to write {count} words into MMIO at 0x{word_address:04X}.", scope)
+            elif not rom and word_address <= ROM_END:
+                logger.warning(f"write of {count} words to ROM at 0x{word_address:04X}.", scope)
+            else:
+                yield span
 
     def reset(self) -> None:
         # reset memory, vram, and banks. protects rom.
-        self.memory[ROM_SIZE:] = bytes(MEMORY_SIZE - ROM_SIZE)
-        self.vram[:] = bytes(VRAM_SIZE)
-        self.banks = [bytearray(BANK_SIZE) for _ in range(NUM_BANKS)]
+        # in place, the storage may be shared
+        _clear(self.memory, ROM_SIZE)
+        _clear(self.vram)
+        for bank in self.banks:
+            _clear(bank)
 
-    def resolve_storage(self, address: int, bank: int | None) -> tuple[bytearray, int]:
+    def resolve_storage(self, address: int, bank: int | None) -> tuple[bytearray | memoryview, int]:
         # gets the storage (bytearray) and the byte offset (int) for the
         # word at address. abstraction layer for the different bytearrays 
         # in which memory is stored (vram and banks).
@@ -121,3 +254,14 @@ class MemoryBus:
 
         # base case; use main memory
         return self.memory, (address) * 2
+
+
+def _clear(storage: bytearray | memoryview, start: int = 0) -> None:
+    # zero storage from start, a host page at a time, leaving pages that are already zero alone.
+    # writing to a copy-on-write mapping (see image.py) gives the writer a private copy of the
+    # page, even when it writes zeros, so blanket zeroing would undo the sharing in one reset.
+    zero = bytes(mmap.PAGESIZE)
+    for offset in range(start, len(storage), mmap.PAGESIZE):
+        end = min(offset + mmap.PAGESIZE, len(storage))
+        if storage[offset:end] != zero[:end - offset]:
+            storage[offset:end] = zero[:end - offset]
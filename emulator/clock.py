@@ -0,0 +1,84 @@
+# clock.py
+# guest clock pacing for the jaide emulator.
+# josiah bergen, october 2026
+
+import time
+
+SLICE_INSTRUCTIONS = 1000  # instructions per run slice when running unlimited
+SLICES_PER_SECOND  = 100   # when paced, aim for ~10ms slices so sleeps stay coarse
+MAX_LAG            = 0.25  # seconds behind schedule before the debt is dropped
+
+
+class Clock:
+    def __init__(self, hz: int = 0):
+        """Paces the run loop to a target guest frequency.
+
+        hz -- target guest clock speed. zero (or less) runs unlimited.
+        """
+        self.hz: int = hz
+        self.cycles: int = 0        # cycles run since start()
+        self.dropped: float = 0.0   # seconds of lag given up since start()
+        self._started: float = 0.0
+        self._anchor_time: float = 0.0
+        self._anchor_cycles: int = 0
+
+    @property
+    def unlimited(self) -> bool:
+        return self.hz <= 0
+
+    @property
+    def slice_size(self) -> int:
+        """Number of instructions to run between pacing checks."""
+        if self.unlimited:
+            return SLICE_INSTRUCTIONS
+        return max(1, min(SLICE_INSTRUCTIONS, self.hz // SLICES_PER_SECOND))
+
+    def set_hz(self, hz: int) -> None:
+        self.hz = hz
+        self._anchor()
+
+    def start(self) -> None:
+        """Start a new run. Resets the schedule and the achieved-speed counters."""
+        self.cycles = 0
+        self.dropped = 0.0
+        self._started = time.perf_counter()
+        self._anchor()
+
+    def pace(self, executed: int) -> None:
+        """Account for a finished slice, sleeping if we are ahead of the guest clock."""
+        self.cycles += executed
+
+        if self.unlimited:
+            time.sleep(0)  # still yield once per slice
+            return
+
+        # the schedule is anchored to an absolute time, so oversleeping
+        # on one slice is paid back on the next one instead of accumulating.
+        target = self._anchor_time + (self.cycles - self._anchor_cycles) / self.hz
+        ahead = target - time.perf_counter()
+
+        if ahead > 0:
+            time.sleep(ahead)
+        elif -ahead > MAX_LAG:
+            # the host can't keep up (or we were stalled). don't burst to catch up,
+            # just re-anchor here and remember how much time we gave up.
+            self.dropped -= ahead
+            self._anchor()
+
+    def achieved_hz(self) -> float:
+        elapsed = time.perf_counter() - self._started
+        return self.cycles / elapsed if elapsed > 0 else 0.0
+
+    def report(self) -> str:
+        achieved = self.achieved_hz()
+        if self.unlimited:
+            return f"clock: unlimited, achieved {achieved:,.0f} Hz"
+        percent = achieved / self.hz * 100
+        return f"clock: target {self.hz:,} Hz, achieved {achieved:,.0f} Hz ({percent:.1f}%), dropped {self.dropped:.2f}s of lag"
+
+    def _anchor(self) -> None:
+        self._anchor_time = time.perf_counter()
+        self._anchor_cycles = self.cycles
+
+    def __str__(self) -> str:
+        return self.report()
@@ -0,0 +1,111 @@
+# conditions.py
+# conditional breakpoints and run-until predicates, compiled once to python callables.
+# josiah bergen, october 2026
+
+import ast
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .constants import REGISTERS
+from .exceptions import EmulatorException
+
+if TYPE_CHECKING:
+    from .emulator import Emulator
+
+# the only python syntax a condition may use. anything else is rejected before compiling.
+OPERATORS = (
+    ast.And, ast.Or, ast.Not, ast.USub, ast.Invert,
+    ast.Add, ast.Sub, ast.Mult, ast.FloorDiv, ast.Mod,
+    ast.BitAnd, ast.BitOr, ast.BitXor, ast.LShift, ast.RShift,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+
+@dataclass
+class Breakpoint:
+    address: int
+    condition: str = ""  # source text, empty for an unconditional breakpoint
+    check: Callable[[int], object] | None = None  # compiled condition, called with the hit count
+    hits: int = 0  # times the pc reached this address, whether or not the condition held
+
+    def hit(self) -> bool:
+        """Count a visit to this address. Returns true if execution should stop."""
+        self.hits += 1
+        if self.check is None:
+            return True
+        try:
+            return bool(self.check(self.hits))
+        except ArithmeticError as e:
+            raise EmulatorException(f"breakpoint condition at 0x{self.address:04X} failed: {e}")
+
+    def __str__(self) -> str:
+        condition = f" if {self.condition}" if self.condition else ""
+        return f"0x{self.address:04X}{condition} ({self.hits} hit{'' if self.hits == 1 else 's'})"
+
+
+class _Compiler(ast.NodeTransformer):
+    # rewrites register names to attribute loads and [addr] to memory peeks,
+    # refusing any node that isn't plain integer arithmetic or a comparison.
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        if not isinstance(node, (ast.Expression, ast.BoolOp, ast.UnaryOp, ast.BinOp, ast.Compare, ast.Load, *OPERATORS)):
+            raise EmulatorException(f'unsupported syntax "{ast.unparse(node) if isinstance(node, ast.expr) else type(node).__name__}" in "{self.text}".')
+        return super().generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if type(node.value) is not int:
+            raise EmulatorException(f'expected an integer, got "{ast.unparse(node)}" in "{self.text}".')
+        return node
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id == "hits":
+            return node
+        register = node.id.upper()
+        if register not in REGISTERS:
+            raise EmulatorException(f'unknown register "{node.id}" in "{self.text}".')
+        return ast.Attribute(value=ast.Name(id=f"_{register}", ctx=ast.Load()), attr="value", ctx=ast.Load())
+
+    def visit_List(self, node: ast.List) -> ast.AST:
+        # [addr] reads the word at addr, through the current bank
+        if len(node.elts) != 1:
+            raise EmulatorException(f'expected a single address inside [ ] in "{self.text}".')
+        address = ast.BinOp(left=self.visit(node.elts[0]), op=ast.BitAnd(), right=ast.Constant(0xFFFF))
+        return ast.Call(func=ast.Name(id="_peek", ctx=ast.Load()), args=[address], keywords=[])
+
+
+def compile_expression(emu: "Emulator", text: str) -> Callable[[int], int]:
+    """Compile a condition such as "a == 0 and [0x8000] > 3" into a callable.
+
+    the callable takes the hit count (available as hits) and returns the value.
+    registers are read by name, [addr] reads a memory word without mmio side effects,
+    and all values are unsigned 16-bit integers.
+    """
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise EmulatorException(f'invalid condition "{text}": {e.msg}.')
+
+    body = _Compiler(text).visit(tree).body
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg(arg="hits")], kwonlyargs=[], kw_defaults=[], defaults=[])
+    function = ast.fix_missing_locations(ast.Expression(body=ast.Lambda(args=arguments, body=body)))
+
+    namespace: dict[str, object] = {f"_{name}": register for name, register in emu.reg.items()}
+    namespace["_peek"] = emu.bus.peek16
+    namespace["__builtins__"] = {}
+    return eval(compile(function, f"<condition {text}>", "eval"), namespace)
+
+
+def compile_until(emu: "Emulator", text: str) -> Callable[[], bool]:
+    """Compile an until predicate: either a condition, or "<value> changes",
+    which holds once the value differs from what it is right now."""
+    if text.endswith(" changes"):
+        value = compile_expression(emu, text.removesuffix(" changes"))
+        initial = value(0)
+        return lambda: value(0) != initial
+
+    condition = compile_expression(emu, text)
+    return lambda: bool(condition(0))
@@ -8,6 +8,8 @@ MEMORY_SIZE = 0x10000 * 2  # 128KiB total (64K word addresses × 2 bytes)
 BANK_SIZE   = 0x4000 * 2   # bytes per bank (0x4000 = 16384 words, 2¹⁴)
 NUM_BANKS   = 31           # MB=1..31 map to banks[0..30] for user processes
 
+PAGE_WORDS = 0x100  # granularity used by debugging/profiling tools, not by the hardware
+
 ROM_END  = 0x00FF
 ROM_SIZE = 0x0100 * 2  # 256 words, enough for a simple bootloader
 
@@ -22,6 +24,11 @@ MMIO_BASE = 0xFE00
 MMIO_END  = 0xFEFF
 MMIO_SYSTEM = 0xFEFF
 
+FRAME_INTERVAL = 1 / 30  # seconds between graphics renders, smoooth 30fps
+
+IVT_START   = 0xFF00  # interrupt vector table, one handler address per vector
+NUM_VECTORS = 256
+
 # Register names in index order (matches REGISTERS enum in common.isa)
 REGISTERS = ["A", "B", "C", "D", "E", "X", "Y", "Z", "F", "MB", "SP", "PC"]
 
@@ -29,12 +36,14 @@ FLAG_C = 0  # carry
 FLAG_Z = 1  # zero
 FLAG_N = 2  # negative
 FLAG_O = 3  # overflow
+FLAG_I = 4  # interrupts enabled
 
 FLAG_STRINGS: dict[int, str] = {
     FLAG_C: "C",
     FLAG_Z: "Z",
     FLAG_N: "N",
     FLAG_O: "O",
+    FLAG_I: "I",
 }
 
 # Human-readable mnemonic strings (for logging / disassembly)
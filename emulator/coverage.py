@@ -0,0 +1,173 @@
+# coverage.py
+# executed-pc bitmaps for guest code, exported as lcov line coverage.
+# josiah bergen, october 2026
+
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+from common.isa import INSTRUCTIONS, OPCODE_FORMATS
+
+from .constants import BANK_WINDOW_END, BANK_WINDOW_START, NUM_BANKS
+from .hooks import Hook
+from .util.symbols import SymbolTable
+
+if TYPE_CHECKING:
+    from .emulator import Emulator
+
+# instructions that end a block, everything after them starts a new one
+BRANCHES = (
+    INSTRUCTIONS.JMP, INSTRUCTIONS.JZ, INSTRUCTIONS.JNZ, INSTRUCTIONS.JC, INSTRUCTIONS.JNC,
+    INSTRUCTIONS.JA, INSTRUCTIONS.JAE, INSTRUCTIONS.JB, INSTRUCTIONS.JBE, INSTRUCTIONS.JG,
+    INSTRUCTIONS.JGE, INSTRUCTIONS.JL, INSTRUCTIONS.JLE, INSTRUCTIONS.CALL, INSTRUCTIONS.RET,
+    INSTRUCTIONS.INT, INSTRUCTIONS.IRET,
+)
+BLOCK_ENDS = frozenset((*BRANCHES, INSTRUCTIONS.HALT))
+
+
+class Coverage:
+    def __init__(self, emu: "Emulator", path: str = ""):
+        """Marks every executed pc in a 64K-bit bitmap per bank (bank 0 is main memory).
+
+        execution is followed a block at a time: the start of a block is noted when it's
+        entered, and when it's left, its instructions are decoded from there up to the pc
+        it was left at and marked all at once. blocks are entered and left at every branch,
+        taken or not, on interrupt entry and reset, found by hooking this emulator's
+        handlers, and at every slice boundary, where the run loop calls enter() and leave().
+        a block that was already marked up to the same pc is a single dict lookup.
+        code rewritten in place after it was marked keeps the old marks.
+        path -- where to write lcov coverage when the emulator is closed (optional)
+        """
+        self.emu = emu
+        self.path = path
+        self.bitmaps = [bytearray(0x10000 // 8) for _ in range(NUM_BANKS + 1)]
+        self.running = True
+        self._marked: dict[tuple[int, int], int] = {}  # (block start, bank) -> pc it was marked up to
+        self._start: int | None = None  # where the block being executed began
+        self._bank = 0  # bank selected when it did
+        self._hooks: list[Hook] = []
+        self._hook()
+
+    @property
+    def blocks(self) -> int:
+        # distinct blocks entered
+        return len(self._marked)
+
+    def enter(self, pc: int) -> None:
+        """Execution is about to continue at pc, the start of a block."""
+        if self.running:
+            self._start, self._bank = pc, self.emu.mb.value % (NUM_BANKS + 1)
+
+    def leave(self, pc: int) -> None:
+        """Execution left the current block, and pc is the first instruction it didn't run."""
+        start = self._start
+        if start is None:
+            return
+        self._start = None
+        key = (start, self._bank if BANK_WINDOW_START <= start <= BANK_WINDOW_END else 0)
+        if self._marked.get(key) != pc:
+            self._mark_block(start, pc)
+            self._marked[key] = pc
+
+    def _mark_block(self, pc: int, stop: int) -> None:
+        peek, current = self.emu.bus.peek16, self._bank
+        while pc != stop:
+            bank = current if BANK_WINDOW_START <= pc <= BANK_WINDOW_END else 0
+            fmt = OPCODE_FORMATS.get(peek(pc, bank=bank) >> 8)
+            if fmt is None:
+                break  # an invalid opcode stops the guest, nothing after it runs
+            self.bitmaps[bank][pc >> 3] |= 1 << (pc & 7)
+            if fmt.mnemonic in BLOCK_ENDS:
+                break  # only reached before stop if the code was rewritten under us
+            pc = (pc + (1 if fmt.imm_operand is None else 2)) & 0xFFFF
+
+    def stop(self) -> None:
+        self.running = False
+        self._start = None
+        self._unhook()
+
+    def reset(self) -> None:
+        for bitmap in self.bitmaps:
+            bitmap[:] = bytes(len(bitmap))
+        self._marked.clear()
+
+    # hooks
+
+    def _hook(self) -> None:
+        emu, enter, leave = self.emu, self.enter, self.leave
+
+        def hook_branch(mnemonic: INSTRUCTIONS) -> Hook:
+            def on_branch(e: "Emulator", decoded: tuple[int, ...]) -> None:
+                leave(e.pc.value)  # already past the branch, which ran either way
+                hook.inner(e, decoded)
+                enter(e.pc.value)
+
+            hook = emu.hook_handler(mnemonic, on_branch)
+            return hook
+
+        def on_interrupt(vector: int) -> None:
+            leave(emu.pc.value)
+            interrupt.inner(vector)
+            enter(emu.pc.value)
+
+        def on_reset() -> None:
+            leave(emu.pc.value)
+            reset.inner()
+            enter(emu.pc.value)
+
+        interrupt = emu.hook("interrupt", on_interrupt)
+        reset = emu.hook("reset", on_reset)
+        self._hooks = [*map(hook_branch, BRANCHES), interrupt, reset]
+
+    def _unhook(self) -> None:
+        # hooks installed before or after ours (profiler, sysprof) stay where they are
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = []
+
+    # reports
+
+    def executed(self, pc: int, bank: int = 0) -> bool:
+        return bool(self.bitmaps[bank % (NUM_BANKS + 1)][(pc & 0xFFFF) >> 3] & (1 << (pc & 7)))
+
+    def instructions(self) -> int:
+        # executed instruction addresses, over every bank
+        return sum(bin(byte).count("1") for bitmap in self.bitmaps for byte in bitmap if byte)
+
+    def lines(self, symbols: SymbolTable) -> dict[str, dict[int, bool]]:
+        """Every source line with an instruction on it, by file, and whether one of them ran.
+
+        symbol tables describe what was assembled into main memory, so this is bank 0's bitmap.
+        """
+        files: defaultdict[str, dict[int, bool]] = defaultdict(dict)
+        bitmap = self.bitmaps[0]
+        for addr, (file, line) in symbols.lines.items():
+            hit = bool(bitmap[addr >> 3] & (1 << (addr & 7)))
+            lines = files[file]
+            lines[line] = lines.get(line, False) or hit
+        return dict(files)
+
+    def report(self, symbols: SymbolTable | None) -> list[str]:
+        lines = [f"coverage: {self.instructions():,} instructions executed, in {self.blocks:,} blocks"]
+        if symbols is None:
+            lines.append("load a symbol table for per-file line coverage.")
+            return lines
+
+        total = hit = 0
+        for file, covered in sorted(self.lines(symbols).items()):
+            count = sum(covered.values())
+            total, hit = total + len(covered), hit + count
+            lines.append(f"  {count / len(covered) * 100:5.1f}%  {count:>5}/{len(covered):<5}  {file}")
+        if total:
+            lines.append(f"  {hit / total * 100:5.1f}%  {hit:>5}/{total:<5}  (all files)")
+        return lines
+
+    def export_lcov(self, path: str, symbols: SymbolTable, name: str = "") -> int:
+        """Write line coverage as an lcov tracefile (genhtml, ci coverage tools). Returns the number of files."""
+        files = self.lines(symbols)
+        with open(path, "w") as f:
+            for file, covered in sorted(files.items()):
+                f.write(f"TN:{name}\nSF:{file}\n")
+                for line, hit in sorted(covered.items()):
+                    f.write(f"DA:{line},{int(hit)}\n")
+                f.write(f"LF:{len(covered)}\nLH:{sum(covered.values())}\nend_of_record\n")
+        return len(files)
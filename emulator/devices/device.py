@@ -9,6 +9,9 @@ from ..util.logger import logger
 
 
 class Device:
+    # plain attributes that describe the host rather than the machine, left out of saved state
+    host_state: tuple[str, ...] = ()
+
     def __init__(self):
         # by default, no read or write handlers are defined
         self.read_dispatch: dict[int, Callable[..., int]] = {}
@@ -2,6 +2,8 @@
 # device base class for the jaide emulator.
 # josiah bergen, march 2026
 
+from typing import Callable
+
 from ..bus import MemoryBus
 from ..util.logger import logger
 from .device import Device
@@ -14,13 +16,18 @@ COMMAND_READ = 0
 COMMAND_WRITE = 1
 SECTOR_WORDS = 256
 
+IRQ_VECTOR = 0x06  # raised on transfer complete
+
 
 class Disk(Device):
-    def __init__(self, disk_file: str, bus: MemoryBus):
+    host_state = ("disk_file",)  # the image's contents are what matter, wherever it is
+
+    def __init__(self, disk_file: str, bus: MemoryBus, raise_irq: Callable[[int], None]):
         """Disk controller."""
         super().__init__()
 
         self.bus = bus
+        self.raise_irq = raise_irq
 
         self.status = STATUS_IDLE
         self.sector_number = 0
@@ -121,6 +128,7 @@ class Disk(Device):
         self.status = STATUS_IDLE
         self._command = None
         self._cursor = 0
+        self.raise_irq(IRQ_VECTOR)
         logger.debug("transfer complete! status reset to idle.")
 
     def reset(self) -> None:
@@ -2,6 +2,7 @@
 # graphics controller device for the jaide emulator.
 # josiah bergen, april 2026
 
+import threading
 import time
 from collections import deque
 from pathlib import Path
@@ -9,6 +10,7 @@ from typing import Callable
 
 import pygame
 
+from ..constants import FRAME_INTERVAL
 from ..util.logger import logger
 from .device import Device
 
@@ -23,7 +25,8 @@ SCALE           = 1.5
 SCALED_WIDTH    = GRAPHICS_WIDTH * SCALE
 SCALED_HEIGHT   = GRAPHICS_HEIGHT * SCALE
 
-FRAME_INTERVAL  = 1 / 30  # seconds between renders, smoooth 30fps
+INPUT_EVENTS = [pygame.QUIT, pygame.KEYDOWN]
+WAKE_EVENT   = pygame.USEREVENT  # posted by wake(), carries nothing
 
 COLORS: list[tuple[int, int, int]] = [
     (0,   0,   0  ),  # 0:  black
@@ -46,9 +49,15 @@ COLORS: list[tuple[int, int, int]] = [
 
 
 class Graphics(Device):
+    host_state = ("thread", "_last_render", "_blink_timer", "_last_hash", "_inactive_drawn", "_was_running")
+
     def __init__(self, key_queue: deque, vram: memoryview, is_running: Callable[[], bool], shutdown: Callable[[], None]):
         """Graphics controller. Renders VRAM to a pygame window.
 
+        it isn't ticked per instruction: a run on the main thread calls refresh() between
+        slices, and otherwise the main loop draws from wait(), while the guest runs on a
+        worker thread or is stopped.
+
         vram      -- read-only view of bus VRAM (mapped at 0x4000-0x4FFF)
         key_queue -- shared deque; key events are appended here for KeyboardDevice
         is_running -- reports whether the emulator run loop is active
@@ -70,9 +79,14 @@ class Graphics(Device):
         self._was_running: bool = self.is_running()
 
         pygame.init()
+        self.thread: int = threading.get_ident()  # pygame may only be driven from this thread
         self.screen: pygame.Surface = pygame.display.set_mode((SCALED_WIDTH, SCALED_HEIGHT))
         pygame.display.set_caption("jaide graphics controller output")
 
+        # every other event type (mouse motion, etc.) is dropped, so it can't wake wait()
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([*INPUT_EVENTS, pygame.WINDOWEXPOSED, WAKE_EVENT])
+
         self.write_dispatch[0xFE40] = self._set_control
         self.read_dispatch[0xFE40]  = lambda: 0x01 if self.enabled else 0x00
 
@@ -93,16 +107,45 @@ class Graphics(Device):
         self._inactive_drawn = False
         self._was_running = self.is_running()
 
-    def tick(self) -> None:
+    def close(self) -> None:
+        pygame.quit()
 
+    def refresh(self) -> None:
+        # called by the run loop between slices. pumps window events and redraws, at most once a frame.
         now = time.monotonic()
         if now - self._last_render < FRAME_INTERVAL:
             # still within frame interval, do nothing
             return
         self._last_render = now
 
-        # drain pygame events; push key events to shared queue for KeyboardDevice
-        for event in pygame.event.get():
+        # only take the events we act on, a wake() is left for the main loop to see
+        self._handle(pygame.event.get(INPUT_EVENTS))
+        self._draw()
+
+    def wait(self, frames: bool = False) -> None:
+        # called by the main loop. brings the window up to date, then sleeps until it gets an
+        # event or a wake(). with frames (the guest is running on a worker thread) it also
+        # wakes for the next frame, otherwise there's no timeout to poll on.
+        now = time.monotonic()
+        if not frames or now - self._last_render >= FRAME_INTERVAL:
+            self._last_render = now
+            self._draw()
+
+        timeout = 0  # forever
+        if frames:
+            timeout = max(1, int((self._last_render + FRAME_INTERVAL - time.monotonic()) * 1000))
+        self._handle([pygame.event.wait(timeout), *pygame.event.get()])
+
+    def wake(self) -> None:
+        # safe from any thread, wakes up wait()
+        try:
+            pygame.event.post(pygame.event.Event(WAKE_EVENT))
+        except pygame.error:
+            pass  # the window is already gone
+
+    def _handle(self, events: list[pygame.event.Event]) -> None:
+        # push key events to shared queue for KeyboardDevice
+        for event in events:
 
             if event.type == pygame.QUIT:
                 # closed button pressed, shut down emulator
@@ -114,6 +157,12 @@ class Graphics(Device):
                 if scancode:
                     self.key_queue.append(scancode)
 
+            if event.type == pygame.WINDOWEXPOSED:
+                # the window was uncovered, so the next draw has to repaint everything
+                self._inactive_drawn = False
+                self._last_hash = None
+
+    def _draw(self) -> None:
         running = self.is_running()
         if running != self._was_running:
             self._was_running = running
@@ -138,9 +187,10 @@ class Graphics(Device):
         if not self._glyphs:
             return
 
-        # skip re-render if VRAM content and blink phase haven't changed
-        vram_snapshot = bytes(self.vram[:VRAM_CELLS * 4])
-        h = hash(vram_snapshot + bytes([blink_on]))
+        # skip re-render if VRAM content and blink phase haven't changed.
+        # the snapshot is a single copy, so a guest running on another thread can't tear a frame.
+        vram = bytes(self.vram[:VRAM_CELLS * 4])
+        h = hash(vram + bytes([blink_on]))
         if h == self._last_hash:
             return
         self._last_hash = h
@@ -150,7 +200,7 @@ class Graphics(Device):
             # each cell is two words (4 bytes), little-endian
             # 32-bit layout: char[0..15] | fg[16..19] | bg[20..23] | reserved[24..29] | invert[30] | blink[31]
             i    = cell_idx * 4
-            cell = self.vram[i] | (self.vram[i+1] << 8) | (self.vram[i+2] << 16) | (self.vram[i+3] << 24)
+            cell = vram[i] | (vram[i+1] << 8) | (vram[i+2] << 16) | (vram[i+3] << 24)
 
             char_code = cell & 0xFFFF
             fg_idx    = (cell >> 16) & 0x0F
@@ -2,15 +2,24 @@
 # device base class for the jaide emulator.
 # josiah bergen, march 2026
 
+from typing import Callable
+
 from ..util.logger import logger
 from .device import Device
 
+IRQ_VECTOR = 0x05
+
 
 class PIT(Device):
-    def __init__(self):
-        """Programmable interval timer."""
+    def __init__(self, raise_irq: Callable[[int], None]):
+        """Programmable interval timer.
+
+        raise_irq -- raises an interrupt line on the interrupt controller
+        """
         super().__init__()
 
+        self.raise_irq = raise_irq
+
         self.enabled: bool = False
         self.one_shot: bool = False
         self.counter: int = 0
@@ -46,7 +55,7 @@ class PIT(Device):
             else:
                 self.counter = self.reload  # run it back baby
 
-            pass  # no IRQ; tick counter incremented here in future
+            self.raise_irq(IRQ_VECTOR)
 
     def reset(self) -> None:
         self.enabled = False
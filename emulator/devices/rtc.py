@@ -3,19 +3,25 @@
 # josiah bergen, march 2026
 
 import time
+from typing import Callable
 
 from .device import Device
 
 
 class RTC(Device):
-    def __init__(self):
-        """Real-time clock."""
+    def __init__(self, now: Callable[[], time.struct_time] = time.localtime):
+        """Real-time clock.
+
+        now -- source of the current time. the host clock, unless inputs are being recorded or replayed
+        """
         super().__init__()
 
-        self.read_dispatch[0xFE30] = lambda: time.localtime().tm_sec
-        self.read_dispatch[0xFE31] = lambda: time.localtime().tm_min
-        self.read_dispatch[0xFE32] = lambda: time.localtime().tm_hour
-        self.read_dispatch[0xFE33] = lambda: time.localtime().tm_yday
+        self.now = now
+
+        self.read_dispatch[0xFE30] = lambda: self.now().tm_sec
+        self.read_dispatch[0xFE31] = lambda: self.now().tm_min
+        self.read_dispatch[0xFE32] = lambda: self.now().tm_hour
+        self.read_dispatch[0xFE33] = lambda: self.now().tm_yday
 
         self._log_ready()
 
@@ -26,5 +32,5 @@ class RTC(Device):
         pass
 
     def __str__(self) -> str:
-        t = time.localtime()
+        t = self.now()
         return f"rtc: second={t.tm_sec}, minute={t.tm_min}, hour={t.tm_hour}, day_of_year={t.tm_yday}"
@@ -5,32 +5,56 @@
 import os
 import sys
 import time
-import traceback
+from _thread import get_ident  # threading's, without importing all of threading
 from collections import deque
-from typing import Callable
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable
 
 from common.isa import INSTRUCTIONS, OPCODE_FORMATS
 
 from .bus import MemoryBus
+from .clock import Clock
+from .conditions import Breakpoint
 from .constants import (
     FLAG_C,
+    FLAG_I,
     FLAG_N,
     FLAG_O,
     FLAG_STRINGS,
     FLAG_Z,
+    IVT_START,
     MMIO_SYSTEM,
     REGISTERS,
 )
 from .devices.device import Device
 from .devices.disk import Disk
-from .devices.graphics import Graphics
 from .devices.keyboard import Keyboard
 from .devices.pit import PIT
 from .devices.rtc import RTC
+from .events import Events, RunResult, Stop, StopReason
 from .exceptions import EmulatorException
+from .hooks import Hook, install, install_item
+from .interrupts import InterruptController
 from .register import Register
+from .replay import InputRecorder, InputReplayer
+from .snapshot import Snapshot
+from .stats import RunStats
 from .util.disasm import disassemble
 from .util.logger import logger
+from .util.symbols import SymbolTable
+
+if TYPE_CHECKING:
+    # pygame, and the debugging and profiling tools, are only imported by whoever switches them on
+    from .coverage import Coverage
+    from .devices.graphics import Graphics
+    from .heatmap import MemoryHeatmap
+    from .history import History
+    from .hostprof import HostProfiler
+    from .image import MemoryImage
+    from .profiler import Profiler
+    from .stats import DeviceStats, OpcodeStats
+    from .sysprof import SyscallProfiler
+    from .trace import TraceWriter
 
 
 def mask16(value: int) -> int:
@@ -39,13 +63,39 @@ def mask16(value: int) -> int:
 
 
 class Emulator:
-    def __init__(self, verbosity: int = logger.log_level.INFO, enabled_devices: dict[str, bool] = {}, image_file: str = ""):
+    def __init__(self, verbosity: int = logger.log_level.INFO, enabled_devices: dict[str, bool] = {}, image_file: str = "", clock_hz: int = 0, record: str = "", replay: str = "", storage: memoryview | None = None, memory_image: "MemoryImage | None" = None):
         logger.set_level(verbosity)
 
+        # nondeterministic inputs (keys, rtc) are either recorded, replayed, or taken live.
+        # a replay runs headless and unpaced, with inputs fed back from the log.
+        self.inputs: InputRecorder | InputReplayer | None = None
+        if record:
+            self.inputs = InputRecorder(record)
+        elif replay:
+            self.inputs = InputReplayer(replay)
+        replaying = isinstance(self.inputs, InputReplayer)
+
         # debugging, etc.
-        self.breakpoints: set[int] = set[int]()  # empty set of breakpoints
+        self.breakpoints: dict[int, Breakpoint] = {}  # by address, conditions are only evaluated when the pc matches
         self.halted: bool = False  # hardware halt
         self.running = False  # true only while the run loop is active
+        self._pause = False  # set by pause(), checked by the run loop between slices
+        self.clock = Clock(0 if replaying else clock_hz)  # paces the run loop, unlimited by default
+        self.symbols: SymbolTable | None = None  # labels and source lines, from jasm --symbols
+        self.profiler: Profiler | None = None  # guest hot-spot profiler, off by default
+        self.opstats: OpcodeStats | None = None  # per-opcode counts and handler times, off by default
+        self.host_profiler: HostProfiler | None = None  # cProfile around the run loop, off by default
+        self.heatmap: MemoryHeatmap | None = None  # per-page memory access counters, off by default
+        self.device_stats: DeviceStats | None = None  # per-device tick/mmio accounting, off by default
+        self.sysprof: SyscallProfiler | None = None  # per-syscall costs, needs the kernel's symbols
+        self.tracer: TraceWriter | None = None  # binary execution trace, off by default
+        self.history: History | None = None  # checkpoints for reverse debugging, off by default
+        self.coverage: Coverage | None = None  # executed-pc bitmaps per bank, off by default
+        self.events: Events | None = None  # callbacks for embedders, see events.py
+
+        # counters, kept by the run loop once per slice
+        self.cycles: int = 0  # instructions executed since creation (one cycle each)
+        self.stats = RunStats()
 
         # registers
         self.reg: dict[str, Register] = {reg: Register(reg, 0) for reg in REGISTERS}
@@ -57,22 +107,43 @@ class Emulator:
         # set stack pointer to 0xfdff as recommended by the spec
         self.sp.set(0xfdff)
 
-        # memory bus and devices
-        self.bus = MemoryBus(lambda: self.mb.value, self.mmio_read, self.mmio_write)
+        # memory bus (private memory, or storage shared with another process), interrupt controller, and devices
+        # a memory image starts memory out with its contents, shared copy-on-write with other emulators
+        self._mapping: memoryview | None = None  # the image's mapping, which this emulator owns and close() unmaps
+        if memory_image is not None:
+            if storage is not None:
+                raise EmulatorException("an emulator's memory can come from storage or a memory image, not both.")
+            storage = self._mapping = memory_image.map()
+        self.bus = MemoryBus(lambda: self.mb.value, self.mmio_read, self.mmio_write, storage)
+        self.interrupts = InterruptController()
         self.devices: list[Device] = []
-        if enabled_devices.get("pit", False): self.devices.append(PIT())
-        if enabled_devices.get("rtc", False): self.devices.append(RTC())
-        if enabled_devices.get("disk", False): self.devices.append(Disk(image_file, self.bus))
+        if enabled_devices.get("pit", False): self.devices.append(PIT(self.interrupts.request))
+        if enabled_devices.get("rtc", False): self.devices.append(RTC(self.inputs.now if self.inputs else time.localtime))
+        if enabled_devices.get("disk", False): self.devices.append(Disk(image_file, self.bus, self.interrupts.request))
+
+        # graphics and keyboard device (two-in-one via pygame).
+        # while recording, keys are staged by the recorder before they reach the keyboard.
+        self.key_queue: deque[int] = deque()
+        self.graphics: Graphics | None = None
+        graphics = enabled_devices.get("graphics", False)
+        if graphics and not replaying:
+            from .devices.graphics import Graphics  # pygame is only loaded when there's a window to open
+            self.graphics = Graphics(self.inputs.keys if self.inputs else self.key_queue, self.bus.vram_view, lambda: self.running, self.shutdown)
+            self.devices.append(self.graphics)
+        if graphics or replaying:
+            self.devices.append(Keyboard(self.key_queue))
+
+        # handlers keyed by mnemonic; dispatch via OPCODE_FORMATS[opcode].mnemonic.
+        # each emulator gets its own copy, so tools can hook handlers per instance.
+        from .handlers import handler_map
+        self.handlers: dict[INSTRUCTIONS, Callable[[Emulator, tuple[int, ...]], None]] = dict(handler_map)
 
-        # graphics and keyboard device (two-in-one via pygame)
-        if enabled_devices.get("graphics", False):
-            _key_queue = deque()
-            self.devices.append(Graphics(_key_queue, self.bus.vram_view, lambda: self.running, self.shutdown))
-            self.devices.append(Keyboard(_key_queue))
+    # hooks, for tools that wrap the emulator's methods and handlers (see hooks.py)
+    def hook(self, name: str, wrapper: Callable) -> Hook:
+        return install(self, name, wrapper)
 
-        # handlers keyed by mnemonic; dispatch via OPCODE_FORMATS[opcode].mnemonic
-        from .handlers import handler_map
-        self.handlers: dict[INSTRUCTIONS, Callable[[Emulator, tuple[int, ...]], None]] = handler_map
+    def hook_handler(self, mnemonic: INSTRUCTIONS, wrapper: Callable[["Emulator", tuple[int, ...]], None]) -> Hook:
+        return install_item(self, self.handlers, mnemonic, wrapper)
 
     # memory
     def load_binary(self, file: str, addr: int = 0):
@@ -153,6 +224,7 @@ class Emulator:
             register.set(0)
         self.sp.set(0xFDFF)
         self.halted = False
+        self.interrupts.reset()
 
         for device in self.devices:
             device.reset()
@@ -160,10 +232,64 @@ class Emulator:
         logger.info("emulator reset!")
 
 
+    def snapshot(self) -> Snapshot:
+        return Snapshot(
+            registers=tuple(register.value for register in self.reg.values()),
+            memory=bytes(self.bus.memory),
+            vram=bytes(self.bus.vram),
+            banks=tuple(bytes(bank) for bank in self.bus.banks),
+            cycles=self.cycles,
+            halted=self.halted,
+            pending_interrupts=self.interrupts.pending,
+        )
+
+
+    def restore(self, snapshot: Snapshot) -> None:
+        for register, value in zip(self.reg.values(), snapshot.registers):
+            register.set(value)
+
+        # copy into the existing buffers, devices hold views of them
+        self.bus.memory[:] = snapshot.memory
+        self.bus.vram[:] = snapshot.vram
+        for bank, data in zip(self.bus.banks, snapshot.banks):
+            bank[:] = data
+
+        self.cycles = snapshot.cycles
+        self.halted = snapshot.halted
+        self.interrupts.pending = snapshot.pending_interrupts
+
+
     def shutdown(self) -> None:
         print("shutting down...")
+        self.close()
         sys.exit(0)
 
+
+    def close(self) -> None:
+        # finish anything that has to outlive the session, i.e. the input recording
+        if self.inputs is not None:
+            self.inputs.close(self.cycles)
+        if self.tracer is not None:
+            self.tracer.close()
+            self.tracer = None
+        if self.host_profiler is not None and self.host_profiler.path:
+            logger.info(f"saved host profile to {self.host_profiler.save()}.")
+            self.host_profiler = None
+        if self.coverage is not None and self.coverage.path and self.symbols is not None:
+            files = self.coverage.export_lcov(self.coverage.path, self.symbols)
+            logger.info(f"saved line coverage of {files} files to {self.coverage.path}.")
+            self.coverage = None
+        if self._mapping is not None:
+            # storage passed in is its owner's to release, a mapped image is ours
+            mapping, self._mapping = self._mapping, None
+            self.bus.release()
+            mmapped = mapping.obj
+            mapping.release()
+            try:
+                mmapped.close()
+            except BufferError:
+                pass  # a view handed out by the bus (i.e. read_block) is still alive, the mapping goes with it
+
     # main fetch/decode
 
     def fetch(self) -> int:
@@ -191,42 +317,207 @@ class Emulator:
 
     # main run loop
 
-    def run(self) -> None:
+    def run(self, max_instructions: int | None = None, until: int | Callable[["Emulator"], object] | None = None) -> RunResult:
+        """Run until something stops execution, and say what it was.
+
+        max_instructions -- stop with LIMIT after this many instructions
+        until -- an address to stop at, or a predicate checked before every instruction
+
+        never raises for the guest's sake: halts, breakpoints, invalid instructions,
+        ctrl+c and emulator bugs all come back as the result's reason.
+        """
+        started_cycles, started = self.cycles, perf_counter()
+        reason, message, error = StopReason.LIMIT, f"ran {max_instructions} instructions", None
+        restore_until = self._set_until(until)
+
+        # pygame belongs to the thread that opened the window. a run on a worker leaves it alone.
+        graphics = self.graphics if self.graphics is not None and self.graphics.thread == get_ident() else None
 
         self.running = True
+        self.clock.start()
+        if self.host_profiler is not None:
+            self.host_profiler.enable()
         try:
-            while True:
-                # normal execution
-                time.sleep(0)
-                self.step()
+            while max_instructions is None or self.cycles - started_cycles < max_instructions:
+                if self._pause:
+                    raise Stop(StopReason.INTERRUPTED, "paused")
+                # run a slice of instructions, then let the clock catch up
+                budget = self.clock.slice_size
+                if max_instructions is not None:
+                    budget = min(budget, max_instructions - (self.cycles - started_cycles))
+                executed = self._run_slice(budget)
+                if graphics is not None:
+                    graphics.refresh()
+                self.clock.pace(executed)
+        except Stop as e:
+            # halts, breakpoints, until and callbacks
+            reason, message = e.reason, e.message
         except EmulatorException as e:
-            # we enter exceptional control flow either if something went wrong,
-            # or if the user interrupts the program
-            logger.error(f"emulator stopped: {e.message} (at 0x{self.pc.value:04X}).")
-        except KeyboardInterrupt:
-            # prevent ctrl+c from bubbling up to the __main__() function,
-            # allowing easy program interruption, etc. while allowing the repl to persist
-            logger.info("! execution stopped (user interrupt).")
+            # the guest did something the machine can't do
+            reason, message, error = StopReason.ERROR, e.message, e
+        except KeyboardInterrupt as e:
+            # keep ctrl+c from bubbling up, so the repl persists
+            reason, message, error = StopReason.INTERRUPTED, "user interrupt", e
         except Exception as e:
-            # general exception. this is an emulator code error, 
+            # general exception. this is an emulator code error,
             # not an assembly error. allow the repl to persist.
-            logger.error(f"fatal! while running instruction at 0x{(self.pc.value)}:\n{traceback.format_exc()}")
+            import traceback  # only needed here, and slow to import at startup
+            reason, message, error = StopReason.FATAL, traceback.format_exc(), e
         finally:
+            if self.host_profiler is not None:
+                self.host_profiler.disable()
             self.running = False
+            self._pause = False
+            # a stop that was asked for but never reached an instruction boundary is dropped
+            pending = self.events.take_pending() if self.events is not None else None
+            restore_until()
+
+        if pending is not None and reason is StopReason.LIMIT:
+            # the limit landed right after the instruction whose callback asked to stop
+            reason, message = StopReason.CALLBACK, pending
+        if self.events is not None:
+            self.events.stopped(reason)
+
+        return RunResult(reason, message, self.pc.value, self.cycles - started_cycles, self.cycles, perf_counter() - started, error)
+
+
+    def pause(self) -> None:
+        # safe from any thread: a run in progress stops at its next slice boundary
+        self._pause = True
+
+
+    def _set_until(self, until: int | Callable[["Emulator"], object] | None) -> Callable[[], None]:
+        # install the until condition for one run. returns a function that removes it again.
+        if until is None:
+            return lambda: None
+
+        address = until & 0xFFFF if isinstance(until, int) else None
+        replaced = target = None
+
+        if address is not None:
+            # an address is just a temporary breakpoint, which costs nothing per instruction
+            replaced = self.breakpoints.get(address)
+            target = self.breakpoints[address] = Breakpoint(address)
+
+            def checked() -> None:
+                try:
+                    hook.inner()
+                except Stop as e:
+                    if e.reason is StopReason.BREAKPOINT and self.breakpoints.get(self.pc.value) is target:
+                        raise Stop(StopReason.UNTIL, f"reached 0x{address:04X}")
+                    raise
+        else:
+            predicate = until
+
+            def checked() -> None:
+                hook.inner()
+                if predicate(self):
+                    raise Stop(StopReason.UNTIL, "until condition holds")
+
+        def remove() -> None:
+            hook.remove()
+            if address is not None and self.breakpoints.get(address) is target:
+                if replaced is None:
+                    del self.breakpoints[address]
+                else:
+                    self.breakpoints[address] = replaced
+
+        hook = self.hook("_check_overrides", checked)
+        return remove
+
+
+    def _run_slice(self, count: int) -> int:
+        # execute up to count instructions back to back. the cycle counter and host
+        # timing are only updated once per slice, so they cost nothing per instruction.
+        # returns the number of instructions that completed, even if one of them raised.
+        if count <= 0:
+            return 0
+
+        step = self._step
+        done = 0
+        started = perf_counter()
+        try:
+            if self.inputs is not None:
+                # deliver recorded/replayed inputs, which may cut the slice short
+                count = self.inputs.sync(self, count)
+            if self.profiler is not None:
+                # sample the pc, and end the slice where the next sample is due
+                count = self.profiler.sample(self, count)
+            if self.history is not None:
+                # take a checkpoint if one is due, and end the slice at the next one
+                count = self.history.sync(self, count)
+            if self.events is not None:
+                # fire periodic callbacks, and end the slice where the next one is due
+                count = self.events.sync(self, count)
+            if self.coverage is not None:
+                # slices start a block, the pc may have been moved since the last one (i.e. by the debugger)
+                self.coverage.enter(self.pc.value)
+            self._step_sampled()
+            done = 1
+            for done in range(1, count):
+                step()
+            done = count
+        finally:
+            if self.coverage is not None:
+                # and end one, marking what ran of the block the slice stopped in
+                self.coverage.leave(self.pc.value)
+            self.cycles += done
+            self.stats.host_time += perf_counter() - started
+        return done
 
 
     def step(self) -> None:
+        # execute a single instruction
+        if self.host_profiler is None:
+            self._run_slice(1)
+            return
+
+        self.host_profiler.enable()
+        try:
+            self._run_slice(1)
+        finally:
+            self.host_profiler.disable()
+
+
+    def _step(self) -> None:
+        self._check_overrides()
+        self._tick_devices()
+        self._execute()
 
+
+    def _step_sampled(self) -> None:
+        # same as _step(), but times the device and cpu halves separately.
+        # the run loop does this once per slice to estimate where host time goes.
+        self._check_overrides()
+        started = perf_counter()
+        self._tick_devices()
+        ticked = perf_counter()
+        self._execute()
+        self.stats.sampled_device_time += ticked - started
+        self.stats.sampled_cpu_time += perf_counter() - ticked
+
+
+    def _check_overrides(self) -> None:
         # hardware-level overrides
         if self.halted:
-            raise EmulatorException("halted")
-        if self.pc.value in self.breakpoints:
-            raise EmulatorException(f"hit breakpoint at {self.pc}")
-
-        # tick all devices
+            raise Stop(StopReason.HALTED, "halted")
+        # take an irq the last instruction's ticks raised before looking at the pc, so that breakpoints
+        # and until see the handler's first instruction. a single integer test keeps the no-interrupt case cheap
+        if self.interrupts.pending and self.f.value & (1 << FLAG_I):
+            self.interrupt(self.interrupts.acknowledge())
+        # one lookup, the repl thread may add or clear breakpoints between two
+        breakpoint = self.breakpoints.get(self.pc.value)
+        if breakpoint is not None and breakpoint.hit():
+            raise Stop(StopReason.BREAKPOINT, f"hit breakpoint at {self.pc}")
+
+
+    def _tick_devices(self) -> None:
+        # irqs raised here are delivered by the next instruction's _check_overrides
         for device in self.devices:
             device.tick()
 
+
+    def _execute(self) -> None:
         # normal fetch/decode/execute
         decoded = self.decode()
         opcode = decoded[0]
@@ -239,6 +530,16 @@ class Emulator:
 
         self.handlers[OPCODE_FORMATS[opcode].mnemonic](self, decoded)
 
+    # interrupts
+
+    def interrupt(self, vector: int) -> None:
+        # save flags and return address, mask further interrupts, then jump through the vector table.
+        # IRET undoes this, restoring the interrupt flag along with the rest of F.
+        self._push_core(self.f.value)
+        self._push_core(self.pc.value)
+        self.flag_set(FLAG_I, False)
+        self.pc.set(self.bus.read16(IVT_START + (vector & 0xFF)))
+
     # core helpers
 
     @staticmethod
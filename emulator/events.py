@@ -0,0 +1,186 @@
+# events.py
+# stop reasons, run results and callbacks for driving the emulator from python.
+# josiah bergen, october 2026
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from .exceptions import EmulatorException
+from .hooks import Hook
+
+if TYPE_CHECKING:
+    from .conditions import Breakpoint
+    from .emulator import Emulator
+
+
+class StopReason(Enum):
+    LIMIT = "limit"  # ran max_instructions
+    UNTIL = "until"  # the until address or predicate was reached
+    HALTED = "halted"
+    BREAKPOINT = "breakpoint"
+    CALLBACK = "callback"  # an mmio or periodic callback asked to stop
+    REPLAY_END = "replay end"  # a replayed recording ran out of inputs
+    ERROR = "error"  # the guest did something invalid, i.e. an unknown opcode
+    INTERRUPTED = "interrupted"  # ctrl+c
+    FATAL = "fatal"  # a bug in the emulator itself, error holds the exception
+
+
+class Stop(EmulatorException):
+    """Raised at an instruction boundary to end a run for a known reason."""
+
+    def __init__(self, reason: StopReason, message: str):
+        self.reason: StopReason = reason
+        super().__init__(message)
+
+
+@dataclass(frozen=True)
+class RunResult:
+    reason: StopReason
+    message: str
+    pc: int  # where execution stopped, the next instruction to run
+    instructions: int  # executed by this run
+    cycles: int  # executed since the emulator was created
+    seconds: float  # wall time of this run
+    error: BaseException | None = None  # the exception behind an ERROR or FATAL stop
+
+    @property
+    def ips(self) -> float:
+        return self.instructions / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.reason.value}: {self.message} (at 0x{self.pc:04X}, {self.instructions:,} instructions in {self.seconds:.3f}s)"
+
+
+# callback signatures. mmio and periodic callbacks may return a truthy value to end the run.
+HaltCallback = Callable[["Emulator"], object]
+BreakpointCallback = Callable[["Emulator", "Breakpoint"], object]
+MmioCallback = Callable[["Emulator", int, int, bool], object]  # (emu, addr, value, is_write)
+PeriodicCallback = Callable[["Emulator"], object]
+
+
+class Events:
+    def __init__(self, emu: "Emulator"):
+        """Callbacks into python at a chosen granularity, instead of once per step.
+
+        halt and breakpoint callbacks are told about a stop once the run ends.
+        mmio callbacks fire on accesses to the watched addresses, and periodic ones
+        every n cycles from the run loop's slice boundaries. either kind can end the
+        run by returning a truthy value, which stops before the next instruction.
+        nothing is hooked until a callback that needs it is added, and emu.cycles
+        is only brought up to date between slices, as everywhere else.
+        """
+        self.emu = emu
+        self.bus = emu.bus
+        self.halt: list[HaltCallback] = []
+        self.breakpoint: list[BreakpointCallback] = []
+        self.mmio: dict[int, list[MmioCallback]] = {}
+        self.periodic: list[list] = []  # [next due cycle, every, callback]
+        self.pending: str | None = None  # why a callback asked to stop, until the run does
+        self._hooks: list[Hook] = []  # the mmio hooks, installed with the first mmio callback
+        self._stop_hook: Hook | None = None  # the one-shot stop, while one is pending
+
+    # registration
+
+    def on_halt(self, callback: HaltCallback) -> None:
+        self.halt.append(callback)
+
+    def on_breakpoint(self, callback: BreakpointCallback) -> None:
+        self.breakpoint.append(callback)
+
+    def on_mmio(self, addresses: int | Iterable[int], callback: MmioCallback) -> None:
+        for addr in [addresses] if isinstance(addresses, int) else addresses:
+            self.mmio.setdefault(addr & 0xFFFF, []).append(callback)
+        if not self._hooks:
+            self._hook()
+
+    def every(self, cycles: int, callback: PeriodicCallback) -> None:
+        if cycles <= 0:
+            raise EmulatorException(f"expected a positive cycle count, got {cycles}.")
+        self.periodic.append([self.emu.cycles + cycles, cycles, callback])
+
+    # hooks
+
+    def _hook(self) -> None:
+        bus, watched = self.bus, self.mmio
+
+        def watched_mmio_read(addr: int) -> int:
+            value = mmio_read.inner(addr)
+            if addr in watched:
+                self._notify(watched[addr], addr, value, False)
+            return value
+
+        def watched_mmio_write(addr: int, value: int) -> None:
+            mmio_write.inner(addr, value)
+            if addr in watched:
+                self._notify(watched[addr], addr, value, True)
+
+        mmio_read = bus.hook("mmio_read", watched_mmio_read)
+        mmio_write = bus.hook("mmio_write", watched_mmio_write)
+        self._hooks = [mmio_read, mmio_write]
+
+    def _notify(self, callbacks: list[MmioCallback], addr: int, value: int, is_write: bool) -> None:
+        for callback in callbacks:
+            if callback(self.emu, addr, value & 0xFFFF, is_write):
+                self.request_stop(f"mmio {'write' if is_write else 'read'} at 0x{addr:04X}")
+
+    def request_stop(self, message: str) -> None:
+        """End the current run before the next instruction. Safe to call mid-instruction."""
+        if self.pending is not None:
+            return
+        self.pending = message
+
+        # a one-shot override, so that the instruction in flight still completes
+        def stop_here() -> None:
+            self._clear_pending()
+            raise Stop(StopReason.CALLBACK, message)
+
+        self._stop_hook = self.emu.hook("_check_overrides", stop_here)
+
+    def _clear_pending(self) -> None:
+        if self._stop_hook is not None:
+            self._stop_hook.remove()
+            self._stop_hook = None
+        self.pending = None
+
+    def take_pending(self) -> str | None:
+        """Drop a stop that was requested too late for the run that just ended, returning its message."""
+        message = self.pending
+        if message is not None:
+            self._clear_pending()
+        return message
+
+    def sync(self, emu: "Emulator", budget: int) -> int:
+        # fire the periodic callbacks that are due, and end the slice where the next one is
+        if not self.periodic:
+            return budget
+        for entry in self.periodic:
+            if entry[0] <= emu.cycles:
+                entry[0] = emu.cycles + entry[1]
+                if entry[2](emu):
+                    raise Stop(StopReason.CALLBACK, f"periodic callback at cycle {emu.cycles:,}")
+        return max(1, min(budget, min(entry[0] for entry in self.periodic) - emu.cycles))
+
+    def stopped(self, reason: StopReason) -> None:
+        # tell the halt and breakpoint callbacks about the stop that ended a run
+        emu = self.emu
+        if reason is StopReason.HALTED:
+            for callback in self.halt:
+                callback(emu)
+        elif reason is StopReason.BREAKPOINT:
+            breakpoint = emu.breakpoints.get(emu.pc.value)
+            if breakpoint is not None:
+                for callback in self.breakpoint:
+                    callback(emu, breakpoint)
+
+    def stop(self) -> None:
+        if self.pending is not None:
+            self.take_pending()
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = []
+        self.halt.clear()
+        self.breakpoint.clear()
+        self.mmio.clear()
+        self.periodic.clear()
@@ -2,8 +2,9 @@ from typing import Callable
 
 from common.isa import INSTRUCTIONS, MODES, OPCODE_FORMATS
 
-from .constants import FLAG_C, FLAG_N, FLAG_O, FLAG_Z
+from .constants import FLAG_C, FLAG_I, FLAG_N, FLAG_O, FLAG_Z
 from .emulator import Emulator, mask16
+from .events import Stop, StopReason
 from .exceptions import EmulatorException
 from .util.logger import logger
 
@@ -26,7 +27,7 @@ def _jump_target(emu: Emulator, imm16: int) -> int:
 
 def handle_halt(emu, _decoded: tuple[int, ...]) -> None:
     emu.halted = True
-    raise EmulatorException("halted")
+    raise Stop(StopReason.HALTED, "halted")
 
 
 def handle_get(emu, decoded: tuple[int, ...]) -> None:
@@ -391,6 +392,32 @@ def handle_bcp(emu, decoded: tuple[int, ...]) -> None:
         emu.bus.write16(dst + i * 2, value)
 
 
+def handle_int(emu, decoded: tuple[int, ...]) -> None:
+    opcode, reg_a, reg_b, imm16 = decoded
+    modes = OPCODE_FORMATS[opcode].modes
+    # software interrupts ignore the interrupt flag
+    if modes == (MODES.REG,):
+        emu.interrupt(emu.reg_get(reg_a))
+    elif modes == (MODES.IMM,):
+        emu.interrupt(imm16)
+    else:
+        raise EmulatorException(f"unexpected INT variant at 0x{emu.pc.value:04x}.")
+
+
+def handle_iret(emu, _decoded: tuple[int, ...]) -> None:
+    # pop in the reverse order of Emulator.interrupt()
+    emu.pc.set(emu._pop_core())
+    emu.f.set(emu._pop_core())
+
+
+def handle_cli(emu, _decoded: tuple[int, ...]) -> None:
+    emu.flag_set(FLAG_I, False)
+
+
+def handle_sti(emu, _decoded: tuple[int, ...]) -> None:
+    emu.flag_set(FLAG_I, True)
+
+
 handler_map: dict[INSTRUCTIONS, Callable[[Emulator, tuple[int, ...]], None]] = {
     INSTRUCTIONS.HALT : handle_halt,
     INSTRUCTIONS.GET  : handle_get,
@@ -435,4 +462,8 @@ handler_map: dict[INSTRUCTIONS, Callable[[Emulator, tuple[int, ...]], None]] = {
     INSTRUCTIONS.RET  : handle_ret,
     INSTRUCTIONS.NOP  : handle_nop,
     INSTRUCTIONS.BCP : handle_bcp,
+    INSTRUCTIONS.INT  : handle_int,
+    INSTRUCTIONS.IRET : handle_iret,
+    INSTRUCTIONS.CLI  : handle_cli,
+    INSTRUCTIONS.STI  : handle_sti,
 }
@@ -0,0 +1,142 @@
+# heatmap.py
+# per-page memory access counters for the memory bus.
+# josiah bergen, october 2026
+
+from array import array
+from collections import Counter
+
+from .bus import MemoryBus
+from .constants import (
+    BANK_SIZE,
+    BANK_WINDOW_END,
+    BANK_WINDOW_START,
+    MEMORY_SIZE,
+    MMIO_BASE,
+    MMIO_END,
+    NUM_BANKS,
+    PAGE_WORDS,
+    ROM_END,
+    VRAM_END,
+    VRAM_SIZE,
+    VRAM_START,
+)
+
+# (region, first cpu address, page count). bank n is only visible through the bank window.
+REGIONS: list[tuple[str, int, int]] = [
+    ("memory", 0, MEMORY_SIZE // 2 // PAGE_WORDS),
+    ("vram", VRAM_START, VRAM_SIZE // 2 // PAGE_WORDS),
+    *((f"bank {bank}", BANK_WINDOW_START, BANK_SIZE // 2 // PAGE_WORDS) for bank in range(1, NUM_BANKS + 1)),
+]
+
+
+class MemoryHeatmap:
+    def __init__(self, bus: MemoryBus):
+        """Counts reads and writes per 256-word page of main memory, vram and every bank,
+        along with rom write attempts and mmio accesses per register.
+
+        the counters are installed by hooking read16/write16 on this bus instance,
+        and removed again by stop(), so the bus costs nothing extra when this is off.
+        peek16 and load_bytes are debugger accesses and are never counted.
+        """
+        self.bus = bus
+        self.reads = {name: array("Q", bytes(8 * pages)) for name, _, pages in REGIONS}
+        self.writes = {name: array("Q", bytes(8 * pages)) for name, _, pages in REGIONS}
+        self.rom_writes: Counter[int] = Counter()
+        self.mmio_reads: Counter[int] = Counter()
+        self.mmio_writes: Counter[int] = Counter()
+        self.running = True
+        self._hook()
+
+    def _region(self, address: int, bank: int | None) -> tuple[str, int]:
+        # mirrors MemoryBus.resolve_storage(), but returns a region and page instead of bytes
+        if VRAM_START <= address <= VRAM_END:
+            return "vram", (address - VRAM_START) // PAGE_WORDS
+
+        selected_bank = self.bus.current_bank() if bank is None else bank
+        selected_bank %= (NUM_BANKS + 1)
+        if selected_bank and BANK_WINDOW_START <= address <= BANK_WINDOW_END:
+            return f"bank {selected_bank}", (address - BANK_WINDOW_START) // PAGE_WORDS
+
+        return "memory", address // PAGE_WORDS
+
+    def _hook(self) -> None:
+        def counted_read16(address: int, *, bank: int | None = None) -> int:
+            address &= 0xFFFF
+            if MMIO_BASE <= address <= MMIO_END:
+                self.mmio_reads[address] += 1
+            else:
+                region, page = self._region(address, bank)
+                self.reads[region][page] += 1
+            return read16.inner(address, bank=bank)
+
+        def counted_write16(address: int, value: int, *, bank: int | None = None) -> None:
+            address &= 0xFFFF
+            if MMIO_BASE <= address <= MMIO_END:
+                self.mmio_writes[address] += 1
+            elif address <= ROM_END:
+                self.rom_writes[address] += 1
+            else:
+                region, page = self._region(address, bank)
+                self.writes[region][page] += 1
+            write16.inner(address, value, bank=bank)
+
+        read16 = self.bus.hook("read16", counted_read16)
+        write16 = self.bus.hook("write16", counted_write16)
+        self._hooks = [read16, write16]
+
+    def stop(self) -> None:
+        # only our own hooks come out, anything installed after us (history, trace) stays
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = []
+        self.running = False
+
+    def reset(self) -> None:
+        for counters in (*self.reads.values(), *self.writes.values()):
+            counters[:] = array("Q", bytes(8 * len(counters)))
+        self.rom_writes.clear()
+        self.mmio_reads.clear()
+        self.mmio_writes.clear()
+
+    def pages(self) -> list[tuple[str, int, int, int]]:
+        """(region, page address, reads, writes) for every touched page, busiest first."""
+        rows = []
+        for name, start, pages in REGIONS:
+            reads, writes = self.reads[name], self.writes[name]
+            for page in range(pages):
+                if reads[page] or writes[page]:
+                    rows.append((name, start + page * PAGE_WORDS, reads[page], writes[page]))
+        return sorted(rows, key=lambda row: -(row[2] + row[3]))
+
+    def report(self, top: int = 10, owners: dict[int, str] | None = None) -> list[str]:
+        """owners -- optional names for mmio registers, i.e. the device that owns them"""
+        owners = owners or {}
+        rows = self.pages()
+        if not rows and not self.mmio_reads and not self.mmio_writes and not self.rom_writes:
+            return ["heatmap: no memory accesses yet."]
+
+        reads = sum(row[2] for row in rows)
+        writes = sum(row[3] for row in rows)
+        lines = [f"heatmap: {reads:,} reads and {writes:,} writes over {len(rows)} pages", "hottest pages:"]
+        for region, address, page_reads, page_writes in rows[:top]:
+            lines.append(f"  {region:<8} 0x{address:04X}-0x{address + PAGE_WORDS - 1:04X}  {page_reads:>10,} r  {page_writes:>10,} w")
+
+        # region totals make bank and vram traffic easy to spot at a glance
+        lines.append("by region:")
+        for name, _, _ in REGIONS:
+            region_reads, region_writes = sum(self.reads[name]), sum(self.writes[name])
+            if region_reads or region_writes:
+                lines.append(f"  {name:<8} {region_reads:>10,} r  {region_writes:>10,} w")
+
+        if self.rom_writes:
+            lines.append(f"rom write attempts: {sum(self.rom_writes.values()):,}")
+            for address, count in self.rom_writes.most_common(top):
+                lines.append(f"  0x{address:04X}  {count:>10,}")
+
+        if self.mmio_reads or self.mmio_writes:
+            lines.append("mmio:")
+            for address in sorted(set(self.mmio_reads) | set(self.mmio_writes)):
+                owner = owners.get(address, "unmapped")
+                lines.append(f"  0x{address:04X} {owner:<10} {self.mmio_reads[address]:>10,} r  {self.mmio_writes[address]:>10,} w")
+
+        return lines
@@ -0,0 +1,359 @@
+# history.py
+# execution history for reverse debugging: checkpoints plus deterministic re-execution.
+# josiah bergen, october 2026
+
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from .constants import (
+    BANK_SIZE,
+    BANK_WINDOW_END,
+    BANK_WINDOW_START,
+    MEMORY_SIZE,
+    MMIO_BASE,
+    MMIO_END,
+    NUM_BANKS,
+    PAGE_WORDS,
+    VRAM_END,
+    VRAM_SIZE,
+    VRAM_START,
+)
+from .devices.keyboard import Keyboard
+from .devices.rtc import RTC
+from .exceptions import EmulatorException
+from .snapshot import device_state, restore_device_state
+
+if TYPE_CHECKING:
+    from .emulator import Emulator
+
+PAGE_BYTES = PAGE_WORDS * 2
+
+# pages are keyed by (storage, page). storage 0 is main memory, 1 is vram, 2.. are the banks.
+Page = tuple[int, int]
+
+# devices fed by the outside world. their reads are journaled instead of their state being saved.
+VOLATILE_DEVICES = (Keyboard, RTC)
+
+
+@dataclass
+class Checkpoint:
+    cycle: int
+    registers: tuple[int, ...]
+    halted: bool
+    pending_interrupts: int
+    devices: list[dict[str, object]]
+    journal: dict[int, int]  # position in each address's volatile read journal
+    pages: dict[Page, bytes] = field(default_factory=dict)  # pages dirtied since the previous checkpoint
+
+
+class Journal:
+    def __init__(self):
+        """The values one volatile mmio address returned, in order, run-length encoded.
+
+        an idle guest polls the same status register over and over and gets the same
+        answer, so a run of identical reads costs one entry however long it gets.
+        """
+        self.values = array("H")  # the value of each run
+        self.ends = array("Q")  # the position just past each run
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, position: int) -> int:
+        return self.values[bisect_right(self.ends, position)]
+
+    def append(self, value: int) -> None:
+        self.length += 1
+        if self.values and self.values[-1] == value:
+            self.ends[-1] = self.length
+        else:
+            self.values.append(value)
+            self.ends.append(self.length)
+
+    def truncate(self, position: int) -> None:
+        # forget every read from position on
+        if position >= self.length:
+            return
+        index = bisect_right(self.ends, position)
+        start = self.ends[index - 1] if index else 0
+        keep = index + 1 if position > start else index  # the run position falls in, unless it would be empty
+        del self.values[keep:]
+        del self.ends[keep:]
+        if keep > index:
+            self.ends[index] = position
+        self.length = position
+
+    def runs(self) -> int:
+        return len(self.values)
+
+
+class History:
+    def __init__(self, emu: "Emulator", interval: int = 20_000, max_checkpoints: int = 256):
+        """Keeps enough history to move execution to any earlier cycle.
+
+        every interval cycles a checkpoint saves the registers, device state and the
+        pages written since the last checkpoint (the first checkpoint saves everything).
+        seeking restores the closest checkpoint before the target and re-executes forward.
+        reads from the keyboard and rtc are journaled per address and fed back while re-executing,
+        so the guest sees exactly what it saw the first time.
+
+        when max_checkpoints is reached, checkpoints are merged into their successors so
+        that spacing grows with age. memory stays bounded and old history gets coarser.
+        the disk image itself is not rewound, only the controller's registers.
+        """
+        if emu.inputs is not None:
+            raise EmulatorException("reverse debugging can't be combined with --record or --replay.")
+
+        self.emu = emu
+        self.interval = max(1, interval)
+        self.max_checkpoints = max(4, max_checkpoints)
+        self.checkpoints: list[Checkpoint] = []
+        self.journals: dict[int, Journal] = {}  # values returned by volatile mmio reads, per address
+        self.cursor: dict[int, int] = {}  # next entry of each journal, behind its end while re-executing the past
+        self.present = emu.cycles  # the furthest cycle ever executed
+        self.running = True
+
+        self._dirty: set[Page] = set()
+        for device in emu.devices:
+            if isinstance(device, VOLATILE_DEVICES):
+                for addr in device.read_dispatch:
+                    self.journals[addr] = Journal()
+                    self.cursor[addr] = 0
+        self._stateful = [device for device in emu.devices if not isinstance(device, VOLATILE_DEVICES)]
+        self._hook()
+        self._checkpoint(full=True)
+
+    # hooks
+
+    def _hook(self) -> None:
+        bus = self.bus = self.emu.bus
+        dirty, journals, cursor = self._dirty, self.journals, self.cursor
+
+        def tracked_write16(address: int, value: int, *, bank: int | None = None) -> None:
+            write16.inner(address, value, bank=bank)
+            page = self._page(address & 0xFFFF, bank)
+            if page is not None:
+                dirty.add(page)
+
+        def journaled_mmio_read(addr: int) -> int:
+            journal = journals.get(addr)
+            if journal is None:
+                return mmio_read.inner(addr)
+            position = cursor[addr]
+            if position < journal.length:
+                value = journal[position]  # re-executing, replay what the guest saw
+            else:
+                value = mmio_read.inner(addr)
+                journal.append(value)
+            cursor[addr] = position + 1
+            return value
+
+        write16 = bus.hook("write16", tracked_write16)
+        mmio_read = bus.hook("mmio_read", journaled_mmio_read)
+        self._hooks = [write16, mmio_read]
+
+    def stop(self) -> None:
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = []
+        self.checkpoints.clear()
+        self.journals.clear()
+        self.running = False
+
+    def _page(self, address: int, bank: int | None) -> Page | None:
+        # mirrors MemoryBus.resolve_storage()
+        if MMIO_BASE <= address <= MMIO_END:
+            return None
+        if VRAM_START <= address <= VRAM_END:
+            return 1, (address - VRAM_START) // PAGE_WORDS
+        selected_bank = self.bus.current_bank() if bank is None else bank
+        selected_bank %= (NUM_BANKS + 1)
+        if selected_bank and BANK_WINDOW_START <= address <= BANK_WINDOW_END:
+            return 1 + selected_bank, (address - BANK_WINDOW_START) // PAGE_WORDS
+        return 0, address // PAGE_WORDS
+
+    def _storage(self, index: int) -> bytearray:
+        bus = self.bus
+        return bus.memory if index == 0 else bus.vram if index == 1 else bus.banks[index - 2]
+
+    # checkpoints
+
+    def sync(self, emu: "Emulator", budget: int) -> int:
+        """Take a checkpoint if one is due. Returns the next slice budget."""
+        cycle = emu.cycles
+        latest = self.checkpoints[-1]
+        if cycle <= latest.cycle:
+            # re-executing the past. reaching a checkpoint means memory matches it again
+            index = bisect_right(self.checkpoints, cycle, key=_cycle) - 1
+            if self.checkpoints[index].cycle == cycle:
+                self._dirty.clear()
+            if index + 1 < len(self.checkpoints):
+                return min(budget, self.checkpoints[index + 1].cycle - cycle)
+        elif cycle >= latest.cycle + self.interval:
+            self._checkpoint()
+            latest = self.checkpoints[-1]
+
+        self.present = max(self.present, cycle)
+        return min(budget, latest.cycle + self.interval - cycle)
+
+    def _checkpoint(self, full: bool = False) -> None:
+        emu = self.emu
+        if full:
+            sizes = [MEMORY_SIZE, VRAM_SIZE, *[BANK_SIZE] * NUM_BANKS]
+            pages = {(index, page) for index, size in enumerate(sizes) for page in range(size // PAGE_BYTES)}
+        else:
+            pages = self._dirty
+
+        self.checkpoints.append(Checkpoint(
+            cycle=emu.cycles,
+            registers=tuple(register.value for register in emu.reg.values()),
+            halted=emu.halted,
+            pending_interrupts=emu.interrupts.pending,
+            devices=[device_state(device) for device in self._stateful],
+            journal=dict(self.cursor),
+            pages={page: self._read_page(page) for page in pages},
+        ))
+        self._dirty.clear()
+
+        if len(self.checkpoints) > self.max_checkpoints:
+            self._thin()
+
+    def _thin(self) -> None:
+        # merge away the checkpoint whose neighbours are closest together for its age,
+        # so spacing grows in proportion to age and recent history stays quick to seek.
+        # a page saved at j and not written again before j+1 still has the same
+        # contents at j+1, so the merged checkpoint stays exact.
+        checkpoints = self.checkpoints
+        latest = checkpoints[-1].cycle
+
+        def crowding(index: int) -> float:
+            gap = checkpoints[index + 1].cycle - checkpoints[index - 1].cycle
+            return gap / (latest - checkpoints[index].cycle + self.interval)
+
+        index = min(range(1, len(checkpoints) - 1), key=crowding)
+        following = checkpoints[index + 1]
+        following.pages = {**checkpoints[index].pages, **following.pages}
+        del checkpoints[index]
+
+    def _read_page(self, page: Page) -> bytes:
+        start = page[1] * PAGE_BYTES
+        return bytes(self._storage(page[0])[start:start + PAGE_BYTES])
+
+    def _index_before(self, cycle: int) -> int:
+        # the latest checkpoint at or before cycle
+        index = bisect_right(self.checkpoints, cycle, key=_cycle) - 1
+        if index < 0:
+            raise EmulatorException(f"cycle {cycle:,} is before the start of the recorded history (cycle {self.checkpoints[0].cycle:,}).")
+        return index
+
+    def _restore(self, index: int) -> None:
+        emu = self.emu
+        target = self.checkpoints[index]
+        current = self._index_before(emu.cycles)
+
+        # every page written between the target and now goes back to its newest saved copy
+        stale = set(self._dirty)
+        for checkpoint in self.checkpoints[index + 1:current + 1]:
+            stale.update(checkpoint.pages)
+        for page in stale:
+            data = next(checkpoint.pages[page] for checkpoint in reversed(self.checkpoints[:index + 1]) if page in checkpoint.pages)
+            start = page[1] * PAGE_BYTES
+            self._storage(page[0])[start:start + PAGE_BYTES] = data
+
+        for register, value in zip(emu.reg.values(), target.registers):
+            register.set(value)
+        for device, state in zip(self._stateful, target.devices):
+            restore_device_state(device, state)
+        emu.cycles = target.cycle
+        emu.halted = target.halted
+        emu.interrupts.pending = target.pending_interrupts
+        self.cursor.update(target.journal)
+        self._dirty.clear()
+
+    # seeking
+
+    def goto(self, cycle: int) -> None:
+        """Move execution to exactly cycle, backwards or forwards. Breakpoints are ignored on the way."""
+        emu = self.emu
+        if cycle < emu.cycles:
+            self._restore(self._index_before(cycle))
+        self._run_to(cycle)
+
+    def _run_to(self, cycle: int) -> None:
+        emu = self.emu
+        breakpoints, emu.breakpoints = emu.breakpoints, {}
+        try:
+            while emu.cycles < cycle:
+                if not emu._run_slice(cycle - emu.cycles):
+                    break
+        except EmulatorException as e:
+            raise EmulatorException(f"stopped at cycle {emu.cycles:,} while seeking: {e.message}")
+        finally:
+            emu.breakpoints = breakpoints
+
+    def rcontinue(self) -> int | None:
+        """Move back to the most recent cycle that was stopped at a breakpoint. Returns it, if any."""
+        emu = self.emu
+        if not emu.breakpoints:
+            raise EmulatorException("there are no breakpoints to run back to.")
+
+        # re-executing the past shouldn't count as hitting the breakpoints again
+        hits = {address: breakpoint.hits for address, breakpoint in list(emu.breakpoints.items())}
+        try:
+            return self._rcontinue()
+        finally:
+            for address, count in hits.items():
+                breakpoint = emu.breakpoints.get(address)
+                if breakpoint is not None:
+                    breakpoint.hits = count
+
+    def _rcontinue(self) -> int | None:
+        emu = self.emu
+        end = emu.cycles
+        index = self._index_before(end - 1) if end else 0
+        while True:
+            # replay one checkpoint's worth of history, remembering the last breakpoint hit
+            start = self.checkpoints[index].cycle
+            self._restore(index)
+            hit = None
+            while emu.cycles < end:
+                try:
+                    emu._run_slice(end - emu.cycles)
+                except EmulatorException:
+                    if emu.pc.value not in emu.breakpoints or emu.cycles >= end:
+                        break
+                    hit = emu.cycles
+                    self._run_to(emu.cycles + 1)  # step over it
+
+            if hit is not None:
+                self.goto(hit)
+                return hit
+            if index == 0:
+                self.goto(end)
+                return None
+            end, index = start, index - 1
+
+    def forget_future(self) -> None:
+        """The past was edited, i.e. a register was set. What used to come next no longer applies."""
+        cycle = self.emu.cycles
+        self.checkpoints = [checkpoint for checkpoint in self.checkpoints if checkpoint.cycle <= cycle]
+        for addr, journal in self.journals.items():
+            journal.truncate(self.cursor[addr])
+        self.present = cycle
+
+    def report(self) -> list[str]:
+        first, last = self.checkpoints[0], self.checkpoints[-1]
+        saved = sum(len(checkpoint.pages) for checkpoint in self.checkpoints) * PAGE_BYTES
+        reads = sum(len(journal) for journal in self.journals.values())
+        runs = sum(journal.runs() for journal in self.journals.values())
+        return [
+            f"history: cycles {first.cycle:,} to {max(self.present, self.emu.cycles):,}, now at {self.emu.cycles:,}",
+            f"{len(self.checkpoints)} checkpoints (last at {last.cycle:,}), {saved / 1024:,.0f} KiB of pages, {reads:,} journaled reads in {runs:,} runs",
+        ]
+
+
+def _cycle(checkpoint: Checkpoint) -> int:
+    return checkpoint.cycle
@@ -0,0 +1,88 @@
+# hooks.py
+# chains of wrappers around emulator, bus and device methods, and instruction handlers.
+# josiah bergen, october 2026
+
+from collections.abc import Callable, MutableMapping
+from typing import Any
+
+_MISSING = object()
+
+
+class Hook:
+    def __init__(self, chain: "Chain", wrapper: Callable, inner: Callable):
+        """One wrapper in a chain, as returned by install().
+
+        the wrapper carries on by calling hook.inner, which always points at whatever is
+        below it (the next wrapper down, or the original), as other hooks come and go.
+        """
+        self.chain = chain
+        self.wrapper = wrapper
+        self.inner = inner
+
+    def remove(self) -> None:
+        # safe to call more than once, and from inside the wrapper itself
+        self.chain.remove(self)
+
+
+class Chain:
+    def __init__(self, registry: dict, slots: MutableMapping[Any, Any], key: Any, fallback: Callable):
+        """The wrappers installed on one slot, innermost first.
+
+        slots is an object's __dict__ (for a method) or a dict of callables (for a handler).
+        fallback is what the slot resolves to while it's empty, i.e. the bound class method.
+        """
+        self.registry = registry
+        self.slots = slots
+        self.key = key
+        self.original = slots.get(key, _MISSING)
+        self.fallback = fallback
+        self.hooks: list[Hook] = []
+
+    def push(self, wrapper: Callable) -> Hook:
+        hook = Hook(self, wrapper, self.slots.get(self.key, self.fallback))
+        self.slots[self.key] = wrapper
+        self.hooks.append(hook)
+        return hook
+
+    def remove(self, hook: Hook) -> None:
+        index = next((i for i, other in enumerate(self.hooks) if other is hook), None)
+        if index is None:
+            return
+
+        above = self.hooks[index + 1] if index + 1 < len(self.hooks) else None
+        if above is not None and above.inner is hook.wrapper:
+            above.inner = hook.inner  # take it out of the middle
+        elif self.slots.get(self.key) is hook.wrapper:
+            if hook.inner is self.fallback and self.original is _MISSING:
+                del self.slots[self.key]  # back to the class method
+            else:
+                self.slots[self.key] = hook.inner
+        # otherwise something installed by hand, not through install(), wraps this one
+        # and still calls it. there's no way to reach in, so it's left in place.
+
+        del self.hooks[index]
+        if not self.hooks:
+            del self.registry[(id(self.slots), self.key)]
+
+
+def _chain(owner: object, slots: MutableMapping[Any, Any], key: Any, fallback: Callable) -> Chain:
+    # chains live on the owner, so they go away with it
+    registry = owner.__dict__.setdefault("_hook_chains", {})
+    chain = registry.get((id(slots), key))
+    if chain is None:
+        chain = registry[(id(slots), key)] = Chain(registry, slots, key, fallback)
+    return chain
+
+
+def install(owner: object, name: str, wrapper: Callable) -> Hook:
+    """Shadow the method owner.name with wrapper, on top of any hooks already there.
+
+    hooks can be removed in any order. wrappers installed by hand (owner.name = ...)
+    are kept underneath, but one put on top by hand keeps whatever it wrapped alive.
+    """
+    return _chain(owner, owner.__dict__, name, getattr(owner, name)).push(wrapper)
+
+
+def install_item(owner: object, table: MutableMapping[Any, Callable], key: Any, wrapper: Callable) -> Hook:
+    """Like install(), for an entry of a dict of callables that belongs to owner, i.e. emulator.handlers."""
+    return _chain(owner, table, key, table[key]).push(wrapper)
@@ -0,0 +1,110 @@
+# hostprof.py
+# host-side profiling of the emulator's own run loop.
+# josiah bergen, october 2026
+
+import cProfile
+import os
+import pstats
+from collections import Counter
+
+# (file, line, function), the key pstats uses for every profiled function
+Function = tuple[str, int, str]
+
+
+def category(function: Function) -> str | None:
+    """Which part of the emulator a function belongs to, or None for builtins and
+    library code, whose time is charged to whoever called them."""
+    file, _, name = function
+    path = file.replace("\\", "/")
+    module = os.path.splitext(os.path.basename(path))[0]
+
+    if "/emulator/devices/" in path:
+        return f"device: {module}"
+    if path.endswith("/emulator/bus.py"):
+        return "bus"
+    if path.endswith("/emulator/emulator.py") and name in ("mmio_read", "mmio_write"):
+        return "mmio"
+    if "/emulator/" in path:
+        return "cpu" if module in ("emulator", "handlers", "register") else module
+    return None
+
+
+def overhead(function: Function, callers: dict) -> bool:
+    # the profiler switching itself on and off, which shouldn't show up in its own report
+    return category(function) == "hostprof" or bool(callers) and all(category(caller) == "hostprof" for caller in callers)
+
+
+class HostProfiler:
+    def __init__(self, path: str = ""):
+        """cProfile, switched on only while the run loop is executing.
+
+        the repl thread and the pygame pump on the main thread are never profiled,
+        so the report only covers dispatch, bus, mmio and device ticks.
+        path -- where to write the pstats file when the profiler is saved (optional)
+        """
+        self.path = path
+        self.profile = cProfile.Profile()
+        self.running = True
+
+    def enable(self) -> None:
+        if self.running:
+            self.profile.enable()
+
+    def disable(self) -> None:
+        self.profile.disable()
+
+    def stop(self) -> None:
+        self.running = False
+        self.profile.disable()
+
+    def stats(self) -> pstats.Stats | None:
+        try:
+            return pstats.Stats(self.profile)
+        except TypeError:
+            return None  # nothing was profiled yet
+
+    def save(self, path: str = "") -> str:
+        # pstats format, readable with `python -m pstats`, snakeviz, gprof2dot, etc.
+        path = path or self.path
+        self.profile.dump_stats(path)
+        return path
+
+    def breakdown(self) -> Counter[str]:
+        """Own (exclusive) time per emulator category, in seconds."""
+        stats = self.stats()
+        totals: Counter[str] = Counter()
+        if stats is None:
+            return totals
+
+        for function, (_, _, own, _, callers) in stats.stats.items():
+            if overhead(function, callers):
+                continue
+
+            owner = category(function)
+            if owner is not None:
+                totals[owner] += own
+                continue
+
+            # builtins (perf_counter, pygame, dict lookups...) bill their callers,
+            # split by the time spent on behalf of each one
+            for caller, (_, _, caller_own, _) in callers.items():
+                totals[category(caller) or "other"] += caller_own
+        return totals
+
+    def report(self, top: int = 15) -> list[str]:
+        stats = self.stats()
+        if stats is None:
+            return ["hostprof: nothing profiled yet."]
+
+        totals = self.breakdown()
+        total = sum(totals.values()) or 1.0
+        lines = [f"hostprof: {total:.3f}s profiled", "by component:"]
+        for name, seconds in totals.most_common():
+            lines.append(f"  {seconds / total * 100:5.1f}%  {seconds:8.3f}s  {name}")
+
+        lines.append("top functions (own time):")
+        ranked = sorted((item for item in stats.stats.items() if not overhead(item[0], item[1][4])), key=lambda item: -item[1][2])
+        for (file, line, name), (_, calls, own, _, _) in ranked[:top]:
+            where = f"{os.path.basename(file)}:{line}" if line else "built-in"
+            lines.append(f"  {own:8.3f}s  {calls:>10,}  {name} ({where})")
+        return lines
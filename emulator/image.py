@@ -0,0 +1,99 @@
+# image.py
+# read-only memory images (rom plus a loaded program), shared copy-on-write between emulators.
+# josiah bergen, october 2026
+
+import hashlib
+import mmap
+import os
+
+from tap import Tap
+
+from .bus import STORAGE_SIZE
+from .constants import MEMORY_SIZE, VRAM_START
+from .exceptions import EmulatorException
+from .util.cache import cache_directory
+from .util.logger import logger
+
+EXTENSION = ".jmem"
+
+
+class MemoryImage:
+    def __init__(self, path: str):
+        """A file holding all of memory, mapped copy-on-write as the memory of any number of emulators.
+
+        every map() shares the file's pages with the other mappings, in this process or any
+        other, until its emulator writes to a page and the os gives it a private copy of just
+        that page. rom and kernel text are only ever read, so they're held once per machine,
+        and vram and the banks are a hole in the file, so they cost nothing until they're used.
+        images are named by their digest, which also keys anything derived from their contents.
+        """
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            raise EmulatorException(f"memory image {path} does not exist.")
+        if size != STORAGE_SIZE:
+            raise EmulatorException(f"{path} is not a memory image, expected {STORAGE_SIZE} bytes and got {size}.")
+
+        self.path = path
+        self.digest = os.path.basename(path).removesuffix(EXTENSION)
+
+    @classmethod
+    def build(cls, program: bytes, address: int = 0, directory: str = "") -> "MemoryImage":
+        """Lay out memory with program loaded at address, as load_bytes() would, and save it once."""
+        if len(program) % 2:
+            raise EmulatorException("binary data must contain a whole number of 16-bit words.")
+        if address * 2 + len(program) > VRAM_START * 2:
+            raise EmulatorException(f"a memory image only covers main memory below vram (0x{VRAM_START:04X}).")
+
+        memory = bytearray(MEMORY_SIZE)
+        memory[address * 2:address * 2 + len(program)] = program
+        digest = hashlib.sha256(memory).hexdigest()[:32]
+
+        # content addressed, so an existing file is already right
+        directory = directory or cache_directory("images")
+        path = os.path.join(directory, digest + EXTENSION)
+        if not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            partial = f"{path}.{os.getpid()}.tmp"
+            with open(partial, "wb") as f:
+                f.write(memory)
+                f.truncate(STORAGE_SIZE)  # vram and banks, left sparse
+            os.replace(partial, path)
+        return cls(path)
+
+    @classmethod
+    def load(cls, binary: str, address: int = 0, directory: str = "") -> "MemoryImage":
+        with open(binary, "rb") as f:
+            return cls.build(f.read(), address, directory)
+
+    def map(self) -> memoryview:
+        # a private, copy-on-write mapping laid out as MemoryBus storage.
+        # the memoryview keeps it alive, bus.release() lets it go.
+        with open(self.path, "rb") as f:
+            return memoryview(mmap.mmap(f.fileno(), STORAGE_SIZE, access=mmap.ACCESS_COPY))
+
+    def __str__(self) -> str:
+        return f"memory image {self.digest} ({self.path})"
+
+
+class ImageArgumentParser(Tap):
+    """build a shared memory image from a binary, for Emulator(memory_image=MemoryImage(path))"""
+
+    binary: str  # the program to load
+    address: int = 0  # word address to load it at
+    directory: str = ""  # where to put the image (default: ~/.cache/jaide/images)
+
+    def configure(self):
+        self.add_argument("binary")
+
+
+if __name__ == "__main__":
+
+    args = ImageArgumentParser(underscores_to_dashes=True).parse_args()
+    try:
+        image = MemoryImage.load(args.binary, args.address, args.directory)
+    except EmulatorException as e:
+        logger.fatal(e.message, "image.py:__main__")
+    except OSError as e:
+        logger.fatal(str(e), "image.py:__main__")
+    print(image.path)
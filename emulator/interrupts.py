@@ -0,0 +1,35 @@
+# interrupts.py
+# interrupt controller for the jaide emulator.
+# josiah bergen, october 2026
+
+from .constants import NUM_VECTORS
+from .exceptions import EmulatorException
+
+
+class InterruptController:
+    def __init__(self):
+        """Interrupt controller. Devices raise IRQ lines, the cpu acknowledges them.
+
+        pending -- bitmask of raised lines, bit n requests vector n. the cpu only
+                   has to test this one integer to know if there is any work to do.
+        """
+        self.pending: int = 0
+
+    def request(self, vector: int) -> None:
+        """Raise the IRQ line for a vector. Handed to devices as their IRQ callback."""
+        if not 0 <= vector < NUM_VECTORS:
+            raise EmulatorException(f"invalid interrupt vector 0x{vector:02X}.")
+        self.pending |= 1 << vector
+
+    def acknowledge(self) -> int:
+        """Clear and return the highest-priority (lowest-numbered) pending vector."""
+        lowest = self.pending & -self.pending
+        self.pending ^= lowest
+        return lowest.bit_length() - 1
+
+    def reset(self) -> None:
+        self.pending = 0
+
+    def __str__(self) -> str:
+        vectors = [vector for vector in range(NUM_VECTORS) if self.pending >> vector & 1]
+        return f"interrupts: pending={', '.join(f'0x{vector:02X}' for vector in vectors) or 'none'}"
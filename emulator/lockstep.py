@@ -0,0 +1,259 @@
+# lockstep.py
+# differential lockstep checker between the reference interpreter and other engines.
+# josiah bergen, october 2026
+
+import random
+import sys
+from dataclasses import dataclass, field
+from typing import Callable
+
+from tap import Tap
+
+from common.isa import INSTRUCTIONS, MODES, OPCODE_FORMATS, OPCODE_MAP
+
+from .constants import BANK_WINDOW_START, PAGE_WORDS, REGISTERS, VRAM_START
+from .emulator import Emulator
+from .exceptions import EmulatorException
+from .snapshot import Snapshot
+from .util.disasm import disassemble
+from .util.logger import logger
+
+# an engine runs exactly n instructions on an emulator, or raises when it stops early.
+# either way, emu.cycles must account for every instruction that completed.
+Engine = Callable[[Emulator, int], None]
+
+HALT_OPCODE = OPCODE_MAP[(INSTRUCTIONS.HALT, ())]
+EDGE_VALUES = (0x0000, 0x0001, 0x000F, 0x0010, 0x7FFF, 0x8000, 0x8001, 0xFFFE, 0xFFFF)
+
+
+def reference_engine(emu: Emulator, count: int) -> None:
+    # one Emulator.step() at a time, the path every other engine is checked against
+    for _ in range(count):
+        emu.step()
+
+
+def slice_engine(emu: Emulator, count: int) -> None:
+    # the run loop's slice executor
+    emu._run_slice(count)
+
+
+@dataclass
+class Divergence:
+    cycle: int             # first cycle at which the engines disagree
+    pc: int                # address of the instruction that caused it
+    instruction: str       # disassembly of that instruction
+    differences: list[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return f"diverged at cycle {self.cycle} (0x{self.pc:04X}: {self.instruction}): " + "; ".join(self.differences)
+
+
+class Lockstep:
+    def __init__(self, program: bytes, candidate: Engine = slice_engine, reference: Engine = reference_engine, interval: int = 64):
+        """Run a program on two emulators side by side and find the first instruction where they disagree.
+
+        candidate -- the engine under test
+        reference -- the engine it must agree with, Emulator.step() by default
+        interval  -- cycles between state comparisons. divergences are bisected down to one instruction.
+        """
+        self.program = program
+        self.engines = (reference, candidate)
+        self.interval = max(1, interval)
+        self.emulators = (self._create(), self._create())
+        self.stops: list[str | None] = [None, None]
+
+    def run(self, max_cycles: int) -> Divergence | None:
+        """Run until both engines stop the same way, or max_cycles. Returns the first divergence, if any."""
+        reference = self.emulators[0]
+        while reference.cycles < max_cycles:
+            checkpoint = reference.cycles
+            count = min(self.interval, max_cycles - checkpoint)
+
+            self._advance(count)
+            if compare(self.emulators, self.stops):
+                return self._bisect(checkpoint, count)
+
+            if self.stops[0] is not None:
+                return None  # both stopped, and agree on why
+        return None
+
+    def _bisect(self, checkpoint: int, count: int) -> Divergence:
+        # the engines agreed at checkpoint and disagree count cycles later.
+        # binary search for the first instruction after which they disagree.
+        # the rest of the window is re-run from a snapshot of the checkpoint,
+        # so the fast path never has to pay for snapshots.
+        self._rewind(checkpoint)
+        snapshots = (self.emulators[0].snapshot(), self.emulators[1].snapshot())
+
+        agree, differ = 0, count
+        while differ - agree > 1:
+            middle = (agree + differ) // 2
+            self._restore(snapshots)
+            self._advance(middle)
+            if compare(self.emulators, self.stops):
+                differ = middle
+            else:
+                agree = middle
+
+        # replay up to the offending instruction, then run just that one
+        self._restore(snapshots)
+        self._advance(agree)
+        reference = self.emulators[0]
+        pc = reference.pc.value
+        instruction = _disassemble_at(reference, pc)
+        self._advance(differ - agree)
+        return Divergence(checkpoint + differ, pc, instruction, compare(self.emulators, self.stops))
+
+    def _rewind(self, cycle: int) -> None:
+        # runs are deterministic, so a fresh pair of emulators re-run to cycle is the same state
+        self.emulators = (self._create(), self._create())
+        self.stops = [None, None]
+        self._advance(cycle)
+
+    def _advance(self, count: int) -> None:
+        for side, (engine, emu) in enumerate(zip(self.engines, self.emulators)):
+            if self.stops[side] is not None:
+                continue  # already stopped, stays stopped
+            start = emu.cycles
+            try:
+                engine(emu, count)
+            except Exception as error:
+                message = error.message if isinstance(error, EmulatorException) else f"{type(error).__name__}: {error}"
+                self.stops[side] = f"{message} (after {emu.cycles - start} of {count})"
+
+    def _restore(self, snapshots: tuple[Snapshot, Snapshot]) -> None:
+        for emu, snapshot in zip(self.emulators, snapshots):
+            emu.restore(snapshot)
+        self.stops = [None, None]
+
+    def _create(self) -> Emulator:
+        emu = Emulator(verbosity=logger.log_level.ERROR)
+        emu.shutdown = _shutdown  # random programs can poke the system register
+        emu.bus.load_bytes(0, self.program)
+        return emu
+
+
+def compare(emulators: tuple[Emulator, Emulator], stops: list[str | None]) -> list[str]:
+    """List everything that differs between two emulators: registers, flags, stop reason, and memory pages."""
+    reference, candidate = emulators
+    differences: list[str] = []
+
+    for name in REGISTERS:
+        ref_value, cand_value = reference.reg[name].value, candidate.reg[name].value
+        if ref_value != cand_value:
+            differences.append(f"{name}: 0x{ref_value:04X} != 0x{cand_value:04X}")
+
+    if reference.cycles != candidate.cycles:
+        differences.append(f"cycles: {reference.cycles} != {candidate.cycles}")
+    if reference.halted != candidate.halted:
+        differences.append(f"halted: {reference.halted} != {candidate.halted}")
+    if reference.interrupts.pending != candidate.interrupts.pending:
+        differences.append(f"pending interrupts: 0x{reference.interrupts.pending:X} != 0x{candidate.interrupts.pending:X}")
+    if (stops[0] is None) != (stops[1] is None) or (stops[0] or "").split(" (after")[0] != (stops[1] or "").split(" (after")[0]:
+        differences.append(f"stopped: {stops[0]} != {stops[1]}")
+
+    regions = [("memory", reference.bus.memory, candidate.bus.memory, 0), ("vram", reference.bus.vram, candidate.bus.vram, VRAM_START)]
+    regions += [(f"bank {i + 1}", ref_bank, cand_bank, BANK_WINDOW_START) for i, (ref_bank, cand_bank) in enumerate(zip(reference.bus.banks, candidate.bus.banks))]
+
+    for region, ref_data, cand_data, base in regions:
+        if ref_data == cand_data:
+            continue  # the common case, a single memcmp
+        page_bytes = PAGE_WORDS * 2
+        for offset in range(0, len(ref_data), page_bytes):
+            if ref_data[offset : offset + page_bytes] != cand_data[offset : offset + page_bytes]:
+                differences.append(f"{region} page 0x{base + offset // 2:04X}")
+
+    return differences
+
+
+def random_program(rng: random.Random, length: int) -> bytes:
+    """Generate a random instruction stream from OPCODE_FORMATS, ending in HALT.
+
+    branch and jump targets always land on an instruction in the program, so most
+    streams run for a while instead of falling straight off into zeroed memory.
+    """
+    opcodes = [opcode for opcode, fmt in OPCODE_FORMATS.items() if fmt.mnemonic != INSTRUCTIONS.HALT]
+    chosen = [rng.choice(opcodes) for _ in range(length)]
+
+    # first pass: instruction addresses, so targets can be picked
+    addresses: list[int] = []
+    pc = 0
+    for opcode in chosen:
+        addresses.append(pc)
+        pc += 2 if OPCODE_FORMATS[opcode].imm_operand is not None else 1
+    targets = addresses + [pc]  # the final HALT is a valid target too
+
+    words: list[int] = []
+    for opcode, address in zip(chosen, addresses):
+        fmt = OPCODE_FORMATS[opcode]
+        reg_a = _random_register(rng) if fmt.src_operand is not None else 0
+        reg_b = _random_register(rng) if fmt.dest_operand is not None else 0
+        words.append((opcode << 8) | (reg_a << 4) | reg_b)
+        if fmt.imm_operand is not None:
+            words.append(_random_immediate(rng, fmt.mnemonic, fmt.modes[fmt.imm_operand], address, targets))
+
+    words.append(HALT_OPCODE << 8)
+    return b"".join(word.to_bytes(2, "little") for word in words)
+
+
+def _random_register(rng: random.Random) -> int:
+    # mostly general-purpose registers, sometimes F/MB/SP/PC
+    return rng.randrange(8) if rng.random() < 0.9 else rng.randrange(8, len(REGISTERS))
+
+
+def _random_immediate(rng: random.Random, mnemonic: INSTRUCTIONS, mode: MODES, address: int, targets: list[int]) -> int:
+    if mode == MODES.RELATIVE:
+        return (rng.choice(targets) - (address + 2)) & 0xFFFF  # relative to the next instruction
+    if mnemonic in (INSTRUCTIONS.JMP, INSTRUCTIONS.CALL):
+        return rng.choice(targets)
+    if mnemonic == INSTRUCTIONS.BCP:
+        return rng.randrange(16)  # word count, keep copies short
+    if mnemonic in (INSTRUCTIONS.DIV, INSTRUCTIONS.MOD):
+        return rng.randrange(1, 0x10000)  # don't end every other program on a division by zero
+    if rng.random() < 0.3:
+        return rng.choice(EDGE_VALUES)
+    return rng.randrange(0x10000)
+
+
+def _disassemble_at(emu: Emulator, pc: int) -> str:
+    word = emu.bus.peek16(pc)
+    opcode, regs = (word >> 8) & 0xFF, word & 0xFF
+    fmt = OPCODE_FORMATS.get(opcode)
+    imm16 = emu.bus.peek16(pc + 1) if fmt is not None and fmt.imm_operand is not None else 0
+    return disassemble((opcode, (regs >> 4) & 0xF, regs & 0xF, imm16))
+
+
+def _shutdown() -> None:
+    raise EmulatorException("shutdown")
+
+
+class LockstepArgumentParser(Tap):
+    """differential fuzzing of the run loop against Emulator.step()"""
+
+    binary: str = ""  # check this binary instead of random programs
+    seed: int = 0  # seed of the first random program
+    programs: int = 100  # number of random programs to check
+    length: int = 64  # instructions per random program
+    cycles: int = 10_000  # maximum cycles to run each program for
+    interval: int = 64  # cycles between state comparisons
+
+
+if __name__ == "__main__":
+
+    args = LockstepArgumentParser(underscores_to_dashes=True).parse_args()
+
+    if args.binary:
+        with open(args.binary, "rb") as f:
+            cases = [(args.binary, f.read())]
+    else:
+        cases = [(f"seed {seed}", random_program(random.Random(seed), args.length)) for seed in range(args.seed, args.seed + args.programs)]
+
+    failures = 0
+    for name, program in cases:
+        divergence = Lockstep(program, interval=args.interval).run(args.cycles)
+        if divergence is not None:
+            failures += 1
+            print(f"{name}: {divergence}")
+
+    print(f"checked {len(cases)} program{'' if len(cases) == 1 else 's'}, {failures} diverged.")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,221 @@
+# profiler.py
+# sampling hot-spot and call-graph profiler for guest code.
+# josiah bergen, october 2026
+
+from array import array
+from collections import Counter
+from typing import TYPE_CHECKING
+
+from common.isa import INSTRUCTIONS
+
+from .util.symbols import SymbolTable
+
+if TYPE_CHECKING:
+    from .emulator import Emulator
+
+
+class Profiler:
+    def __init__(self, emu: "Emulator", interval: int = 1):
+        """Counts the pc every interval instructions into a 64K histogram,
+        along with the guest call stack at that moment.
+
+        samples are taken at slice boundaries, and the run loop cuts slices short
+        so that one lands every interval instructions. an interval of 1 counts
+        every executed instruction exactly, larger intervals trade accuracy for speed.
+
+        the call stack is a shadow stack kept by hooking CALL, RET, IRET and
+        interrupt entry on this emulator. the kernel moves SP around by hand, so
+        frames are matched to returns by the stack slot they pushed, not by pairing.
+
+        on top of the samples, every executed instruction is counted against the call
+        path it ran in, so by_function is exact whatever the interval.
+        """
+        self.emu = emu
+        self.interval = max(1, interval)
+        self.hits = array("Q", bytes(8 * 0x10000))  # one counter per pc
+        self.stacks: Counter[tuple[int, ...]] = Counter()  # call path -> samples
+        self.samples = 0
+        self.instructions: Counter[tuple[int, ...]] = Counter()  # call path -> instructions, () outside any call
+        self.running = True
+        self._next = 0  # cycle of the next sample
+
+        self._frames: list[tuple[int, int]] = []  # (callee, stack slot of its return address)
+        self._path: tuple[int, ...] = ()  # callees of _frames, the key into stacks
+        self._run = 0  # instructions executed in _path since it last changed
+        self._hook()
+
+    def sample(self, emu: "Emulator", budget: int) -> int:
+        """Sample the pc if one is due. Returns the next slice budget."""
+        if not self.running:
+            return budget
+
+        cycle = emu.cycles
+        if cycle >= self._next:
+            pc = emu.pc.value
+            self.hits[pc] += 1
+            # code outside of any call (boot, the kernel main loop) is keyed by its pc instead
+            self.stacks[self._path or (pc,)] += 1
+            self.samples += 1
+            self._next = cycle + self.interval
+        return min(budget, self._next - cycle)
+
+    def stop(self) -> None:
+        self.running = False
+        self._unhook()
+
+    def reset(self) -> None:
+        self.hits = array("Q", bytes(8 * 0x10000))
+        self.stacks.clear()
+        self.samples = 0
+        self.instructions.clear()
+        self._run = 0
+
+    # shadow call stack
+
+    def _hook(self) -> None:
+        emu = self.emu
+
+        def on_call(e: "Emulator", decoded: tuple[int, ...]) -> None:
+            call.inner(e, decoded)
+            self._enter(e.pc.value, e.sp.value)
+
+        def on_ret(e: "Emulator", decoded: tuple[int, ...]) -> None:
+            sp = e.sp.value
+            ret.inner(e, decoded)
+            self._leave(sp)
+
+        def on_iret(e: "Emulator", decoded: tuple[int, ...]) -> None:
+            sp = e.sp.value
+            iret.inner(e, decoded)
+            self._leave(sp)
+
+        def on_interrupt(vector: int) -> None:
+            interrupt.inner(vector)
+            self._enter(emu.pc.value, emu.sp.value)
+
+        def counted() -> None:
+            # counted before it runs, so a call belongs to its caller and a ret to its callee
+            self._run += 1
+            execute.inner()
+
+        call = emu.hook_handler(INSTRUCTIONS.CALL, on_call)
+        ret = emu.hook_handler(INSTRUCTIONS.RET, on_ret)
+        iret = emu.hook_handler(INSTRUCTIONS.IRET, on_iret)
+        interrupt = emu.hook("interrupt", on_interrupt)
+        execute = emu.hook("_execute", counted)
+        self._hooks = [call, ret, iret, interrupt, execute]
+
+    def _unhook(self) -> None:
+        # hooks installed before or after ours (coverage, sysprof) stay where they are
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = []
+
+    def _flush(self) -> None:
+        # charge the instructions run since the last call path change to that path
+        if self._run:
+            self.instructions[self._path] += self._run
+            self._run = 0
+
+    def _enter(self, callee: int, sp: int) -> None:
+        self._flush()
+        # frames at or below the new slot were abandoned, i.e. the kernel reset SP
+        frames = self._frames
+        while frames and frames[-1][1] <= sp:
+            frames.pop()
+        frames.append((callee, sp))
+        self._path = tuple(callee for callee, _ in frames)
+
+    def _leave(self, sp: int) -> None:
+        # sp is where the return address was popped from. frames pushed below it
+        # were skipped over, and the frame that owns the slot (if any) returns.
+        # a return with no owning frame (a computed jump) leaves the stack alone.
+        self._flush()
+        frames = self._frames
+        while frames and frames[-1][1] < sp:
+            frames.pop()
+        if frames and frames[-1][1] == sp:
+            frames.pop()
+        self._path = tuple(callee for callee, _ in frames)
+
+    # reports
+
+    def by_address(self) -> list[tuple[int, int]]:
+        # (pc, hits) for every sampled pc, hottest first
+        return sorted(((pc, hits) for pc, hits in enumerate(self.hits) if hits), key=lambda item: -item[1])
+
+    def by_line(self, symbols: SymbolTable) -> list[tuple[str, int]]:
+        totals: Counter[str] = Counter()
+        for pc, hits in self.by_address():
+            totals[symbols.source(pc)] += hits
+        return totals.most_common()
+
+    def collapsed(self, symbols: SymbolTable | None) -> Counter[str]:
+        """Samples per call path, as "outer;inner;leaf" strings."""
+        name = symbols.label_at if symbols else lambda addr: f"0x{addr:04X}"
+        stacks: Counter[str] = Counter()
+        for path, count in self.stacks.items():
+            stacks[";".join(name(addr) for addr in path)] += count
+        return stacks
+
+    def by_function(self) -> list[tuple[int | None, int, int]]:
+        """(callee, inclusive, exclusive) instructions, by inclusive instructions.
+        Callees are entry addresses, None stands for code outside any call."""
+        self._flush()
+        inclusive: Counter[int | None] = Counter()
+        exclusive: Counter[int | None] = Counter()
+        for path, count in self.instructions.items():
+            exclusive[path[-1] if path else None] += count
+            for callee in set(path) or (None,):  # recursion counts once
+                inclusive[callee] += count
+        return [(callee, count, exclusive[callee]) for callee, count in inclusive.most_common()]
+
+    def report(self, symbols: SymbolTable | None, top: int = 10) -> list[str]:
+        if not self.samples:
+            return ["profile: no samples."]
+
+        lines = [f"profile: {self.samples:,} samples, 1 every {self.interval} instruction{'' if self.interval == 1 else 's'}"]
+        percent = lambda count: f"{count / self.samples * 100:5.1f}%"
+
+        # functions are exact instruction counts, not samples. names are only looked up here
+        functions = self.by_function()
+        total = sum(exclusive for _, _, exclusive in functions)
+        share = lambda count: f"{count / max(total, 1) * 100:5.1f}%"
+        lines.append(f"top functions (inclusive, exclusive, of {total:,} instructions):")
+        for callee, inclusive, exclusive in functions[:top]:
+            if callee is None:
+                function = "(outside any call)"
+            else:
+                function = symbols.describe(callee) if symbols else f"0x{callee:04X}"
+            lines.append(f"  {share(inclusive)}  {share(exclusive)}  {function}")
+
+        if symbols is not None:
+            lines.append("top lines:")
+            for name, hits in self.by_line(symbols)[:top]:
+                lines.append(f"  {percent(hits)}  {hits:>10,}  {name}")
+        else:
+            lines.append("top addresses (load a symbol table for names):")
+            for pc, hits in self.by_address()[:top]:
+                lines.append(f"  {percent(hits)}  {hits:>10,}  0x{pc:04X}")
+
+        return lines
+
+    def export(self, path: str, symbols: SymbolTable | None) -> int:
+        """Write every sampled pc as tab-separated text. Returns the number of rows."""
+        rows = self.by_address()
+        with open(path, "w") as f:
+            f.write("addr\thits\tpercent\tsymbol\tsource\n")
+            for pc, hits in rows:
+                symbol = symbols.describe(pc) if symbols else ""
+                source = symbols.source(pc) if symbols else ""
+                f.write(f"0x{pc:04X}\t{hits}\t{hits / self.samples * 100:.3f}\t{symbol}\t{source}\n")
+        return len(rows)
+
+    def export_collapsed(self, path: str, symbols: SymbolTable | None) -> int:
+        """Write call paths in the collapsed stack format (flamegraph.pl, speedscope, inferno).
+        Counts are scaled back up to instructions. Returns the number of rows."""
+        stacks = self.collapsed(symbols)
+        with open(path, "w") as f:
+            for stack, count in sorted(stacks.items()):
+                f.write(f"{stack} {count * self.interval}\n")
+        return len(stacks)
@@ -0,0 +1,375 @@
+# remote.py
+# run the cpu in a child process, with memory and vram shared with the repl and window.
+# josiah bergen, october 2026
+
+import multiprocessing
+import signal
+import sys
+from collections.abc import Callable
+from dataclasses import replace
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from queue import Queue
+from threading import Event, Lock, Thread
+from typing import TYPE_CHECKING
+
+from .bus import STORAGE_SIZE
+from .constants import MEMORY_SIZE, VRAM_SIZE
+from .devices.device import Device
+from .devices.keyboard import Keyboard
+from .emulator import Emulator
+from .events import Events, RunResult
+from .exceptions import EmulatorException, ReplException
+from .repl import REPL, CommandRequest, execute_command, log_result, prepare_run, wake_on_signals
+from .replay import InputRecorder
+from .util.logger import logger
+
+if TYPE_CHECKING:
+    from .__main__ import EmulatorArgumentParser
+    from .devices.graphics import Graphics
+
+# how often a running cpu process looks for messages from the repl, in cycles.
+# keys and pauses wait at most this long, and checking costs a few microseconds.
+POLL_CYCLES = 1_000
+
+GRAPHICS_CONTROL = 0xFE40  # owned by the graphics controller, which lives with the window
+
+
+class SharedStorage:
+    def __init__(self, name: str | None = None):
+        """Main memory, vram and banks in one shared memory block, laid out as MemoryBus expects.
+
+        without a name a new block is created (and removed again by close()), otherwise the
+        named one is attached. every view handed out is released by close(), which can't
+        unmap the block while any view of it is alive.
+        """
+        self.owner = name is None
+        self.shm = SharedMemory(name, create=self.owner, size=STORAGE_SIZE if self.owner else 0)
+        self.views: list[memoryview] = []
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def view(self, start: int = 0, end: int = STORAGE_SIZE, readonly: bool = False) -> memoryview:
+        view = self.shm.buf[start:end]
+        self.views.append(view)
+        if readonly:
+            view = view.toreadonly()
+            self.views.append(view)
+        return view
+
+    def vram(self) -> memoryview:
+        # what the window renders from, straight out of the block
+        return self.view(MEMORY_SIZE, MEMORY_SIZE + VRAM_SIZE, readonly=True)
+
+    def close(self) -> None:
+        for view in reversed(self.views):
+            view.release()
+        self.views.clear()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# the cpu process
+
+
+class DisplayControl(Device):
+    def __init__(self, send: Callable[[tuple], None]):
+        """Stands in for the graphics controller on the cpu's side, the window is in the repl process.
+
+        writes to the control register are forwarded there, reads are answered from here.
+        """
+        super().__init__()
+        self.send = send
+        self.enabled: bool = True
+
+        self.write_dispatch[GRAPHICS_CONTROL] = self._set_control
+        self.read_dispatch[GRAPHICS_CONTROL] = lambda: 0x01 if self.enabled else 0x00
+
+        self._log_ready()
+
+    def _set_control(self, value: int) -> None:
+        self.enabled = bool(value & 0x01)
+        self.send(("mmio", GRAPHICS_CONTROL, value))
+
+    def reset(self) -> None:
+        self.enabled = True
+        self.send(("reset",))
+
+    def __str__(self) -> str:
+        return f"graphics: enabled={self.enabled} (in the repl process)"
+
+
+class Server:
+    def __init__(self, conn: Connection, emulator: Emulator):
+        """Executes what the repl process sends, and runs the guest between messages."""
+        self.conn = conn
+        self.emulator = emulator
+        # keys go where the window would have put them, through the recorder while recording
+        self.keys = emulator.inputs.keys if isinstance(emulator.inputs, InputRecorder) else emulator.key_queue
+        self.run: Callable[[], RunResult] | None = None  # from prepare_run(), started once the command is answered
+        self.quitting = False
+
+        emulator.events = Events(emulator)
+        emulator.events.every(POLL_CYCLES, self._poll)
+
+    def serve(self) -> None:
+        # returns when the repl quits, a guest shutdown raises SystemExit
+        self.conn.send(("ready",))
+        while not self.quitting:
+            if self.run is None:
+                self._handle(self.conn.recv())
+                continue
+
+            run, self.run = self.run, None
+            result = run()
+            clock = None if self.emulator.clock.unlimited else self.emulator.clock.report()
+            sys.stdout.flush()
+            # the exception behind an error doesn't need to cross, its message already has
+            self.conn.send(("stopped", replace(result, error=None), clock))
+
+    def _poll(self, emulator: Emulator) -> None:
+        # between slices of a run: handle whatever the repl sent meanwhile
+        while self.conn.poll():
+            self._handle(self.conn.recv())
+
+    def _handle(self, message: tuple) -> None:
+        match message:
+            case ("key", key):
+                self.keys.append(key)
+            case ("pause",):
+                if self.emulator.running:
+                    self.emulator.pause()
+            case ("quit",):
+                self.quitting = True
+                if self.emulator.running:
+                    self.emulator.pause()
+            case ("command", request):
+                self._command(request)
+            case _:
+                logger.warning(f"cpu process got an unknown message: {message!r}")
+
+    def _command(self, request: CommandRequest) -> None:
+        # output goes straight to the shared terminal, the reply only says whether a run started
+        started = False
+        try:
+            if request.name in ("run", "until"):
+                if self.emulator.running or self.run is not None:
+                    raise ReplException("the guest is already running.")
+                self.run = prepare_run(self.emulator, request)
+                started = True
+            else:
+                execute_command(self.emulator, request)
+        except (EmulatorException, ReplException, ValueError) as error:
+            logger.error(f"{request.name}: {error}")
+        finally:
+            sys.stdout.flush()
+            self.conn.send(("done", started))
+
+
+def serve(conn: Connection, name: str, options: dict, window: bool) -> None:
+    """Entry point of the cpu process. options are the command line's, as_dict()'d."""
+    from .__main__ import EmulatorArgumentParser, create_emulator
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # ctrl+c is for the repl, which pauses us
+
+    storage = SharedStorage(name)
+    args = EmulatorArgumentParser(underscores_to_dashes=True).from_dict(options)
+    emulator = create_emulator(args, storage.view())
+    if window:
+        emulator.devices.append(DisplayControl(conn.send))
+        if not any(isinstance(device, Keyboard) for device in emulator.devices):
+            emulator.devices.append(Keyboard(emulator.key_queue))
+
+    try:
+        Server(conn, emulator).serve()
+        emulator.close()
+    except SystemExit:
+        # the guest shut the machine down, and the emulator closed itself
+        sys.stdout.flush()
+        conn.send(("exit",))
+    finally:
+        emulator.bus.release()
+        storage.close()
+
+
+# the repl process
+
+
+class RemoteCPU:
+    def __init__(self, options: dict, window: bool):
+        """The repl's handle on a cpu running in a child process. Used as the repl's runner.
+
+        replies to commands are waited for, results of runs arrive whenever they end.
+        """
+        self.storage = SharedStorage()
+        context = multiprocessing.get_context("spawn")  # the same everywhere, and no forking with threads
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=serve, args=(child, self.storage.name, options, window), name="jaide-cpu", daemon=True)
+        self.process.start()
+        child.close()
+
+        self.finished: Callable[[RunResult | SystemExit], None] = lambda _: None  # set by the repl
+        self.graphics: "Graphics | None" = None  # gets the display messages
+        self.clock: str | None = None  # the clock report that came with the last result
+        self.busy = False
+        self.closing = False
+        self.exited = False  # the guest shut down
+        self._idle = Event()
+        self._idle.set()
+        self._replies: Queue[tuple | None] = Queue()
+        self._send_lock = Lock()
+
+        Thread(target=self._receive, name="jaide-cpu-pipe", daemon=True).start()
+        if self._replies.get() is None:
+            self.close()
+            logger.fatal("the cpu process failed to start.", "remote.py:RemoteCPU()")
+
+    def send(self, message: tuple) -> None:
+        with self._send_lock:
+            self.conn.send(message)
+
+    def command(self, request: CommandRequest) -> None:
+        # runs and untils only start here, their results come later through finished
+        if not self.process.is_alive():
+            raise ReplException("the cpu process has exited.")
+        starts = request.name in ("run", "until")
+        if starts:
+            self.busy = True
+            self._idle.clear()
+        self.send(("command", request))
+
+        reply = self._replies.get()
+        if reply is None:
+            return  # the guest shut down, or the process died, either way it's been reported
+        if starts and not reply[1]:
+            self._set_idle()
+
+    def pause(self) -> None:
+        # stop the guest at its next poll, and wait until it has
+        if self.busy:
+            self.send(("pause",))
+            self._idle.wait()
+
+    def _set_idle(self) -> None:
+        self.busy = False
+        self._idle.set()
+
+    def _receive(self) -> None:
+        while True:
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                break
+
+            match message:
+                case ("ready",) | ("done", _):
+                    self._replies.put(message)
+                case ("stopped", result, clock):
+                    self.clock = clock
+                    self._set_idle()
+                    self.finished(result)
+                case ("mmio", addr, value):
+                    if self.graphics is not None:
+                        self.graphics.mmio_write(addr, value)
+                case ("reset",):
+                    if self.graphics is not None:
+                        self.graphics.reset()
+                case ("exit",):
+                    self.exited = True
+                    self._set_idle()
+                    self.finished(SystemExit(0))
+
+        self._replies.put(None)
+        self._set_idle()
+        if not self.closing and not self.exited:
+            logger.error("the cpu process exited unexpectedly.")
+            self.finished(SystemExit(1))
+
+    def close(self) -> None:
+        self.closing = True
+        if self.process.is_alive():
+            try:
+                self.send(("quit",))
+            except OSError:
+                pass
+            self.process.join(5)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+        self.conn.close()
+        self.storage.close()
+
+
+class KeyForwarder:
+    """Stands in for the key queue the window appends to, sending each key to the cpu process."""
+
+    def __init__(self, cpu: RemoteCPU):
+        self.cpu = cpu
+
+    def append(self, key: int) -> None:
+        self.cpu.send(("key", key))
+
+    def clear(self) -> None:
+        pass  # the keyboard on the other side clears its own queue on reset
+
+
+class RemoteREPL(REPL):
+    def __init__(self, cpu: RemoteCPU, graphics: "Graphics | None"):
+        """The repl, with commands executed by the cpu process instead of on this thread."""
+        # there's no emulator on this side, only the handle on the one in the cpu process
+        self._setup(graphics, cpu)
+        cpu.finished = self._finished
+
+    def start_run(self, request: CommandRequest) -> None:
+        self.runner.command(request)
+
+    def command(self, request: CommandRequest) -> None:
+        self.runner.command(request)
+
+    def report(self, result: RunResult) -> None:
+        log_result(result)
+        if self.runner.clock is not None:
+            logger.info(self.runner.clock)
+
+
+def run_remote(args: "EmulatorArgumentParser") -> None:
+    """Like run_interactive(), with the guest in a child process. The window renders from shared vram."""
+    logger.set_level(args.verbosity)
+
+    # the child gets the same options, minus the window, which stays here with the repl
+    window = args.graphics and not args.replay
+    cpu = RemoteCPU(args.as_dict() | {"graphics": False}, window)
+
+    graphics = None
+    if window:
+        from .devices.graphics import Graphics
+
+        def shutdown() -> None:
+            print("shutting down...")
+            sys.exit(0)
+
+        graphics = Graphics(KeyForwarder(cpu), cpu.storage.vram(), lambda: cpu.busy, shutdown)
+        cpu.graphics = graphics
+
+    repl = RemoteREPL(cpu, graphics)
+    Thread(target=repl.read, name="jaide-repl", daemon=True).start()
+    restore_signals = wake_on_signals(graphics) if graphics is not None else None
+
+    if args.run:
+        logger.info("starting execution...")
+    try:
+        repl.run(args.run)
+    except KeyboardInterrupt:
+        # mirror the quit command, as in __main__
+        logger.info("")
+        print("shutting down...")
+    finally:
+        cpu.pause()
+        if restore_signals is not None:
+            restore_signals()
+        if graphics is not None:
+            graphics.close()
+        cpu.close()
@@ -4,20 +4,38 @@
 
 import os
 import shlex
+import signal
+import socket
+import struct
+import sys
 from collections.abc import Callable
-from dataclasses import dataclass, field
+from dataclasses import dataclass, replace
 from queue import Empty, Queue
-from threading import Event, Thread
+from threading import Thread
+from typing import TYPE_CHECKING
 
-import pygame
 from colorama import Fore as f
 
 from common.isa import OPCODE_FORMATS
-from emulator.constants import FLAG_C, FLAG_N, FLAG_O, FLAG_Z, REGISTERS
-from emulator.devices.graphics import FRAME_INTERVAL, Graphics
+from emulator.conditions import Breakpoint, compile_expression, compile_until
+from emulator.constants import FLAG_C, FLAG_I, FLAG_N, FLAG_O, FLAG_Z, MMIO_SYSTEM, REGISTERS
+from emulator.coverage import Coverage
 from emulator.emulator import Emulator
+from emulator.events import RunResult, StopReason
 from emulator.exceptions import EmulatorException, ReplException
+from emulator.heatmap import MemoryHeatmap
+from emulator.history import History
+from emulator.hostprof import HostProfiler
+from emulator.profiler import Profiler
+from emulator.stats import DeviceStats, OpcodeStats
+from emulator.sysprof import SyscallProfiler
+from emulator.trace import TraceWriter
 from emulator.util.logger import logger
+from emulator.util.symbols import SymbolTable
+
+if TYPE_CHECKING:
+    from emulator.devices.graphics import Graphics
+    from emulator.remote import RemoteCPU
 
 
 def parse_hex16(value: str) -> int:
@@ -38,6 +56,8 @@ def parse_register(value: str) -> str:
 class Arg:
     name: str
     parse_value: Callable[[str], object] = str
+    optional: bool = False
+    rest: bool = False  # takes every remaining word, i.e. an expression
 
     def parse(self, value: str) -> object:
         try:
@@ -47,7 +67,7 @@ class Arg:
             raise ReplException(f"invalid {self.name}: {message}.") from error
 
     def __str__(self) -> str:
-        return f"<{self.name}>"
+        return f"[{self.name}]" if self.optional else f"<{self.name}>"
 
 
 @dataclass(frozen=True)
@@ -56,11 +76,18 @@ class Command:
     aliases: tuple[str, ...] = ()
     args: tuple[Arg, ...] = ()
     description: str = ""
+    live: bool = False  # allowed while the guest runs on the worker thread, i.e. read-only
 
     def parse(self, raw_args: list[str]) -> tuple[object, ...]:
-        if len(raw_args) != len(self.args):
-            raise ReplException(f"expected {len(self.args)} arguments, got {len(raw_args)}.")
-        return tuple(arg.parse(value) for arg, value in zip(self.args, raw_args))
+        # optional args are trailing, and come back as None when omitted
+        if self.args and self.args[-1].rest and len(raw_args) > len(self.args):
+            raw_args = raw_args[:len(self.args) - 1] + [" ".join(raw_args[len(self.args) - 1:])]
+        required = sum(1 for arg in self.args if not arg.optional)
+        if not required <= len(raw_args) <= len(self.args):
+            expected = f"{required}" if required == len(self.args) else f"{required} to {len(self.args)}"
+            raise ReplException(f"expected {expected} arguments, got {len(raw_args)}.")
+        parsed = tuple(arg.parse(value) for arg, value in zip(self.args, raw_args))
+        return parsed + (None,) * (len(self.args) - len(parsed))
 
     def __str__(self) -> str:
         command = self.name + " " + " ".join(str(arg) for arg in self.args)
@@ -69,25 +96,41 @@ class Command:
 
 COMMANDS = (
     Command("load", ("l",), (Arg("file"), Arg("addr", parse_hex16)), "load a binary file into memory"),
-    Command("run", description="execute until a breakpoint or halt"),
+    Command("run", description="execute until a breakpoint or halt, in the background"),
+    Command("pause", ("p",), description="stop the running guest", live=True),
     Command("step", ("s",), description="execute one instruction"),
-    Command("break", ("b",), (Arg("addr", parse_hex16),), "set a breakpoint at the given address"),
-    Command("blist", ("bl",), description="list all breakpoints"),
-    Command("bclear", ("bc",), description="clear all breakpoints"),
-    Command("regs", ("r",), description="display register values"),
-    Command("flags", ("f",), description="display flag values"),
-    Command("devices", ("dev",), description="display device values"),
+    Command("until", ("u",), (Arg("condition", rest=True),), "until <condition> | until <value> changes, i.e. until [0x8000] changes"),
+    Command("break", ("b",), (Arg("addr", parse_hex16), Arg("condition", optional=True, rest=True)), "break <addr> [if <condition>], i.e. break 1234 if a == 0 and [0x8000] > hits", live=True),
+    Command("blist", ("bl",), description="list all breakpoints", live=True),
+    Command("bclear", ("bc",), description="clear all breakpoints", live=True),
+    Command("regs", ("r",), description="display register values", live=True),
+    Command("flags", ("f",), description="display flag values", live=True),
+    Command("devices", ("dev",), (Arg("action", optional=True),), "display device values, devices [start | stop | reset] for cost accounting", live=True),
     Command("set", args=(Arg("reg", parse_register), Arg("value", parse_hex16)), description="set a register value"),
     Command("mset", args=(Arg("addr", parse_hex16), Arg("value", parse_hex16)), description="set a memory value"),
-    Command("mem", ("m",), (Arg("addr", parse_hex16), Arg("len", parse_hex16)), "display memory contents"),
-    Command("disasm", ("d",), (Arg("addr", parse_hex16),), "disassemble an instruction"),
-    Command("disasm_pc", ("dp",), description="disassemble the instruction at pc"),
-    Command("vram", description="display the vram"),
-    Command("mmio", description="list MMIO device registers"),
+    Command("mem", ("m",), (Arg("addr", parse_hex16), Arg("len", parse_hex16)), "display memory contents", live=True),
+    Command("disasm", ("d",), (Arg("addr", parse_hex16),), "disassemble an instruction", live=True),
+    Command("disasm_pc", ("dp",), description="disassemble the instruction at pc", live=True),
+    Command("vram", description="display the vram", live=True),
+    Command("mmio", description="list MMIO device registers", live=True),
+    Command("stats", description="display instruction count, host time, and speed", live=True),
+    Command("symbols", ("sym",), (Arg("file"),), "load a symbol table written by jasm --symbols", live=True),
+    Command("profile", ("prof",), (Arg("action", optional=True), Arg("value", optional=True)), "profile [start [interval] | stop | reset | save <file> | flame <file> | <top>]"),
+    Command("opstats", ("ops",), (Arg("action", optional=True), Arg("value", optional=True)), "opstats [start | stop | reset | save <file> | <top>]"),
+    Command("hostprof", args=(Arg("action", optional=True), Arg("file", optional=True)), description="hostprof [start [file] | stop [file] | <top>], profile the emulator itself"),
+    Command("heatmap", ("heat",), (Arg("action", optional=True),), "heatmap [start | stop | reset | <top>], count memory accesses per page"),
+    Command("sysprof", args=(Arg("action", optional=True),), description="sysprof [start | stop | reset], per-syscall costs (needs kernel symbols)"),
+    Command("coverage", ("cov",), (Arg("action", optional=True), Arg("file", optional=True)), "coverage [start | stop | reset | save <file>], which guest code has run, as lcov (needs symbols)"),
+    Command("trace", args=(Arg("action"), Arg("file", optional=True), Arg("mode", optional=True)), description="trace start <file> [compress] | stop, stream an execution trace"),
+    Command("history", ("hist",), (Arg("action", optional=True), Arg("interval", int, optional=True)), "history [start [interval] | stop], record checkpoints for reverse debugging"),
+    Command("rstep", ("rs",), (Arg("count", int, optional=True),), "step backwards by one (or count) instructions"),
+    Command("rcontinue", ("rc",), description="run backwards to the previous breakpoint hit"),
+    Command("goto", args=(Arg("cycle", int),), description="move execution to the given cycle, backwards or forwards"),
+    Command("clock", args=(Arg("hz", int, optional=True),), description="show clock speed, or set the target (0 = unlimited)", live=True),
     Command("reset", description="reset the emulator"),
-    Command("clear", description="clear the screen"),
-    Command("help", description="display help"),
-    Command("quit", ("q", "exit"), description="exit the emulator"),
+    Command("clear", description="clear the screen", live=True),
+    Command("help", description="display help", live=True),
+    Command("quit", ("q", "exit"), description="exit the emulator", live=True),
 )
 
 COMMAND_BY_NAME = {name: command for command in COMMANDS for name in (command.name, *command.aliases)}
@@ -97,7 +140,6 @@ COMMAND_BY_NAME = {name: command for command in COMMANDS for name in (command.na
 class CommandRequest:
     name: str
     args: tuple[object, ...] = ()
-    completed: Event = field(default_factory=Event, repr=False)
 
 
 def split_line(line: str) -> list[str]:
@@ -129,22 +171,115 @@ def parse_line(line: str) -> CommandRequest | None:
     return CommandRequest(command.name, command.parse(raw_args))
 
 
-class REPL:
-    """Own terminal input and submit parsed commands to the main thread."""
+class Runner:
+    """Run the guest on a worker thread, so the repl and the window stay live while it does."""
+
+    def __init__(self, emulator: Emulator, finished: Callable[[RunResult | SystemExit], None]):
+        self.emulator = emulator
+        self.finished = finished  # called on the worker with the result, or the guest's shutdown
+        self.thread: Thread | None = None
+
+    @property
+    def busy(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, run: Callable[[], RunResult]) -> None:
+        # run comes from prepare_run()
+        self.thread = Thread(target=self._run, args=(run,), name="jaide-cpu", daemon=True)
+        self.thread.start()
 
-    def __init__(self, requests: Queue[CommandRequest]):
-        self.requests = requests
+    def _run(self, run: Callable[[], RunResult]) -> None:
+        try:
+            result = run()
+        except SystemExit as exit:
+            # the guest shut the machine down, which only the main thread can act on
+            self.finished(exit)
+            return
+        self.finished(result)
+
+    def pause(self) -> None:
+        # stop the guest at its next slice boundary, and wait until it has
+        if self.thread is not None and self.busy:
+            self.emulator.pause()
+            self.thread.join()
+
+
+class REPL:
+    """Own terminal input and hand each line to the main thread."""
+
+    def __init__(self, emulator: Emulator):
+        self.emulator = emulator
+        self._setup(emulator.graphics, Runner(emulator, self._finished))
+
+    def _setup(self, graphics: "Graphics | None", runner: "Runner | RemoteCPU") -> None:
+        # everything but the emulator, which a repl for another process doesn't have (see remote.py).
+        # with a window open, the main thread sleeps in pygame's event queue instead of on
+        # the line queue, so everything queued also posts a wakeup there.
+        self.graphics = graphics
+        self.lines: Queue[str | RunResult | SystemExit | None] = Queue()
+        self.runner = runner
+        self.result_due = False  # a run ended and its result hasn't been reported yet
+
+    def read(self) -> None:
+        # runs on its own thread, console input can't be waited on alongside anything else
+        # portably. the main thread prints the prompt once it's ready for the next line.
+        for line in sys.stdin:
+            self._submit(line)
+        self._submit(None)  # end of input
+
+    def _finished(self, result: RunResult | SystemExit) -> None:
+        self.result_due = True
+        self._submit(result)
+
+    def _submit(self, item: str | RunResult | SystemExit | None) -> None:
+        self.lines.put(item)
+        if self.graphics is not None:
+            self.graphics.wake()
+
+    def next_line(self) -> str | RunResult | SystemExit | None:
+        # block until the next line or finished run, without a timeout. None means the terminal closed.
+        if self.graphics is None:
+            return self.lines.get()
+        while True:
+            try:
+                return self.lines.get_nowait()
+            except Empty:
+                # handles window events until something wakes us, and draws frames while the guest runs
+                self.graphics.wait(frames=self.runner.busy)
 
-    def run(self) -> None:
+    def run(self, running: bool = False) -> None:
         logger.info("jaide shell version 0.0.3")
         logger.info("welcome to the emulator! type 'help' for a list of commands.")
+        if running:
+            self.start_run(CommandRequest("run"))
 
+        at_prompt = False
         while True:
+            if not at_prompt and not self.result_due:
+                print(f"{f.WHITE}jaide > {f.RESET}", end="", flush=True)
+                at_prompt = True
+
+            try:
+                item = self.next_line()
+            except KeyboardInterrupt:
+                # ctrl+c stops the guest rather than the repl, its result follows
+                if not self.runner.busy:
+                    raise
+                self.runner.pause()
+                continue
+
+            if isinstance(item, SystemExit):
+                raise item
+            if isinstance(item, RunResult):
+                if at_prompt:
+                    print()
+                self.result_due = at_prompt = False
+                self.report(item)
+                continue
+            at_prompt = False
+
             try:
-                line = input(f"{f.WHITE}jaide > {f.RESET}")
-                request = parse_line(line)
-            except EOFError:
-                request = CommandRequest("quit")
+                request = CommandRequest("quit") if item is None else parse_line(item)
             except ReplException as error:
                 logger.error(str(error))
                 continue
@@ -152,44 +287,81 @@ class REPL:
             if request is None:
                 continue
 
-            self.requests.put(request)
-            request.completed.wait()
+            try:
+                if request.name == "quit":
+                    self.runner.pause()
+                    logger.info("bye!")
+                    return
+                self.execute(request)
+            except (EmulatorException, ReplException, ValueError) as error:
+                logger.error(f"{request.name}: {error}")
+
+    def execute(self, request: CommandRequest) -> None:
+        # the commands that involve the worker, everything else is executed on this thread
+        busy = self.runner.busy
+        match request.name:
+            case "run" | "until":
+                if busy:
+                    raise ReplException("the guest is already running.")
+                self.start_run(request)
+            case "pause":
+                if not busy:
+                    raise ReplException("the guest isn't running.")
+                self.runner.pause()
+            case _:
+                command = COMMAND_BY_NAME.get(request.name)
+                if busy and command is not None and not command.live:
+                    raise ReplException("not while the guest is running, see 'pause'.")
+                self.command(request)
 
-            if request.name == "quit":
-                return
+    # where the guest actually is, overridden for one in another process (see remote.py)
 
+    def start_run(self, request: CommandRequest) -> None:
+        self.runner.start(prepare_run(self.emulator, request))
 
-def run_interactive(emulator: Emulator) -> None:
-    """Run terminal input off-thread while the main thread services Pygame."""
-    requests: Queue[CommandRequest] = Queue()
-    repl = REPL(requests)
-    repl_thread = Thread(target=repl.run, name="jaide-repl", daemon=True)
-    repl_thread.start()
+    def command(self, request: CommandRequest) -> None:
+        execute_command(self.emulator, request)
 
-    graphics = next((device for device in emulator.devices if isinstance(device, Graphics)), None)
+    def report(self, result: RunResult) -> None:
+        report_run(self.emulator, result)
 
-    try:
-        while True:
-            if graphics is not None:
-                graphics.tick()
 
-            try:
-                request = requests.get(timeout=FRAME_INTERVAL / 2)
-            except Empty:
-                continue
+def wake_on_signals(graphics: "Graphics") -> Callable[[], None]:
+    # python only runs the ctrl+c handler once pygame.event.wait() returns, so signals
+    # also arrive on a socket whose reader wakes the window. returns a function to undo it.
+    receiver, sender = socket.socketpair()
+    sender.setblocking(False)
+    previous = signal.set_wakeup_fd(sender.fileno(), warn_on_full_buffer=False)
 
-            try:
-                if request.name == "quit":
-                    logger.info("bye!")
-                    return
-                execute_command(emulator, request)
-            except (EmulatorException, ReplException, ValueError) as error:
-                logger.error(f"{request.name}: {error}")
-            finally:
-                request.completed.set()
+    def forward() -> None:
+        while receiver.recv(64):
+            graphics.wake()
+
+    Thread(target=forward, name="jaide-signals", daemon=True).start()
+
+    def restore() -> None:
+        signal.set_wakeup_fd(previous)
+        sender.close()  # ends forward()
+
+    return restore
+
+
+def run_interactive(emulator: Emulator, running: bool = False) -> None:
+    """Read terminal input off-thread while the main thread executes commands and services Pygame.
+    the guest runs on a worker thread, starting right away if running is set."""
+    graphics = emulator.graphics
+    repl = REPL(emulator)
+    Thread(target=repl.read, name="jaide-repl", daemon=True).start()
+    restore_signals = wake_on_signals(graphics) if graphics is not None else None
+
+    try:
+        repl.run(running)
     finally:
+        repl.runner.pause()
+        if restore_signals is not None:
+            restore_signals()
         if graphics is not None:
-            pygame.quit()
+            graphics.close()
 
 
 def disasm_at(emulator: Emulator, addr: int) -> str:
@@ -210,7 +382,7 @@ def disasm_at(emulator: Emulator, addr: int) -> str:
 
 
 def display_memory(emulator: Emulator, word_addr: int, length_words: int) -> None:
-    words = [emulator.bus.peek16(word_addr + offset) for offset in range(length_words)]
+    words = struct.unpack(f"<{length_words}H", emulator.bus.read_block(word_addr, length_words))
     for word_offset in range(0, len(words), 16):
         row = words[word_offset : word_offset + 16]
         values = " ".join(f"{word:04X}" for word in row)
@@ -218,6 +390,352 @@ def display_memory(emulator: Emulator, word_addr: int, length_words: int) -> Non
         logger.info(f"0x{word_addr + word_offset:04X} | {values} | {text}")
 
 
+def profile(emulator: Emulator, action: str | None, value: str | None) -> None:
+    profiler = emulator.profiler
+    if action == "start":
+        if profiler is not None:
+            profiler.stop()
+        emulator.profiler = Profiler(emulator, int(value) if value else 1)
+        logger.info(f"profiling every {emulator.profiler.interval} instruction(s).")
+        return
+
+    if profiler is None:
+        raise ReplException("the profiler has not been started.")
+
+    match action:
+        case "stop":
+            profiler.stop()
+            logger.info(f"profiler stopped after {profiler.samples:,} samples.")
+        case "reset":
+            profiler.reset()
+            logger.info("profile cleared.")
+        case "save":
+            if not value:
+                raise ReplException("expected a file to save the profile to.")
+            rows = profiler.export(value, emulator.symbols)
+            logger.info(f"saved {rows} profiled addresses to {value}.")
+        case "flame":
+            if not value:
+                raise ReplException("expected a file to save the call stacks to.")
+            rows = profiler.export_collapsed(value, emulator.symbols)
+            logger.info(f"saved {rows} collapsed call stacks to {value}.")
+        case None | "show":
+            for line in profiler.report(emulator.symbols, int(value) if value else 10):
+                logger.info(line)
+        case _:
+            for line in profiler.report(emulator.symbols, int(action)):
+                logger.info(line)
+
+
+def opstats(emulator: Emulator, action: str | None, value: str | None) -> None:
+    stats = emulator.opstats
+    if action == "start":
+        if stats is not None:
+            stats.stop()
+        emulator.opstats = OpcodeStats(emulator)
+        logger.info("counting and timing every instruction.")
+        return
+
+    if stats is None:
+        raise ReplException("opcode statistics have not been started.")
+
+    match action:
+        case "stop":
+            stats.stop()
+            logger.info(f"opcode statistics stopped after {sum(stats.counts):,} instructions.")
+        case "reset":
+            stats.reset()
+            logger.info("opcode statistics cleared.")
+        case "save":
+            if not value:
+                raise ReplException("expected a file to save the statistics to.")
+            rows = stats.dump(value)
+            logger.info(f"saved statistics for {rows} opcodes to {value}.")
+        case None | "show":
+            for line in stats.report(int(value) if value else 20):
+                logger.info(line)
+        case _:
+            for line in stats.report(int(action)):
+                logger.info(line)
+
+
+def hostprof(emulator: Emulator, action: str | None, file: str | None) -> None:
+    profiler = emulator.host_profiler
+    if action == "start":
+        if profiler is not None:
+            profiler.stop()
+        emulator.host_profiler = HostProfiler(file or "")
+        logger.info("profiling the run loop. use 'run' or 'step', then 'hostprof stop'.")
+        return
+
+    if profiler is None:
+        raise ReplException("the host profiler has not been started.")
+
+    match action:
+        case "stop":
+            profiler.stop()
+            for line in profiler.report():
+                logger.info(line)
+            if file or profiler.path:
+                logger.info(f"saved host profile to {profiler.save(file or profiler.path)}.")
+            emulator.host_profiler = None
+        case None | "show":
+            for line in profiler.report():
+                logger.info(line)
+        case _:
+            for line in profiler.report(int(action)):
+                logger.info(line)
+
+
+def mmio_owners(emulator: Emulator) -> dict[int, str]:
+    owners = {MMIO_SYSTEM: "system"}
+    for device in emulator.devices:
+        for addr in (*device.read_dispatch, *device.write_dispatch):
+            owners[addr] = device.__class__.__name__.lower()
+    return owners
+
+
+def heatmap(emulator: Emulator, action: str | None) -> None:
+    heat = emulator.heatmap
+    if action == "start":
+        if heat is not None:
+            heat.stop()
+        emulator.heatmap = MemoryHeatmap(emulator.bus)
+        logger.info("counting memory accesses per page.")
+        return
+
+    if heat is None:
+        raise ReplException("the heatmap has not been started.")
+
+    match action:
+        case "stop":
+            heat.stop()
+            logger.info("heatmap stopped.")
+        case "reset":
+            heat.reset()
+            logger.info("heatmap cleared.")
+        case None | "show":
+            for line in heat.report(owners=mmio_owners(emulator)):
+                logger.info(line)
+        case _:
+            for line in heat.report(int(action), mmio_owners(emulator)):
+                logger.info(line)
+
+
+def device_stats(emulator: Emulator, action: str) -> None:
+    stats = emulator.device_stats
+    match action:
+        case "start":
+            if stats is not None:
+                stats.stop()
+            emulator.device_stats = DeviceStats(emulator.devices)
+            logger.info(f"accounting for {len(emulator.devices)} devices. see 'devices'.")
+        case "stop" | "reset" if stats is None:
+            raise ReplException("device accounting has not been started.")
+        case "stop":
+            stats.stop()
+            logger.info("device accounting stopped.")
+        case "reset":
+            stats.reset()
+            logger.info("device accounting cleared.")
+        case _:
+            raise ReplException(f"unknown devices action: {action}.")
+
+
+def sysprof(emulator: Emulator, action: str | None) -> None:
+    profiler = emulator.sysprof
+    if action == "start":
+        if emulator.symbols is None:
+            raise ReplException("load the kernel's symbol table first, see 'symbols'.")
+        if profiler is not None:
+            profiler.stop()
+        emulator.sysprof = SyscallProfiler(emulator, emulator.symbols)
+        logger.info(f"profiling syscalls through 0x{emulator.sysprof.entry:04X}.")
+        return
+
+    if profiler is None:
+        raise ReplException("the syscall profiler has not been started.")
+
+    match action:
+        case "stop":
+            profiler.stop()
+            logger.info("syscall profiler stopped.")
+        case "reset":
+            profiler.reset()
+            logger.info("syscall profile cleared.")
+        case None | "show":
+            for line in profiler.report():
+                logger.info(line)
+        case _:
+            raise ReplException(f"unknown sysprof action: {action}.")
+
+
+def coverage(emulator: Emulator, action: str | None, file: str | None) -> None:
+    recorder = emulator.coverage
+    if action == "start":
+        if recorder is not None:
+            recorder.stop()
+        emulator.coverage = Coverage(emulator)
+        logger.info("recording executed code.")
+        return
+
+    if recorder is None:
+        raise ReplException("coverage has not been started.")
+
+    match action:
+        case "stop":
+            recorder.stop()
+            logger.info("coverage stopped.")
+        case "reset":
+            recorder.reset()
+            logger.info("coverage cleared.")
+        case "save":
+            if not file:
+                raise ReplException("expected a file to save the coverage to.")
+            if emulator.symbols is None:
+                raise ReplException("load the binary's symbol table first, see 'symbols'.")
+            files = recorder.export_lcov(file, emulator.symbols)
+            logger.info(f"saved line coverage of {files} files to {file}.")
+        case None | "show":
+            for line in recorder.report(emulator.symbols):
+                logger.info(line)
+        case _:
+            raise ReplException(f"unknown coverage action: {action}.")
+
+
+def trace(emulator: Emulator, action: str, file: str | None, mode: str | None) -> None:
+    match action:
+        case "start":
+            if not file:
+                raise ReplException("expected a file to trace to.")
+            if mode not in (None, "compress"):
+                raise ReplException(f'unknown trace mode "{mode}".')
+            if emulator.tracer is not None:
+                emulator.tracer.close()
+            emulator.tracer = TraceWriter(emulator, file, mode == "compress")
+        case "stop":
+            if emulator.tracer is None:
+                raise ReplException("no trace is being written.")
+            emulator.tracer.close()
+            emulator.tracer = None
+        case _:
+            raise ReplException(f"unknown trace action: {action}.")
+
+
+def history(emulator: Emulator, action: str | None, interval: int | None) -> None:
+    match action:
+        case "start":
+            if emulator.history is not None:
+                emulator.history.stop()
+            emulator.history = History(emulator, interval or 20_000)
+            logger.info(f"recording history from cycle {emulator.cycles:,}, a checkpoint every {emulator.history.interval:,} cycles.")
+        case "stop":
+            if emulator.history is None:
+                raise ReplException("history is not being recorded.")
+            emulator.history.stop()
+            emulator.history = None
+            logger.info("history recording stopped.")
+        case None | "show":
+            if emulator.history is None:
+                raise ReplException("history is not being recorded, see 'history start'.")
+            for line in emulator.history.report():
+                logger.info(line)
+        case _:
+            raise ReplException(f"unknown history action: {action}.")
+
+
+def rewind(emulator: Emulator, request: CommandRequest) -> None:
+    # rstep, rcontinue and goto, all of which need the history
+    past = emulator.history
+    if past is None:
+        raise ReplException("history is not being recorded, see 'history start'.")
+
+    match request.name:
+        case "rstep":
+            (count,) = request.args
+            past.goto(max(0, emulator.cycles - (count or 1)))
+        case "rcontinue":
+            if past.rcontinue() is None:
+                logger.info("no earlier breakpoint hit in the recorded history.")
+        case "goto":
+            (cycle,) = request.args
+            past.goto(cycle)
+    logger.info(f"at cycle {emulator.cycles:,}, 0x{emulator.pc.value:04X}: {disasm_at(emulator, emulator.pc.value)}")
+
+
+def restart_history(emulator: Emulator) -> None:
+    # memory was replaced wholesale, so the recorded past no longer leads here
+    if emulator.history is not None:
+        interval = emulator.history.interval
+        emulator.history.stop()
+        emulator.history = History(emulator, interval)
+
+
+def add_breakpoint(emulator: Emulator, addr: int, condition: str | None) -> None:
+    if condition is None:
+        emulator.breakpoints[addr] = Breakpoint(addr)
+        logger.info(f"set breakpoint at address 0x{addr:04X}.")
+        return
+
+    if not condition.startswith("if "):
+        raise ReplException(f'expected "if <condition>" after the address, got "{condition}".')
+    condition = condition.removeprefix("if ").strip()
+    emulator.breakpoints[addr] = Breakpoint(addr, condition, compile_expression(emulator, condition))
+    logger.info(f"set breakpoint at address 0x{addr:04X} if {condition}.")
+
+
+def step_off_breakpoint(emulator: Emulator) -> bool:
+    # a breakpoint at the pc has already stopped us, so let its instruction through
+    # without counting another hit. returns true if an instruction was executed.
+    breakpoint = emulator.breakpoints.pop(emulator.pc.value, None)
+    if breakpoint is None:
+        return False
+    try:
+        emulator.step()
+    finally:
+        emulator.breakpoints[breakpoint.address] = breakpoint
+    return True
+
+
+def prepare_run(emulator: Emulator, request: CommandRequest) -> Callable[[], RunResult]:
+    """Get a run or until request ready on the calling thread, so mistakes surface as command errors.
+    returns the run itself, to be called there or on whichever thread owns the guest."""
+    until, condition = None, ""
+    if request.name == "until":
+        # the predicate is checked before every instruction, but only for this run
+        (condition,) = request.args
+        predicate = compile_until(emulator, condition)
+        until = lambda _: predicate()
+    step_off_breakpoint(emulator)
+
+    def run() -> RunResult:
+        result = emulator.run(until=until)
+        if result.reason is StopReason.UNTIL and condition:
+            result = replace(result, message=f"until {condition}")
+        return result
+
+    return run
+
+
+def log_result(result: RunResult) -> None:
+    # log why a run from the repl or the command line stopped
+    match result.reason:
+        case StopReason.INTERRUPTED:
+            logger.info("! execution stopped (user interrupt).")
+        case StopReason.REPLAY_END:
+            logger.info(f"{result.message} (at 0x{result.pc:04X}).")
+        case StopReason.FATAL:
+            logger.error(f"fatal! while running instruction at 0x{result.pc:04X}:\n{result.message}")
+        case _:
+            logger.error(f"emulator stopped: {result.message} (at 0x{result.pc:04X}).")
+
+
+def report_run(emulator: Emulator, result: RunResult) -> None:
+    log_result(result)
+    if not emulator.clock.unlimited:
+        logger.info(emulator.clock.report())
+
+
 def execute_command(emulator: Emulator, request: CommandRequest) -> None:
     """Execute a parsed command. This is called only by the main thread."""
     match request.name:
@@ -226,22 +744,24 @@ def execute_command(emulator: Emulator, request: CommandRequest) -> None:
         case "load":
             file, addr = request.args
             emulator.load_binary(file, addr)
-        case "run":
-            emulator.run()
+            restart_history(emulator)
+        case "run" | "until":
+            report_run(emulator, prepare_run(emulator, request)())
+        case "pause":
+            raise ReplException("the guest isn't running.")
         case "step":
             try:
-                emulator.step()
+                if not step_off_breakpoint(emulator):
+                    emulator.step()
             except EmulatorException as error:
                 logger.error(f"emulator stopped: {error.message}")
         case "break":
-            (addr,) = request.args
-            emulator.breakpoints.add(addr)
-            logger.info(f"set breakpoint at address 0x{addr:04X}.")
+            add_breakpoint(emulator, *request.args)
         case "blist":
             count = len(emulator.breakpoints)
             logger.info(f"found {count} breakpoint{'' if count == 1 else 's'}{':' if count else '.'}")
-            for addr in emulator.breakpoints:
-                logger.info(f"0x{addr:04X}: {disasm_at(emulator, addr)}")
+            for addr, breakpoint in emulator.breakpoints.items():
+                logger.info(f"{breakpoint}: {disasm_at(emulator, addr)}")
         case "bclear":
             count = len(emulator.breakpoints)
             emulator.breakpoints.clear()
@@ -251,19 +771,31 @@ def execute_command(emulator: Emulator, request: CommandRequest) -> None:
             special = f"PC: 0x{emulator.pc.value:04X}  SP: 0x{emulator.sp.value:04X}  MB: 0x{emulator.mb.value:04X}  F:  0x{emulator.f.value:04X}"
             logger.info(f"{general}\n{special}")
         case "flags":
-            logger.info(f"C: {emulator.flag_get(FLAG_C)}  Z: {emulator.flag_get(FLAG_Z)}  N: {emulator.flag_get(FLAG_N)}  O: {emulator.flag_get(FLAG_O)}")
+            logger.info(f"C: {emulator.flag_get(FLAG_C)}  Z: {emulator.flag_get(FLAG_Z)}  N: {emulator.flag_get(FLAG_N)}  O: {emulator.flag_get(FLAG_O)}  I: {emulator.flag_get(FLAG_I)}")
         case "devices" | "mmio":
+            action = request.args[0] if request.args else None
+            if action is not None:
+                device_stats(emulator, action)
+                return
             if not emulator.devices:
                 logger.info("no devices registered.")
             for device in emulator.devices:
                 logger.info(str(device))
+                if emulator.device_stats is not None:
+                    for line in emulator.device_stats.report(device):
+                        logger.info(line)
+            logger.info(str(emulator.interrupts))
         case "set":
             reg, value = request.args
             emulator.reg_set(REGISTERS.index(reg), value)
+            if emulator.history is not None:
+                emulator.history.forget_future()
             logger.info(f"set register {reg} to 0x{value:04X}.")
         case "mset":
             addr, value = request.args
             emulator.bus.write16(addr, value)
+            if emulator.history is not None:
+                emulator.history.forget_future()
             logger.info(f"set memory at 0x{addr:04X} to 0x{value:04X}.")
         case "mem":
             addr, length = request.args
@@ -275,8 +807,39 @@ def execute_command(emulator: Emulator, request: CommandRequest) -> None:
             logger.info(disasm_at(emulator, emulator.pc.value))
         case "vram":
             display_memory(emulator, 0x4000, 16)
+        case "stats":
+            for line in emulator.stats.report(emulator.cycles):
+                logger.info(line)
+        case "symbols":
+            (file,) = request.args
+            emulator.symbols = SymbolTable.load(file)
+            logger.info(f"loaded {len(emulator.symbols)} symbols from {file}.")
+        case "profile":
+            profile(emulator, *request.args)
+        case "opstats":
+            opstats(emulator, *request.args)
+        case "hostprof":
+            hostprof(emulator, *request.args)
+        case "heatmap":
+            heatmap(emulator, *request.args)
+        case "sysprof":
+            sysprof(emulator, *request.args)
+        case "coverage":
+            coverage(emulator, *request.args)
+        case "trace":
+            trace(emulator, *request.args)
+        case "history":
+            history(emulator, *request.args)
+        case "rstep" | "rcontinue" | "goto":
+            rewind(emulator, request)
+        case "clock":
+            (hz,) = request.args
+            if hz is not None:
+                emulator.clock.set_hz(hz)
+            logger.info(emulator.clock.report())
         case "reset":
             emulator.reset()
+            restart_history(emulator)
         case "clear":
             os.system("cls" if os.name == "nt" else "clear")
         case "help":
@@ -0,0 +1,139 @@
+# replay.py
+# deterministic record/replay of nondeterministic emulator inputs.
+# josiah bergen, october 2026
+
+import struct
+import time
+from collections import deque
+from typing import TYPE_CHECKING, BinaryIO
+
+from .events import Stop, StopReason
+from .exceptions import EmulatorException
+from .util.logger import logger
+
+if TYPE_CHECKING:
+    from .emulator import Emulator
+
+# file layout: header, then fixed-width records in cycle order.
+# every input is delivered at a slice boundary, so the cycle stamps are exact.
+HEADER  = struct.Struct("<4sH")  # magic, version
+RECORD  = struct.Struct("<QBI")  # cycle, kind, value
+MAGIC   = b"JRPL"
+VERSION = 1
+
+KIND_KEY = 1  # scancode pushed to the keyboard
+KIND_RTC = 2  # rtc latch changed, value is packed by _pack_time()
+KIND_END = 3  # end of the recording
+
+
+def _pack_time(t: time.struct_time) -> int:
+    return t.tm_sec | (t.tm_min << 6) | (t.tm_hour << 12) | (t.tm_yday << 17)
+
+
+def _unpack_time(value: int) -> time.struct_time:
+    sec, minute, hour, yday = value & 0x3F, (value >> 6) & 0x3F, (value >> 12) & 0x1F, value >> 17
+    return time.struct_time((0, 0, 0, hour, minute, sec, 0, yday, -1))
+
+
+class InputRecorder:
+    def __init__(self, path: str):
+        """Logs every nondeterministic input with the cycle it was delivered at.
+
+        keys -- staging queue for the graphics controller. keys wait here until
+                the next slice boundary, where they are logged and handed to the keyboard.
+        """
+        self.path = path
+        self.keys: deque[int] = deque()
+        self._latched: time.struct_time = time.localtime()
+        self._packed: int | None = None
+        self._file: BinaryIO | None = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION))
+        logger.info(f"recording inputs to {path}.")
+
+    def sync(self, emu: "Emulator", budget: int) -> int:
+        """Deliver inputs that arrived during the last slice. Returns the next slice budget."""
+        cycle = emu.cycles
+
+        # the rtc is latched once per slice, and only changes are logged
+        now = time.localtime()
+        packed = _pack_time(now)
+        if packed != self._packed:
+            self._packed, self._latched = packed, now
+            self._write(cycle, KIND_RTC, packed)
+
+        while self.keys:
+            key = self.keys.popleft()
+            self._write(cycle, KIND_KEY, key)
+            emu.key_queue.append(key)
+
+        return budget
+
+    def now(self) -> time.struct_time:
+        return self._latched
+
+    def close(self, cycle: int) -> None:
+        if self._file is None:
+            return
+        self._write(cycle, KIND_END, 0)
+        self._file.close()
+        self._file = None
+        logger.info(f"saved input recording to {self.path} ({cycle:,} cycles).")
+
+    def _write(self, cycle: int, kind: int, value: int) -> None:
+        if self._file is not None:
+            self._file.write(RECORD.pack(cycle, kind, value))
+
+
+class InputReplayer:
+    def __init__(self, path: str):
+        """Feeds a recording back at the exact cycles it was captured at."""
+        scope = "replay.py:InputReplayer.__init__()"
+        self.path = path
+        self.keys: deque[int] = deque()  # unused, nothing is captured during replay
+        self._latched: time.struct_time = _unpack_time(0)
+
+        try:
+            self._file: BinaryIO = open(path, "rb")
+        except FileNotFoundError:
+            logger.fatal(f"recording {path} not found!", scope)
+
+        header = self._file.read(HEADER.size)
+        if len(header) != HEADER.size or HEADER.unpack(header) != (MAGIC, VERSION):
+            logger.fatal(f"{path} is not a jaide input recording (or has an unsupported version).", scope)
+
+        self._next: tuple[int, int, int] | None = self._read()
+        logger.info(f"replaying inputs from {path}.")
+
+    def sync(self, emu: "Emulator", budget: int) -> int:
+        """Apply inputs due at this cycle, and cut the slice short at the next one."""
+        cycle = emu.cycles
+        while self._next is not None and self._next[0] <= cycle:
+            at, kind, value = self._next
+            if at < cycle:
+                raise EmulatorException(f"replay diverged: input for cycle {at} was missed (now at cycle {cycle}).")
+
+            if kind == KIND_KEY:
+                emu.key_queue.append(value)
+            elif kind == KIND_RTC:
+                self._latched = _unpack_time(value)
+            elif kind == KIND_END:
+                self._next = None
+                raise Stop(StopReason.REPLAY_END, f"replay finished at cycle {cycle}")
+
+            self._next = self._read()
+
+        if self._next is None:
+            return budget
+        return min(budget, self._next[0] - cycle)
+
+    def now(self) -> time.struct_time:
+        return self._latched
+
+    def close(self, cycle: int) -> None:
+        self._file.close()
+
+    def _read(self) -> tuple[int, int, int] | None:
+        data = self._file.read(RECORD.size)
+        if len(data) < RECORD.size:
+            return None
+        return RECORD.unpack(data)
@@ -0,0 +1,54 @@
+# snapshot.py
+# architectural state snapshots for the jaide emulator.
+# josiah bergen, october 2026
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .exceptions import EmulatorException
+
+if TYPE_CHECKING:
+    from .devices.device import Device
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Everything needed to put an emulator back into an earlier state.
+
+    device state is not included; snapshots are taken from, and restored
+    into, an emulator with the same devices attached.
+    """
+
+    registers: tuple[int, ...]  # in REGISTERS order
+    memory: bytes
+    vram: bytes
+    banks: tuple[bytes, ...]
+    cycles: int
+    halted: bool
+    pending_interrupts: int
+
+
+PLAIN = (bool, int, float, str, type(None))
+
+
+def device_state(device: "Device") -> dict[str, object]:
+    # plain values only. devices keep their buffers, callbacks and host resources.
+    return {
+        name: value
+        for name, value in vars(device).items()
+        if isinstance(value, PLAIN) and name not in device.host_state
+    }
+
+
+def check_device_state(device: "Device", state: dict[str, object]) -> None:
+    # state may have been through json, which would turn anything but a plain value
+    # into something else (a tuple into a list), so only what device_state() saves is taken back
+    for name, value in state.items():
+        if not isinstance(value, PLAIN) or name in device.host_state:
+            raise EmulatorException(f"{type(device).__name__}.{name} isn't part of a device's saved state.")
+
+
+def restore_device_state(device: "Device", state: dict[str, object]) -> None:
+    # the other half of device_state()
+    check_device_state(device, state)
+    vars(device).update(state)
@@ -0,0 +1,74 @@
+# startup.py
+# import-time budget for the emulator, checked with python -m emulator.startup.
+# josiah bergen, october 2026
+
+import os
+import subprocess
+import sys
+
+from tap import Tap
+
+# (module, budget in milliseconds, modules it must not pull in).
+# headless runs and embedders only need the core, pygame and tap load when they're used.
+# budgets leave ~2x headroom over a typical run (best-of-5 timings still swing by half on a
+# busy machine), the forbidden modules are the strict part. test/test_startup.py always checks
+# those, and the timings only with JAIDE_STARTUP_BUDGET=1. `make startup` checks both.
+BUDGETS: list[tuple[str, float, tuple[str, ...]]] = [
+    ("common.isa", 60.0, ("tap",)),
+    ("emulator.emulator", 100.0, ("pygame", "tap")),
+    ("emulator.__main__", 160.0, ("pygame",)),
+]
+
+# runs in a fresh interpreter: prints the import time in seconds, then every loaded module
+PROBE = "import sys, time; started = time.perf_counter(); __import__(sys.argv[1]); print(time.perf_counter() - started); print(' '.join(sys.modules))"
+
+
+def measure(module: str, runs: int) -> tuple[float, set[str]]:
+    """Best-of-runs import time of module in milliseconds, and the modules it loaded."""
+    # bytecode caches are allowed (and warmed up by the first run), which is what real startups see
+    env = {name: value for name, value in os.environ.items() if name != "PYTHONDONTWRITEBYTECODE"}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    best, loaded = float("inf"), set[str]()
+    for run in range(runs + 1):
+        result = subprocess.run([sys.executable, "-c", PROBE, module], capture_output=True, text=True, env=env, cwd=root, check=True)
+        seconds, modules = result.stdout.splitlines()[-2:]
+        if run:
+            best = min(best, float(seconds) * 1000)
+        loaded = set(modules.split())
+    return best, loaded
+
+
+def check(runs: int = 5, scale: float = 1.0) -> list[str]:
+    """Measure every budgeted module. Returns a list of failures, empty if all are within budget."""
+    failures = []
+    for module, budget, forbidden in BUDGETS:
+        elapsed, loaded = measure(module, runs)
+        pulled_in = [name for name in forbidden if name in loaded]
+        over = elapsed > budget * scale
+        print(f"{module:<20} {elapsed:7.1f} ms  (budget {budget * scale:.0f} ms){'  OVER' if over else ''}")
+
+        if over:
+            failures.append(f"{module} took {elapsed:.1f} ms to import, over its {budget * scale:.0f} ms budget.")
+        if pulled_in:
+            failures.append(f"{module} imported {', '.join(pulled_in)}, which should only load on demand.")
+    return failures
+
+
+class StartupArgumentParser(Tap):
+    """check the emulator's import time against its budget"""
+
+    runs: int = 5  # timed imports per module, the best one counts
+    scale: float = 1.0  # multiply every budget, for slow machines
+
+
+if __name__ == "__main__":
+
+    args = StartupArgumentParser(underscores_to_dashes=True).parse_args()
+
+    failures = check(args.runs, args.scale)
+    for failure in failures:
+        print(failure)
+
+    print(f"checked {len(BUDGETS)} modules, {len(failures)} problem{'' if len(failures) == 1 else 's'}.")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,235 @@
+# stats.py
+# run statistics for the jaide emulator.
+# josiah bergen, october 2026
+
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from common.isa import OPCODE_FORMATS
+
+from .hooks import Hook, install
+
+if TYPE_CHECKING:
+    from common.isa import INSTRUCTIONS
+
+    from .devices.device import Device
+    from .emulator import Emulator
+
+
+@dataclass
+class RunStats:
+    """Host-side timing collected by the run loop.
+
+    host_time is measured around every slice. the cpu/device split is estimated
+    from the first instruction of each slice, which is the only one timed in halves.
+    """
+
+    host_time: float = 0.0            # seconds spent executing slices
+    sampled_cpu_time: float = 0.0     # fetch/decode/execute time of sampled instructions
+    sampled_device_time: float = 0.0  # device tick time of sampled instructions
+
+    @property
+    def device_share(self) -> float:
+        sampled = self.sampled_cpu_time + self.sampled_device_time
+        return self.sampled_device_time / sampled if sampled > 0 else 0.0
+
+    def summary(self, instructions: int) -> dict[str, float]:
+        device_time = self.host_time * self.device_share
+        return {
+            "instructions": instructions,
+            "host_time": self.host_time,
+            "mips": instructions / self.host_time / 1e6 if self.host_time > 0 else 0.0,
+            "cpu_time": self.host_time - device_time,
+            "device_time": device_time,
+        }
+
+    def report(self, instructions: int) -> list[str]:
+        summary = self.summary(instructions)
+        cpu_share = 1 - self.device_share if self.host_time > 0 else 0.0
+        return [
+            f"instructions: {instructions:,}",
+            f"host time:    {summary['host_time']:.3f}s",
+            f"speed:        {summary['mips']:.4f} MIPS",
+            f"cpu:          {cpu_share * 100:.1f}% ({summary['cpu_time']:.3f}s)",
+            f"devices:      {self.device_share * 100:.1f}% ({summary['device_time']:.3f}s)",
+        ]
+
+    def reset(self) -> None:
+        self.host_time = 0.0
+        self.sampled_cpu_time = 0.0
+        self.sampled_device_time = 0.0
+
+
+class OpcodeStats:
+    def __init__(self, emu: "Emulator"):
+        """Counts executions and host time per opcode, i.e. per (mnemonic, modes) form.
+
+        every handler on this emulator is wrapped with a timer while this is running,
+        so the cost is only paid when it is on. times include the timer itself,
+        which matters for the cheapest handlers but not for ranking them.
+        """
+        self.emu = emu
+        self.counts: list[int] = [0] * 256
+        self.times: list[float] = [0.0] * 256
+        self.running = True
+        self._hooks = [self._wrap(mnemonic) for mnemonic in list(emu.handlers)]
+
+    def _wrap(self, mnemonic: "INSTRUCTIONS") -> Hook:
+        counts, times = self.counts, self.times
+
+        def timed(e: "Emulator", decoded: tuple[int, ...]) -> None:
+            started = perf_counter()
+            hook.inner(e, decoded)
+            times[decoded[0]] += perf_counter() - started
+            counts[decoded[0]] += 1
+
+        hook = self.emu.hook_handler(mnemonic, timed)
+        return hook
+
+    def stop(self) -> None:
+        # out of the chain wherever it is, even under another tool's hooks
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = []
+        self.running = False
+
+    def reset(self) -> None:
+        self.counts[:] = [0] * 256
+        self.times[:] = [0.0] * 256
+
+    def rows(self) -> list[dict[str, object]]:
+        # one row per executed opcode, most executed first
+        rows = []
+        for opcode, count in enumerate(self.counts):
+            if not count:
+                continue
+            fmt = OPCODE_FORMATS[opcode]
+            rows.append({
+                "opcode": opcode,
+                "mnemonic": fmt.mnemonic.name,
+                "modes": [mode.name for mode in fmt.modes],
+                "count": count,
+                "host_time": self.times[opcode],
+                "mean_ns": self.times[opcode] / count * 1e9,
+            })
+        return sorted(rows, key=lambda row: -row["count"])
+
+    def report(self, top: int = 20) -> list[str]:
+        total = sum(self.counts)
+        if not total:
+            return ["opstats: nothing executed yet."]
+
+        time = sum(self.times)
+        lines = [f"opstats: {total:,} instructions, {time:.3f}s in handlers", "opcode  form                       count      share   mean ns   time"]
+        for row in self.rows()[:top]:
+            form = f"{row['mnemonic']} {', '.join(row['modes'])}".strip()
+            lines.append(
+                f"0x{row['opcode']:02X}    {form:<24} {row['count']:>10,}  {row['count'] / total * 100:5.1f}%  "
+                f"{row['mean_ns']:>8.0f}  {row['host_time'] / time * 100:5.1f}%"
+            )
+        return lines
+
+    def dump(self, path: str) -> int:
+        """Write every executed opcode as json. Returns the number of opcodes."""
+        rows = self.rows()
+        with open(path, "w") as f:
+            json.dump({"instructions": sum(self.counts), "opcodes": rows}, f, indent=2)
+        return len(rows)
+
+
+@dataclass
+class DeviceCounters:
+    """Accounting for a single device."""
+
+    ticks: int = 0
+    tick_time: float = 0.0    # per-instruction ticks only, graphics doesn't tick (see render_time)
+    mmio_time: float = 0.0
+    reads: Counter[int] = field(default_factory=Counter)   # per mmio register
+    writes: Counter[int] = field(default_factory=Counter)
+    renders: int = 0          # graphics only, calls to _render()
+    render_time: float = 0.0  # drawing between slices, or from the main loop while the guest is on a worker
+
+    def clear(self) -> None:
+        # in place, the device hooks hold on to this object
+        self.ticks, self.tick_time, self.mmio_time = 0, 0.0, 0.0
+        self.reads.clear()
+        self.writes.clear()
+        self.renders, self.render_time = 0, 0.0
+
+    def report(self) -> list[str]:
+        per_tick = self.tick_time / self.ticks * 1e9 if self.ticks else 0.0
+        lines = [f"  ticks: {self.ticks:,} ({self.tick_time:.3f}s, {per_tick:.0f} ns/tick), mmio: {self.mmio_time:.3f}s"]
+        for addr in sorted(set(self.reads) | set(self.writes)):
+            lines.append(f"  0x{addr:04X}: {self.reads[addr]:,} r, {self.writes[addr]:,} w")
+        if self.renders:
+            lines.append(f"  render: {self.renders:,} frames ({self.render_time:.3f}s, {self.render_time / self.renders * 1e3:.2f} ms/frame)")
+        return lines
+
+
+class DeviceStats:
+    def __init__(self, devices: list["Device"]):
+        """Counts ticks, mmio accesses and host time per device.
+
+        tick, mmio_read and mmio_write (and _render, for graphics) are hooked on each
+        device instance while this is running, and unhooked by stop().
+        graphics isn't ticked, it draws from refresh() between slices or from wait() on
+        the main thread, so its cost only shows up as render time, never as tick time.
+        """
+        self.devices = devices
+        self.counters: dict[int, DeviceCounters] = {id(device): DeviceCounters() for device in devices}
+        self.running = True
+        self._hooks: list[Hook] = []
+        for device in devices:
+            self._hook(device, self.counters[id(device)])
+
+    def _hook(self, device: "Device", counters: DeviceCounters) -> None:
+        def timed_tick() -> None:
+            started = perf_counter()
+            tick.inner()
+            counters.tick_time += perf_counter() - started
+            counters.ticks += 1
+
+        def timed_read(addr: int) -> int:
+            started = perf_counter()
+            value = mmio_read.inner(addr)
+            counters.mmio_time += perf_counter() - started
+            counters.reads[addr] += 1
+            return value
+
+        def timed_write(addr: int, value: int) -> None:
+            started = perf_counter()
+            mmio_write.inner(addr, value)
+            counters.mmio_time += perf_counter() - started
+            counters.writes[addr] += 1
+
+        tick = install(device, "tick", timed_tick)
+        mmio_read = install(device, "mmio_read", timed_read)
+        mmio_write = install(device, "mmio_write", timed_write)
+        self._hooks += [tick, mmio_read, mmio_write]
+
+        if hasattr(device, "_render"):
+            def timed_render() -> None:
+                started = perf_counter()
+                render.inner()
+                counters.render_time += perf_counter() - started
+                counters.renders += 1
+
+            render = install(device, "_render", timed_render)
+            self._hooks.append(render)
+
+    def stop(self) -> None:
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks.clear()
+        self.running = False
+
+    def reset(self) -> None:
+        for counters in self.counters.values():
+            counters.clear()
+
+    def report(self, device: "Device") -> list[str]:
+        counters = self.counters.get(id(device))
+        return counters.report() if counters is not None else []
@@ -0,0 +1,216 @@
+# sysprof.py
+# syscall-level profiler for the jaide kernel interface.
+# josiah bergen, october 2026
+
+import struct
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from common.isa import INSTRUCTIONS
+
+from .devices.disk import Disk
+from .exceptions import EmulatorException
+from .hooks import Hook, install
+from .util.symbols import SymbolTable
+
+if TYPE_CHECKING:
+    from .emulator import Emulator
+
+SYSCALL_ENTRY = "KERNEL__SYSCALL"            # call kernel__syscall, number in a
+SYSCALL_TABLE = "KERNEL__SC_FUNCTION_TABLE"  # (number, handler) pairs, ending in 0xFFFF
+
+# syscalls that return a status in a, zero for success (docs/kernel.md). the rest
+# return data there (a character, an fd, a count), which says nothing about errors.
+STATUS_SYSCALLS = frozenset({
+    0x01,  # exec
+    0x30,  # fs_mount
+    0x34,  # fs_write
+    0x35,  # fs_seek
+    0x37,  # fs_stat
+})
+
+
+@dataclass
+class SyscallCounters:
+    calls: int = 0
+    instructions: int = 0  # inclusive of nested syscalls
+    most: int = 0          # most expensive single call
+    errors: int = 0        # returned a nonzero status, only counted for STATUS_SYSCALLS
+    mmio_reads: int = 0
+    mmio_writes: int = 0
+    disk_transfers: int = 0
+
+
+@dataclass
+class OpenSyscall:
+    number: int
+    slot: int  # stack slot of the return address
+    instructions: int
+    mmio_reads: int
+    mmio_writes: int
+    disk_transfers: int
+
+
+class SyscallProfiler:
+    def __init__(self, emu: "Emulator", symbols: SymbolTable):
+        """Counts calls, instructions, mmio accesses and disk transfers per syscall number.
+
+        a syscall starts when a CALL (or an interrupt) lands on kernel__syscall, and ends
+        when the return address it pushed is popped again, by RET or IRET. syscalls that never return,
+        i.e. exec resetting the stack, are dropped and counted as abandoned.
+        instructions are counted exactly by shadowing _execute on the emulator.
+        """
+        entry = symbols.address(SYSCALL_ENTRY)
+        if entry is None:
+            raise EmulatorException(f"no {SYSCALL_ENTRY.lower()} in the symbol table, is this the kernel?")
+
+        self.emu = emu
+        self.symbols = symbols
+        self.entry = entry
+        self.counters: dict[int, SyscallCounters] = {}
+        self.abandoned = 0
+        self.running = True
+
+        # running totals, open syscalls remember where these were when they started
+        self.instructions = 0
+        self.mmio_reads = 0
+        self.mmio_writes = 0
+        self.disk_transfers = 0
+        self._open: list[OpenSyscall] = []
+        self._hooks: list[Hook] = []
+        self._hook()
+
+    # hooks
+
+    def _hook(self) -> None:
+        emu, bus = self.emu, self.emu.bus
+
+        def counted_execute() -> None:
+            self.instructions += 1
+            execute.inner()
+
+        def on_call(e: "Emulator", decoded: tuple[int, ...]) -> None:
+            call.inner(e, decoded)
+            if e.pc.value == self.entry:
+                self._enter(e)
+
+        def on_interrupt(vector: int) -> None:
+            interrupt.inner(vector)
+            if emu.pc.value == self.entry:
+                self._enter(emu)
+
+        def on_ret(e: "Emulator", decoded: tuple[int, ...]) -> None:
+            sp = e.sp.value
+            ret.inner(e, decoded)
+            if self._open:
+                self._leave(e, sp)
+
+        def on_iret(e: "Emulator", decoded: tuple[int, ...]) -> None:
+            # the return address is on top of the flags, so it's matched up just like a RET
+            sp = e.sp.value
+            iret.inner(e, decoded)
+            if self._open:
+                self._leave(e, sp)
+
+        def counted_mmio_read(addr: int) -> int:
+            self.mmio_reads += 1
+            return mmio_read.inner(addr)
+
+        def counted_mmio_write(addr: int, value: int) -> None:
+            self.mmio_writes += 1
+            mmio_write.inner(addr, value)
+
+        execute = emu.hook("_execute", counted_execute)
+        interrupt = emu.hook("interrupt", on_interrupt)
+        mmio_read = bus.hook("mmio_read", counted_mmio_read)
+        mmio_write = bus.hook("mmio_write", counted_mmio_write)
+        call = emu.hook_handler(INSTRUCTIONS.CALL, on_call)
+        ret = emu.hook_handler(INSTRUCTIONS.RET, on_ret)
+        iret = emu.hook_handler(INSTRUCTIONS.IRET, on_iret)
+        self._hooks = [execute, interrupt, mmio_read, mmio_write, call, ret, iret]
+
+        for device in emu.devices:
+            if isinstance(device, Disk):
+                self._hooks.append(self._counted_transfer(device))
+
+    def _counted_transfer(self, disk: Disk) -> Hook:
+        def counted() -> None:
+            self.disk_transfers += 1
+            hook.inner()
+
+        hook = install(disk, "_complete_transfer", counted)
+        return hook
+
+    def stop(self) -> None:
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks.clear()
+        self._open.clear()
+        self.running = False
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.abandoned = 0
+
+    # syscall tracking
+
+    def _enter(self, emu: "Emulator") -> None:
+        number = emu.reg_get(0)  # a
+        self._open.append(OpenSyscall(number, emu.sp.value, self.instructions, self.mmio_reads, self.mmio_writes, self.disk_transfers))
+
+    def _leave(self, emu: "Emulator", sp: int) -> None:
+        # syscalls whose return slot was skipped over are never coming back
+        while self._open and self._open[-1].slot < sp:
+            self._open.pop()
+            self.abandoned += 1
+        if not self._open or self._open[-1].slot != sp:
+            return
+
+        call = self._open.pop()
+        counters = self.counters.setdefault(call.number, SyscallCounters())
+        cost = self.instructions - call.instructions
+        counters.calls += 1
+        counters.instructions += cost
+        counters.most = max(counters.most, cost)
+        if call.number in STATUS_SYSCALLS:
+            counters.errors += emu.reg_get(0) != 0
+        counters.mmio_reads += self.mmio_reads - call.mmio_reads
+        counters.mmio_writes += self.mmio_writes - call.mmio_writes
+        counters.disk_transfers += self.disk_transfers - call.disk_transfers
+
+    # reports
+
+    def names(self) -> dict[int, str]:
+        """Syscall numbers to handler labels, read from the kernel's function table."""
+        table = self.symbols.address(SYSCALL_TABLE)
+        names: dict[int, str] = {}
+        if table is None:
+            return names
+
+        for number, handler in struct.iter_unpack("<HH", self.emu.bus.read_block(table, 0x200)):
+            if number == 0xFFFF:
+                break
+            names[number] = self.symbols.label_at(handler)
+        return names
+
+    def report(self) -> list[str]:
+        if not self.counters:
+            return ["sysprof: no syscalls yet."]
+
+        names = self.names()
+        total = sum(counters.instructions for counters in self.counters.values())
+        calls = sum(counters.calls for counters in self.counters.values())
+        lines = [
+            f"sysprof: {calls:,} syscalls, {total:,} instructions inside them" + (f", {self.abandoned} abandoned" if self.abandoned else ""),
+            "#      name                        calls      instr   avg instr    max   mmio r/w      disk  errors",
+        ]
+
+        ranked = sorted(self.counters.items(), key=lambda item: -item[1].instructions)
+        for number, c in ranked:
+            name = names.get(number, "(unknown)")
+            errors = f"{c.errors:,}" if number in STATUS_SYSCALLS else "-"
+            lines.append(
+                f"0x{number:02X}   {name:<24} {c.calls:>8,} {c.instructions:>10,} {c.instructions / c.calls:>11,.1f} {c.most:>6,} "
+                f"{c.mmio_reads:>5,}/{c.mmio_writes:<5,} {c.disk_transfers:>6,} {errors:>7}"
+            )
+        return lines
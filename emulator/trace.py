@@ -0,0 +1,351 @@
+# trace.py
+# streaming binary execution traces, and an offline analyzer for them.
+# josiah bergen, october 2026
+
+import queue
+import struct
+import sys
+import zlib
+from collections.abc import Iterator
+from threading import Thread
+from typing import TYPE_CHECKING, BinaryIO, Literal
+
+from tap import Tap
+
+from common.isa import OPCODE_FORMATS
+
+from .constants import BANK_WINDOW_END, BANK_WINDOW_START, MMIO_BASE, NUM_BANKS, PAGE_WORDS, REGISTERS
+from .exceptions import EmulatorException
+from .util.disasm import disassemble
+from .util.logger import logger
+
+if TYPE_CHECKING:
+    import numpy
+
+    from .emulator import Emulator
+
+# file layout: header, then chunks of fixed-width records.
+# each chunk is (raw length, stored length) followed by the records, zlib
+# compressed when the stored length is shorter. readers never need more than
+# one chunk in memory.
+HEADER  = struct.Struct("<4sHH")  # magic, version, flags
+CHUNK   = struct.Struct("<II")    # raw length, stored length
+RECORD  = struct.Struct("<BBHI")  # kind, small, a, b
+MAGIC   = b"JTRC"
+VERSION = 1
+
+FLAG_COMPRESSED = 0x01
+
+# record kinds. registers are delta-encoded: only changes are written, after the
+# instruction (or device) that made them. PC is left out, every STEP has it.
+KIND_STEP = 1  # a = pc, b = instruction word | immediate << 16
+KIND_REG  = 2  # small = register index, a = new value
+KIND_MEM  = 3  # small = bank, a = address, b = value. includes device writes, i.e. disk dma.
+               # the bank is 0 (main memory) for writes outside the bank window
+
+CHUNK_RECORDS = 8192
+
+
+class TraceWriter:
+    def __init__(self, emu: "Emulator", path: str, compress: bool = False):
+        """Streams a record of every executed instruction, register change and memory write to path.
+
+        records are packed on the emulator thread and handed over a chunk at a time
+        to a writer thread, which compresses (optionally) and writes them, so the
+        run loop never waits on the disk unless the writer falls far behind.
+        """
+        self.emu = emu
+        self.path = path
+        self.compress = compress
+        self.instructions = 0
+        self.running = True
+
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, FLAG_COMPRESSED if compress else 0))
+        self._buffer = bytearray()
+        self._chunks: queue.Queue[bytes | None] = queue.Queue(maxsize=64)
+        self._thread = Thread(target=self._write_chunks, name="jaide-trace", daemon=True)
+        self._thread.start()
+
+        self._registers = [emu.reg[name] for name in REGISTERS if name != "PC"]
+        self._last = [register.value for register in self._registers]
+        self._hook()
+        logger.info(f"tracing to {path}{' (compressed)' if compress else ''}.")
+
+    def _hook(self) -> None:
+        emu, bus = self.emu, self.emu.bus
+        buffer, pack = self._buffer, RECORD.pack
+        registers, last = self._registers, self._last
+        limit = CHUNK_RECORDS * RECORD.size
+
+        def traced_execute() -> None:
+            pc = emu.pc.value
+            word = bus.peek16(pc)
+            fmt = OPCODE_FORMATS.get(word >> 8)
+            imm = bus.peek16(pc + 1) if fmt is not None and fmt.imm_operand is not None else 0
+            buffer.extend(pack(KIND_STEP, 0, pc, word | imm << 16))
+            self.instructions += 1
+
+            try:
+                execute.inner()
+            finally:
+                for index, register in enumerate(registers):
+                    value = register.value
+                    if value != last[index]:
+                        last[index] = value
+                        buffer.extend(pack(KIND_REG, index, value, 0))
+                if len(buffer) >= limit:
+                    self._flush()
+
+        def traced_write16(address: int, value: int, *, bank: int | None = None) -> None:
+            write16.inner(address, value, bank=bank)
+            address &= 0xFFFF
+            selected = 0
+            if BANK_WINDOW_START <= address <= BANK_WINDOW_END:
+                # wraps like the bus does, so bank 0 is always main memory
+                selected = (bus.current_bank() if bank is None else bank) % (NUM_BANKS + 1)
+            buffer.extend(pack(KIND_MEM, selected, address, value & 0xFFFF))
+
+        execute = emu.hook("_execute", traced_execute)
+        write16 = bus.hook("write16", traced_write16)
+        self._hooks = [execute, write16]
+
+    def _flush(self) -> None:
+        if self._buffer:
+            self._chunks.put(bytes(self._buffer))
+            self._buffer.clear()
+
+    def _write_chunks(self) -> None:
+        # writer thread. zlib releases the gil while it works.
+        while (chunk := self._chunks.get()) is not None:
+            stored = zlib.compress(chunk, 1) if self.compress else chunk
+            if len(stored) >= len(chunk):
+                stored = chunk
+            self._file.write(CHUNK.pack(len(chunk), len(stored)))
+            self._file.write(stored)
+
+    def close(self) -> None:
+        if not self.running:
+            return
+        self.running = False
+
+        for hook in self._hooks:
+            hook.remove()
+
+        self._flush()
+        self._chunks.put(None)
+        self._thread.join()
+        self._file.close()
+        logger.info(f"saved trace of {self.instructions:,} instructions to {self.path}.")
+
+
+# reading
+
+def _numpy():
+    # numpy is only needed to analyze traces, not to write them
+    try:
+        import numpy
+    except ImportError:
+        logger.fatal("the trace analyzer needs numpy. install it with `uv sync --extra trace` (or `pip install numpy`).", "trace.py:_numpy()")
+    return numpy
+
+
+def read_chunks(path: str) -> Iterator["numpy.ndarray"]:
+    """Yield the records of a trace file one chunk at a time, as structured arrays."""
+    np = _numpy()
+    dtype = np.dtype([("kind", "u1"), ("small", "u1"), ("a", "<u2"), ("b", "<u4")])
+
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise EmulatorException(f"{path} is not a trace file.")
+        magic, version, _ = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise EmulatorException(f"{path} is not a version {VERSION} trace file.")
+
+        while framing := f.read(CHUNK.size):
+            raw_length, stored_length = CHUNK.unpack(framing)
+            data = f.read(stored_length)
+            if len(data) < stored_length:
+                raise EmulatorException(f"{path} is truncated.")
+            if stored_length < raw_length:
+                data = zlib.decompress(data)
+            yield np.frombuffer(data, dtype=dtype)
+
+
+def _indexed(path: str) -> Iterator[tuple["numpy.ndarray", "numpy.ndarray"]]:
+    # chunks, along with the instruction index each record belongs to
+    np = _numpy()
+    base = 0
+    for records in read_chunks(path):
+        steps = records["kind"] == KIND_STEP
+        index = base + np.cumsum(steps) - 1
+        base += int(steps.sum())
+        yield records, index
+
+
+def _describe(record: "numpy.void") -> str:
+    kind, small, a, b = int(record["kind"]), int(record["small"]), int(record["a"]), int(record["b"])
+    if kind == KIND_STEP:
+        word, imm = b & 0xFFFF, b >> 16
+        return f"0x{a:04X}: {disassemble((word >> 8, (word >> 4) & 0xF, word & 0xF, imm))}"
+    if kind == KIND_REG:
+        return f"  {REGISTERS[small]} = 0x{a:04X}"
+    if kind == KIND_MEM:
+        banked = small and BANK_WINDOW_START <= a <= BANK_WINDOW_END
+        return f"  [0x{a:04X}{f' bank {small}' if banked else ''}] = 0x{b:04X}"
+    return f"  ??? kind {kind}"
+
+
+# analysis
+
+def summarize(path: str, top: int = 10) -> list[str]:
+    np = _numpy()
+    pcs = np.zeros(0x10000, dtype=np.uint64)
+    opcodes = np.zeros(0x100, dtype=np.uint64)
+    pages = np.zeros(0x10000 // PAGE_WORDS, dtype=np.uint64)
+    mmio = np.zeros(0x100, dtype=np.uint64)
+    banks = np.zeros(NUM_BANKS + 1, dtype=np.uint64)
+    instructions = writes = deltas = 0
+
+    for records in read_chunks(path):
+        steps = records[records["kind"] == KIND_STEP]
+        stores = records[records["kind"] == KIND_MEM]
+        instructions += len(steps)
+        writes += len(stores)
+        deltas += int((records["kind"] == KIND_REG).sum())
+        pcs += np.bincount(steps["a"], minlength=0x10000).astype(np.uint64)
+        opcodes += np.bincount((steps["b"] >> 8) & 0xFF, minlength=0x100).astype(np.uint64)
+        pages += np.bincount(stores["a"] // PAGE_WORDS, minlength=len(pages)).astype(np.uint64)
+        to_mmio = stores["a"][(stores["a"] >= MMIO_BASE) & (stores["a"] < MMIO_BASE + 0x100)]
+        mmio += np.bincount(to_mmio - MMIO_BASE, minlength=0x100).astype(np.uint64)
+        windowed = stores[(stores["a"] >= BANK_WINDOW_START) & (stores["a"] <= BANK_WINDOW_END)]
+        banks += np.bincount(windowed["small"] % len(banks), minlength=len(banks)).astype(np.uint64)
+
+    lines = [f"{path}: {instructions:,} instructions, {deltas:,} register changes, {writes:,} memory writes"]
+
+    def table(title: str, counts: "numpy.ndarray", name) -> None:
+        hottest = np.argsort(counts)[::-1][:top]
+        lines.append(title)
+        for index in hottest:
+            if counts[index]:
+                lines.append(f"  {int(counts[index]):>12,}  {name(int(index))}")
+
+    table("top pcs:", pcs, lambda pc: f"0x{pc:04X}")
+    table("top opcodes:", opcodes, lambda op: OPCODE_FORMATS[op].mnemonic.name + " " + ", ".join(m.name for m in OPCODE_FORMATS[op].modes) if op in OPCODE_FORMATS else f"0x{op:02X}")
+    table("top written pages:", pages, lambda page: f"0x{page * PAGE_WORDS:04X}")
+    if mmio.any():
+        table("mmio writes:", mmio, lambda offset: f"0x{MMIO_BASE + offset:04X}")
+    if banks[1:].any():
+        table("bank window writes:", banks, lambda bank: f"bank {bank}" if bank else "main memory")
+    return lines
+
+
+def search(path: str, pc: int | None = None, write: int | None = None, limit: int = 20, bank: int | None = None) -> list[str]:
+    """Instructions at a pc, or that wrote an address. bank narrows writes down to one bank, 0 for main memory."""
+    np = _numpy()
+    lines: list[str] = []
+    for records, index in _indexed(path):
+        if pc is not None:
+            mask = (records["kind"] == KIND_STEP) & (records["a"] == pc)
+        else:
+            mask = (records["kind"] == KIND_MEM) & (records["a"] == write)
+            if bank is not None:
+                mask &= records["small"] == bank
+        for position in np.flatnonzero(mask):
+            lines.append(f"#{int(index[position]):<12,} {_describe(records[position])}")
+            if len(lines) >= limit:
+                return lines
+    return lines
+
+
+def dump(path: str, start: int = 0, count: int = 50) -> list[str]:
+    """Records of instructions start..start+count, as text."""
+    lines: list[str] = []
+    for records, index in _indexed(path):
+        if index[-1] < start:
+            continue
+        for position in range(len(records)):
+            if index[position] >= start + count:
+                return lines
+            if index[position] >= start:
+                prefix = f"#{int(index[position]):<12,} " if records[position]["kind"] == KIND_STEP else " " * 14
+                lines.append(prefix + _describe(records[position]))
+    return lines
+
+
+def diff(first: str, second: str) -> list[str]:
+    """The first record where two traces disagree, compared a window at a time."""
+    np = _numpy()
+    streams = [_indexed(first), _indexed(second)]
+    pending: list[tuple["numpy.ndarray", "numpy.ndarray"] | None] = [None, None]
+    compared = 0
+
+    while True:
+        for side in (0, 1):
+            if pending[side] is None or not len(pending[side][0]):
+                pending[side] = next(streams[side], None)
+
+        if pending[0] is None or pending[1] is None:
+            if pending[0] is None and pending[1] is None:
+                return [f"traces are identical ({compared:,} records)."]
+            shorter = first if pending[0] is None else second
+            return [f"{shorter} ends after {compared:,} records, the other trace keeps going."]
+
+        (a, a_index), (b, b_index) = pending  # type: ignore[misc]
+        width = min(len(a), len(b))
+        mismatch = np.flatnonzero(a[:width] != b[:width])
+        if len(mismatch):
+            at = int(mismatch[0])
+            return [
+                f"traces diverge at record {compared + at:,} (instruction #{int(a_index[at]):,}):",
+                f"  {first}: {_describe(a[at]).strip()}",
+                f"  {second}: {_describe(b[at]).strip()}",
+            ]
+
+        compared += width
+        pending = [(a[width:], a_index[width:]), (b[width:], b_index[width:])]
+
+
+class TraceArgumentParser(Tap):
+    """analyze execution traces written by the emulator's 'trace' command"""
+
+    command: Literal["summary", "search", "dump", "diff"]
+    files: list[str]  # trace file(s), two for diff
+    top: int = 10  # rows per table in summary
+    pc: str = ""  # search: instructions at this address (hex)
+    write: str = ""  # search: memory writes to this address (hex)
+    bank: int | None = None  # search: only writes into this bank, 0 for main memory
+    start: int = 0  # dump: first instruction
+    count: int = 50  # dump: number of instructions
+    limit: int = 20  # search: maximum number of matches
+
+    def configure(self):
+        self.add_argument("command")
+        self.add_argument("files", nargs="+")
+
+
+if __name__ == "__main__":
+    args = TraceArgumentParser(underscores_to_dashes=True).parse_args()
+
+    try:
+        match args.command:
+            case "summary":
+                output = [line for file in args.files for line in summarize(file, args.top)]
+            case "search":
+                if bool(args.pc) == bool(args.write):
+                    logger.fatal("search needs exactly one of --pc or --write.", "trace.py:__main__")
+                if args.bank is not None and not args.write:
+                    logger.fatal("--bank only applies to --write.", "trace.py:__main__")
+                output = search(args.files[0], int(args.pc, 16) if args.pc else None, int(args.write, 16) if args.write else None, args.limit, args.bank)
+            case "dump":
+                output = dump(args.files[0], args.start, args.count)
+            case "diff":
+                if len(args.files) != 2:
+                    logger.fatal("diff needs two trace files.", "trace.py:__main__")
+                output = diff(*args.files)
+    except EmulatorException as e:
+        logger.fatal(e.message, "trace.py:__main__")
+
+    print("\n".join(output))
+    sys.exit(0)
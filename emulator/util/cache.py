@@ -0,0 +1,11 @@
+# util/cache.py
+# where the emulator keeps files it can always rebuild.
+# josiah bergen, october 2026
+
+import os
+
+
+def cache_directory(name: str) -> str:
+    # $XDG_CACHE_HOME/jaide/<name>, or ~/.cache/jaide/<name>
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "jaide", name)
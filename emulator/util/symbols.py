@@ -0,0 +1,78 @@
+# symbols.py
+# symbol table loaded from a jasm .sym file (jasm --symbols).
+# josiah bergen, october 2026
+
+import os
+from bisect import bisect_right
+
+from ..exceptions import EmulatorException
+
+SYMBOLS_HEADER = "# jasm symbol table v1"
+
+
+class SymbolTable:
+    def __init__(self, labels: dict[str, int] | None = None, lines: dict[int, tuple[str, int]] | None = None):
+        """Maps addresses back to labels and source lines.
+
+        labels -- label name to address
+        lines  -- instruction address to (file, line)
+        """
+        self.labels: dict[str, int] = labels or {}
+        self.lines: dict[int, tuple[str, int]] = lines or {}
+
+        # sorted once, so lookups are a bisect
+        ordered = sorted(self.labels.items(), key=lambda item: item[1])
+        self._addrs: list[int] = [addr for _, addr in ordered]
+        self._names: list[str] = [name for name, _ in ordered]
+
+    @classmethod
+    def load(cls, path: str) -> "SymbolTable":
+        if not os.path.exists(path):
+            raise EmulatorException(f"symbol file {path} does not exist.")
+
+        labels: dict[str, int] = {}
+        lines: dict[int, tuple[str, int]] = {}
+        with open(path, "r") as f:
+            if f.readline().strip() != SYMBOLS_HEADER:
+                raise EmulatorException(f"{path} is not a jasm symbol file.")
+
+            for number, record in enumerate(f, start=2):
+                fields = record.split(maxsplit=3)
+                try:
+                    if fields[0] == "label":
+                        labels[fields[2]] = int(fields[1], 16)
+                    elif fields[0] == "line":
+                        lines[int(fields[1], 16)] = (fields[3].rstrip("\n"), int(fields[2]))
+                except (IndexError, ValueError):
+                    raise EmulatorException(f"malformed symbol record in {path} on line {number}.")
+
+        return cls(labels, lines)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def address(self, name: str) -> int | None:
+        return self.labels.get(name.upper())
+
+    def lookup(self, addr: int) -> tuple[str, int] | None:
+        """The closest label at or before addr, and addr's offset from it."""
+        index = bisect_right(self._addrs, addr) - 1
+        if index < 0:
+            return None
+        return self._names[index], addr - self._addrs[index]
+
+    def label_at(self, addr: int) -> str:
+        found = self.lookup(addr)
+        return found[0].lower() if found else "???"
+
+    def describe(self, addr: int) -> str:
+        # label+offset, i.e. "tty__scroll+3"
+        found = self.lookup(addr)
+        if found is None:
+            return f"0x{addr:04X}"
+        name, offset = found
+        return f"{name.lower()}+{offset}" if offset else name.lower()
+
+    def source(self, addr: int) -> str:
+        file, line = self.lines.get(addr, ("???", 0))
+        return f"{file}:{line}"
@@ -16,6 +16,7 @@ class JasmArgumentParser(Tap):
     nowarn: bool = False  # suppress warnings
     nowrite: bool = False  # suppress writing to ouput file
     nolink: bool = False  # enable low-level capabilities, makes binary unlinkable
+    symbols: bool = False  # also write a symbol table (.sym) next to the output file
     verbosity: int = logger.log_level.INFO  # verbosity level (0-3)
 
     def configure(self):
@@ -61,6 +62,7 @@ def main():
     options: dict[str, bool] = {
         "linkable": not args.nolink,
         "write": not args.nowrite,
+        "symbols": args.symbols,
     }
 
     try:
@@ -8,6 +8,7 @@ from jasm.language.context import AssemblyContext
 from jasm.language.ir.base import DefineDirectiveNode, MacroDefinitionNode, OrgDirectiveNode
 from jasm.macros import expand_macros
 from jasm.parse import generate_context, parse_text
+from jasm.symbols import generate_symbols, symbols_path
 from jasm.util.logger import logger
 
 
@@ -64,5 +65,12 @@ def assemble(file: str, output: str, options: dict[str, bool] = {}):
         _ = f.write(binary)
         logger.info(f"wrote {len(binary)} bytes to {output}.")
 
+    # write the symbol table next to the binary, for the emulator's debugger and profiler
+    if ctx.write and options.get("symbols", False):
+        path = symbols_path(output)
+        with open(path, "w") as f:
+            _ = f.write(generate_symbols(ctx))
+        logger.info(f"wrote {len(ctx.labels)} symbols to {path}.")
+
     logger.success("assembly complete! yay!")
     return
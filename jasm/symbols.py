@@ -0,0 +1,35 @@
+# symbols.py
+# symbol table generation, for debuggers and profilers.
+# josiah bergen, october 2026
+
+import os
+
+from .language.context import AssemblyContext
+from .language.ir.base import InstructionNode
+
+# the symbol file is plain text, one record per line:
+#   label <addr> <name>
+#   line <addr> <line> <file>
+# addresses are hex words. the file name goes last so it may contain spaces.
+SYMBOLS_HEADER = "# jasm symbol table v1"
+
+
+def generate_symbols(context: AssemblyContext) -> str:
+    """Generate a symbol table (labels and per-instruction source lines) from the prepared IR."""
+
+    records = [SYMBOLS_HEADER]
+
+    for name, addr in sorted(context.labels.items(), key=lambda item: item[1]):
+        records.append(f"label {addr:04X} {name}")
+
+    for node in context.ir:
+        if isinstance(node, InstructionNode):
+            # relative paths keep symbol files portable between checkouts
+            records.append(f"line {node.pc:04X} {node.line} {os.path.relpath(node.filename)}")
+
+    return "\n".join(records) + "\n"
+
+
+def symbols_path(output: str) -> str:
+    """The symbol file that goes with a binary, i.e. bin/boot.bin -> bin/boot.sym"""
+    return os.path.splitext(output)[0] + ".sym"
@@ -0,0 +1,90 @@
+# conftest.py
+# shared fixtures: emulators running small assembled programs, and the kernel.
+# josiah bergen, october 2026
+
+import os
+import shutil
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+import pytest
+
+from emulator.devices.keyboard import Keyboard
+from emulator.emulator import Emulator
+from emulator.util.logger import logger
+from emulator.util.symbols import SymbolTable
+from jasm.jasm import assemble, assemble_string
+from jasm.util.logger import logger as jasm_logger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KERNEL = os.path.join(ROOT, "kernel", "boot.jasm")
+DISK_IMAGE = os.path.join(ROOT, "jfs", "images", "disk.img")
+
+
+@contextmanager
+def silenced() -> Iterator[None]:
+    # the assembler logs to stdout, keep it quiet while building test programs
+    level, warnings = jasm_logger.level, jasm_logger.warnings
+    jasm_logger.set_level(0)
+    jasm_logger.set_warnings(False)
+    try:
+        yield
+    finally:
+        jasm_logger.set_level(level)
+        jasm_logger.set_warnings(warnings)
+
+
+@pytest.fixture
+def machine() -> Callable[..., Emulator]:
+    """Returns a function that assembles source, loads it at 0 and hands back the emulator."""
+
+    def create(source: str, **kwargs) -> Emulator:
+        with silenced():
+            binary = assemble_string(source, {"linkable": False})
+        emu = Emulator(verbosity=logger.log_level.ERROR, **kwargs)
+        emu.bus.load_bytes(0, binary)
+        return emu
+
+    return create
+
+
+@pytest.fixture
+def binary(tmp_path) -> Callable[[str], str]:
+    """Returns a function that assembles source into a .bin file, for code that loads binaries itself."""
+
+    def create(source: str) -> str:
+        path = tmp_path / f"program{len(list(tmp_path.glob('*.bin')))}.bin"
+        with silenced():
+            path.write_bytes(assemble_string(source, {"linkable": False}))
+        return str(path)
+
+    return create
+
+
+@pytest.fixture(scope="session")
+def kernel(tmp_path_factory: pytest.TempPathFactory) -> tuple[bytes, SymbolTable]:
+    """The kernel, assembled once per session, and its symbol table."""
+    output = str(tmp_path_factory.mktemp("kernel") / "boot.bin")
+    with silenced():
+        assemble(KERNEL, output, {"linkable": False, "write": True, "symbols": True})
+    with open(output, "rb") as f:
+        binary = f.read()
+    return binary, SymbolTable.load(output.removesuffix(".bin") + ".sym")
+
+
+@pytest.fixture
+def booted(kernel: tuple[bytes, SymbolTable], tmp_path) -> Callable[..., Emulator]:
+    """Returns a function that creates an emulator with the kernel loaded, the disk attached and a keyboard."""
+
+    def create(**kwargs) -> Emulator:
+        # the disk writes back to its image, so every emulator gets a fresh copy
+        image = str(tmp_path / f"disk{len(os.listdir(tmp_path))}.img")
+        shutil.copyfile(DISK_IMAGE, image)
+        emu = Emulator(verbosity=logger.log_level.ERROR, enabled_devices={"pit": True, "disk": True}, image_file=image, **kwargs)
+        emu.bus.load_bytes(0, kernel[0])
+        emu.symbols = kernel[1]
+        if not any(isinstance(device, Keyboard) for device in emu.devices):
+            emu.devices.append(Keyboard(emu.key_queue))
+        return emu
+
+    return create
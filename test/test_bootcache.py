@@ -0,0 +1,69 @@
+# test_bootcache.py
+# a boot snapshot puts the kernel and its devices back exactly where the boot left them.
+# josiah bergen, october 2026
+
+import json
+
+import pytest
+
+from emulator import bootcache
+from emulator.bootcache import HEADER, BootCache
+from emulator.devices.disk import Disk
+from emulator.devices.pit import PIT
+from emulator.emulator import Emulator
+from emulator.events import StopReason
+from emulator.exceptions import EmulatorException
+from emulator.snapshot import device_state
+
+
+def state(emu: Emulator) -> tuple:
+    return emu.snapshot(), [(type(device).__name__, device_state(device)) for device in emu.devices]
+
+
+def test_round_trip_through_the_kernel_boot(booted, tmp_path) -> None:
+    first = booted()
+    trigger = first.symbols.address("kernel__loop")
+    BootCache(first, "key", trigger, str(tmp_path)).arm()
+    # a predicate, not an address: an until breakpoint at the trigger would stop the boot before the snapshot
+    assert first.run(100_000, until=lambda e: e.pc.value == trigger).reason is StopReason.UNTIL
+    saved = state(first)
+
+    assert {PIT, Disk} <= {type(device) for device in first.devices}
+
+    second = booted()
+    assert BootCache(second, "key", trigger, str(tmp_path)).restore()
+    assert state(second) == saved
+
+    # and both carry on identically
+    first.run(5_000)
+    second.run(5_000)
+    assert state(second) == state(first)
+
+
+def test_refuses_state_json_mangled(booted, tmp_path) -> None:
+    emu = booted()
+    trigger = emu.symbols.address("kernel__loop")
+    cache = BootCache(emu, "key", trigger, str(tmp_path))
+    cache.arm()
+    emu.run(100_000, until=lambda e: e.pc.value == trigger)
+
+    # a tuple saved by mistake would come back from json as a list
+    with open(cache.path, "rb") as f:
+        _, version, length = HEADER.unpack(f.read(HEADER.size))
+        meta = json.loads(f.read(length))
+        storage = f.read()
+    meta["devices"][0][1]["window"] = [1, 2]
+    encoded = json.dumps(meta).encode()
+    with open(cache.path, "wb") as f:
+        f.write(HEADER.pack(bootcache.MAGIC, version, len(encoded)) + encoded + storage)
+
+    fresh = booted()
+    before = state(fresh)
+    assert not BootCache(fresh, "key", trigger, str(tmp_path)).restore()
+    assert state(fresh) == before  # nothing was half restored
+
+
+def test_refuses_recording(machine, tmp_path) -> None:
+    emu = machine("halt", record=str(tmp_path / "keys.jrpl"))
+    with pytest.raises(EmulatorException):
+        bootcache.start(emu, "unused.bin", "", [], "0000", str(tmp_path))
@@ -0,0 +1,101 @@
+# test_bus.py
+# bulk memory operations agree with word-at-a-time access, across every region boundary.
+# josiah bergen, october 2026
+
+import random
+import struct
+
+import pytest
+
+from emulator.bus import MemoryBus
+from emulator.constants import BANK_WINDOW_START, MMIO_BASE, MMIO_END, ROM_END, VRAM_START
+
+# ranges that start, end or cross rom, vram, the bank window, mmio and the top of memory
+RANGES = [
+    (0x0000, 0x10000),
+    (0x00F0, 0x20),
+    (0x3FF0, 0x30),
+    (0x6FFF, 0x4002),
+    (0xAFF0, 0x20),
+    (0xFDFF, 0x300),
+    (0xFFF0, 0x20),  # wraps around to 0
+    (0x1234, 0),
+]
+
+
+@pytest.fixture(params=[0, 3], ids=["bank 0", "bank 3"])
+def bus(request: pytest.FixtureRequest) -> MemoryBus:
+    bus = MemoryBus(lambda: request.param, lambda addr: 0x1234, lambda addr, value: None)
+    rng = random.Random(1)
+    for selected in (0, 3):
+        bus.write_block(0, rng.randbytes(0x20000), bank=selected, rom=True)
+    return bus
+
+
+def words(bus: MemoryBus, address: int, length: int, bank: int | None = None) -> list[int]:
+    return [bus.peek16((address + i) & 0xFFFF, bank=bank) for i in range(length)]
+
+
+@pytest.mark.parametrize(("address", "length"), RANGES)
+def test_read_block(bus: MemoryBus, address: int, length: int) -> None:
+    data = bus.read_block(address, length)
+    assert list(struct.unpack(f"<{length}H", data)) == words(bus, address, length)
+
+
+@pytest.mark.parametrize(("address", "length"), RANGES)
+def test_write_block_round_trip(bus: MemoryBus, address: int, length: int) -> None:
+    before = words(bus, 0, 0x10000)
+    data = random.Random(address).randbytes(length * 2)
+    bus.write_block(address, data)
+
+    written = dict(zip(((address + i) & 0xFFFF for i in range(length)), struct.unpack(f"<{length}H", data)))
+    for addr, old in enumerate(before):
+        # rom is skipped, mmio reads as zero either way
+        expected = written.get(addr, old) if ROM_END < addr and not MMIO_BASE <= addr <= MMIO_END else old
+        assert bus.peek16(addr) == expected, hex(addr)
+
+
+def test_fill_skips_rom_and_mmio(bus: MemoryBus) -> None:
+    rom = words(bus, 0xF0, 0x10)
+    bus.fill(0x00F0, 0x20, 0xBEEF)
+    bus.fill(MMIO_BASE - 2, 4, 0xBEEF)
+
+    assert words(bus, 0xF0, 0x10) == rom
+    assert words(bus, 0x100, 0x10) == [0xBEEF] * 0x10
+    assert words(bus, MMIO_BASE - 2, 4) == [0xBEEF, 0xBEEF, 0, 0]
+
+
+def test_copy_overlapping(bus: MemoryBus) -> None:
+    source = words(bus, VRAM_START - 8, 0x20)
+    bus.copy(VRAM_START - 4, VRAM_START - 8, 0x20)  # forwards over itself, across into vram
+    assert words(bus, VRAM_START - 4, 0x20) == source
+
+    source = words(bus, BANK_WINDOW_START, 0x20)
+    bus.copy(BANK_WINDOW_START - 4, BANK_WINDOW_START, 0x20)  # and backwards, out of the bank window
+    assert words(bus, BANK_WINDOW_START - 4, 0x20) == source
+
+
+def test_copy_between_banks(bus: MemoryBus) -> None:
+    bus.copy(BANK_WINDOW_START, BANK_WINDOW_START + 0x100, 0x40, bank=5, source_bank=3)
+    assert words(bus, BANK_WINDOW_START, 0x40, bank=5) == words(bus, BANK_WINDOW_START + 0x100, 0x40, bank=3)
+
+
+def test_compare(bus: MemoryBus) -> None:
+    assert bus.compare(0x2000, 0x2000, 0x100) is None
+    bus.copy(0x5000, 0x2000, 0x100)
+    assert bus.compare(0x2000, 0x5000, 0x100) is None
+
+    for index in (0, 1, 0x7F, 0xFF):
+        bus.write16(0x5000 + index, bus.peek16(0x2000 + index) ^ 1)
+        assert bus.compare(0x2000, 0x5000, 0x100) == index
+        bus.copy(0x5000, 0x2000, 0x100)
+
+
+def test_find(bus: MemoryBus) -> None:
+    bus.write_block(0x9000, bytes(range(1, 9)))
+    expected = next(addr for addr in range(0x10000) if words(bus, addr, 2) == [0x0403, 0x0605])
+    assert bus.find(bytes(range(3, 7))) == expected
+
+    # odd byte offsets don't count
+    assert bus.find(bytes(range(2, 6)), 0x9000, 0x10) is None
+    assert bus.find(0x0201, 0x9000, 1) == 0x9000
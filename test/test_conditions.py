@@ -0,0 +1,101 @@
+# test_conditions.py
+# breakpoint conditions accept integer arithmetic on registers and memory, and nothing else.
+# josiah bergen, october 2026
+
+import pytest
+
+from emulator.conditions import Breakpoint, compile_expression, compile_until
+from emulator.emulator import Emulator
+from emulator.events import StopReason
+from emulator.exceptions import EmulatorException
+from emulator.util.logger import logger
+
+
+@pytest.fixture
+def emu() -> Emulator:
+    emu = Emulator(verbosity=logger.log_level.ERROR)
+    emu.reg["A"].set(5)
+    emu.reg["B"].set(0x1234)
+    emu.bus.write16(0x8000, 7)
+    return emu
+
+
+@pytest.mark.parametrize(("text", "expected"), [
+    ("a == 5", True),
+    ("A + 1", 6),
+    ("b & 0xff", 0x34),
+    ("(b >> 8) | 1", 0x13),
+    ("~a & 0xffff", 0xFFFA),
+    ("-a", -5),
+    ("a * 3 // 2 % 4", 3),
+    ("a ^ 1 << 2", 1),
+    ("[0x8000] > 3 and not a < 5", True),
+    ("[0x7ff0 + 0x10] == 7 or pc", True),
+    ("[0x18000]", 7),  # addresses wrap at 16 bits
+    ("1 <= a != b", True),
+    ("hits", 3),
+])
+def test_allowed(emu: Emulator, text: str, expected: object) -> None:
+    assert compile_expression(emu, text)(3) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "__import__('os')",
+    "open",
+    "a.value",
+    "a()",
+    "a[0]",
+    "[a, b]",
+    "[]",
+    "'a'",
+    "1.5",
+    "True",
+    "None",
+    "a ** 2",
+    "a / 2",
+    "a if b else 0",
+    "lambda: 0",
+    "(a := 1)",
+    "{a: b}",
+    "(a, b)",
+    "[x for x in a]",
+    "f'{a}'",
+    "q == 1",
+    "a = 1",
+    "a ==",
+])
+def test_rejected(emu: Emulator, text: str) -> None:
+    with pytest.raises(EmulatorException):
+        compile_expression(emu, text)
+
+
+def test_conditions_have_no_builtins(emu: Emulator) -> None:
+    # even a name that slipped past the compiler would find nothing to call
+    assert compile_expression(emu, "a").__globals__["__builtins__"] == {}
+
+
+def test_until_changes(emu: Emulator) -> None:
+    changed = compile_until(emu, "[0x8000] + a changes")
+    assert not changed()
+    emu.bus.write16(0x8000, 8)
+    assert changed()
+
+
+def test_breakpoint_condition_and_hits(machine) -> None:
+    emu = machine("""
+        mov c, 0
+    loop:
+        inc c
+        cmp c, 10
+        jnz loop
+        halt
+    """)
+    emu.breakpoints[0x02] = Breakpoint(0x02, "c == 4", compile_expression(emu, "c == 4"))
+    result = emu.run(100)
+    assert result.reason is StopReason.BREAKPOINT
+    assert emu.reg_get(2) == 4
+    assert emu.breakpoints[0x02].hits == 5  # counted whether or not the condition held
+
+    emu.breakpoints[0x02] = Breakpoint(0x02, "hits % 3 == 0", compile_expression(emu, "hits % 3 == 0"))
+    emu.run(100)
+    assert emu.reg_get(2) == 6
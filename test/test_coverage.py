@@ -0,0 +1,97 @@
+# test_coverage.py
+# coverage marks exactly the instructions that ran, wherever a run stops.
+# josiah bergen, october 2026
+
+from emulator.constants import BANK_WINDOW_END, BANK_WINDOW_START, NUM_BANKS
+from emulator.coverage import Coverage
+from emulator.emulator import Emulator
+
+# a periodic pit interrupt and an idle loop
+TICKING = """
+    mov a, handler
+    mov b, 0xff05
+    put [b], a
+    mov a, 10
+    mov b, 0xfe10
+    put [b], a
+    mov a, 1
+    mov b, 0xfe11
+    put [b], a
+    sti
+idle:
+    cmp a, 1
+    jz idle
+    halt
+handler:
+    inc d
+    iret
+"""
+
+
+def record_executed(emu: Emulator) -> list[bytearray]:
+    """Bitmaps like Coverage's, set one instruction at a time from inside _execute."""
+    bitmaps = [bytearray(0x10000 // 8) for _ in range(NUM_BANKS + 1)]
+
+    def recorded() -> None:
+        pc = emu.pc.value
+        bank = emu.mb.value % (NUM_BANKS + 1) if BANK_WINDOW_START <= pc <= BANK_WINDOW_END else 0
+        bitmaps[bank][pc >> 3] |= 1 << (pc & 7)
+        hook.inner()
+
+    hook = emu.hook("_execute", recorded)
+    return bitmaps
+
+
+def test_first_instructions(booted) -> None:
+    emu = booted()
+    emu.coverage = coverage = Coverage(emu)  # before anything runs, like --coverage
+    exact = record_executed(emu)
+
+    for count in (1, 1, 2, 3, 5, 8):
+        emu.run(count)
+        assert coverage.bitmaps == exact, f"at cycle {emu.cycles}"
+
+
+def test_matches_every_stop(booted) -> None:
+    emu = booted()
+    emu.coverage = coverage = Coverage(emu)
+    exact = record_executed(emu)
+
+    # odd run lengths, so runs stop in the middle of blocks, interrupt handlers and syscalls
+    for keys, count in ((b"", 40_000), (b"help\r", 7_919), (b"", 30_011), (b"ls\r", 20_021)):
+        emu.key_queue.extend(keys)
+        while count > 0:
+            emu.run(min(count, 997))
+            count -= 997
+            assert coverage.bitmaps == exact, f"at cycle {emu.cycles}"
+
+    assert coverage.instructions() == sum(bin(byte).count("1") for bitmap in exact for byte in bitmap)
+
+
+def test_lines(booted, kernel) -> None:
+    emu = booted()
+    emu.coverage = coverage = Coverage(emu)
+    emu.run(until=kernel[1].address("KERNEL__LOOP"))
+
+    boot = coverage.lines(kernel[1])["kernel/boot.jasm"]
+    assert boot and all(boot.values())  # everything in boot.jasm runs on the way to the main loop
+
+
+def test_stop_keeps_other_hooks(machine) -> None:
+    emu = machine(TICKING, enabled_devices={"pit": True})
+    vectors = []
+
+    def counted(vector: int) -> None:
+        vectors.append(vector)
+        hook.inner(vector)
+
+    hook = emu.hook("interrupt", counted)  # i.e. the profiler's, installed before coverage
+    emu.coverage = coverage = Coverage(emu)
+    emu.run(200)
+    coverage.stop()
+    marked = [bytes(bitmap) for bitmap in coverage.bitmaps]
+    seen = len(vectors)
+
+    emu.run(200)
+    assert [bytes(bitmap) for bitmap in coverage.bitmaps] == marked
+    assert seen and len(vectors) > seen
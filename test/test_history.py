@@ -0,0 +1,130 @@
+# test_history.py
+# stepping backwards lands on exactly the state that was there going forwards.
+# josiah bergen, october 2026
+
+import hashlib
+
+from emulator.devices.keyboard import Keyboard
+from emulator.emulator import Emulator
+from emulator.events import StopReason
+from emulator.history import History, Journal
+
+# memory, a bank, the pit's interrupts and rtc reads, which history journals
+PROGRAM = """
+    mov a, handler
+    mov b, 0xff05
+    put [b], a
+    mov a, 7
+    mov b, 0xfe10
+    put [b], a
+    mov a, 1
+    mov b, 0xfe11
+    put [b], a
+    sti
+    mov c, 0
+loop:
+    inc c
+    mov b, 0xfe30
+    get e, [b]
+    mov mb, 2
+    mov b, 0x7000
+    add b, c
+    put [b], c
+    mov mb, 0
+    mov b, 0x3000
+    add b, c
+    add e, d
+    put [b], e
+    cmp c, 1000
+    jnz loop
+    halt
+handler:
+    inc d
+    iret
+"""
+
+
+def state(emu: Emulator) -> tuple:
+    # everything a snapshot holds, with memory hashed so hundreds of them stay small
+    snapshot = emu.snapshot()
+    memory = hashlib.sha1(snapshot.memory + snapshot.vram + b"".join(snapshot.banks)).digest()
+    return snapshot.registers, memory, snapshot.cycles, snapshot.halted, snapshot.pending_interrupts, emu.devices[0].counter
+
+
+def test_rstep_matches_forward(machine) -> None:
+    emu = machine(PROGRAM, enabled_devices={"pit": True, "rtc": True})
+    emu.history = History(emu, interval=64)
+
+    forward = [state(emu)]
+    for _ in range(400):
+        emu.run(1)
+        forward.append(state(emu))
+
+    # one instruction at a time, as rstep does
+    while emu.cycles:
+        emu.history.goto(emu.cycles - 1)
+        assert state(emu) == forward[emu.cycles]
+
+
+def test_goto_jumps_both_ways(machine) -> None:
+    emu = machine(PROGRAM, enabled_devices={"pit": True, "rtc": True})
+    emu.history = History(emu, interval=50)
+
+    forward = {}
+    for cycle in range(0, 1200, 37):
+        emu.run(cycle - emu.cycles)
+        forward[cycle] = state(emu)
+
+    for cycle in (370, 37, 1184, 0, 555):
+        emu.history.goto(cycle)
+        assert state(emu) == forward[cycle]
+
+
+# the kernel's idle loop, more or less: poll the keyboard until a key arrives
+IDLE = """
+poll:
+    mov b, 0xfe02
+    get a, [b]
+    cmp a, 0
+    jz poll
+    halt
+"""
+
+
+def test_idle_journal_stays_bounded(machine) -> None:
+    emu = machine(IDLE)
+    emu.devices.append(Keyboard(emu.key_queue))
+    emu.history = History(emu, interval=500, max_checkpoints=16)
+
+    emu.run(40_000)
+    journal = emu.history.journals[0xFE02]
+    assert len(journal) == 10_000  # one status read every four instructions
+    assert journal.runs() == 1  # all of them 0
+
+    emu.key_queue.append(ord("a"))
+    assert emu.run(100).reason is StopReason.HALTED
+    assert journal.runs() == 2
+
+    # back into the idle stretch, and forwards again to just after the read that saw the key
+    emu.history.goto(12_345)
+    assert emu.reg_get(0) == 0
+    emu.history.goto(40_002)
+    assert emu.reg_get(0) == 1
+    assert journal.runs() == 2
+
+
+def test_journal_truncates_inside_a_run() -> None:
+    journal = Journal()
+    for value in (0, 0, 0, 5, 5, 7):
+        journal.append(value)
+    assert journal.runs() == 3 and [journal[i] for i in range(6)] == [0, 0, 0, 5, 5, 7]
+
+    journal.truncate(4)
+    assert len(journal) == 4 and journal.runs() == 2 and journal[3] == 5
+    journal.truncate(3)
+    assert len(journal) == 3 and journal.runs() == 1
+
+    journal.append(0)
+    assert journal.runs() == 1 and journal[3] == 0
+    journal.truncate(0)
+    assert len(journal) == 0 and journal.runs() == 0
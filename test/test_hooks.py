@@ -0,0 +1,110 @@
+# test_hooks.py
+# hooks can be removed in any order without disturbing the rest of the chain.
+# josiah bergen, october 2026
+
+from itertools import permutations
+
+import pytest
+
+from emulator.emulator import Emulator
+from emulator.handlers import handler_map
+from emulator.heatmap import MemoryHeatmap
+from emulator.history import History
+from emulator.hooks import Hook
+from emulator.profiler import Profiler
+from emulator.stats import OpcodeStats
+from emulator.sysprof import SyscallProfiler
+from emulator.util.logger import logger
+from emulator.util.symbols import SymbolTable
+
+
+@pytest.fixture
+def emu() -> Emulator:
+    return Emulator(verbosity=logger.log_level.ERROR)
+
+
+def tagged(calls: list[str], hooks: dict[str, Hook], tag: str):
+    # a write16 hook that notes it was called, then carries on down the chain
+    def wrapper(address: int, value: int, *, bank: int | None = None) -> None:
+        calls.append(tag)
+        hooks[tag].inner(address, value, bank=bank)
+
+    return wrapper
+
+
+@pytest.mark.parametrize("order", list(permutations("abc")))
+def test_remove_in_any_order(emu: Emulator, order: tuple[str, ...]) -> None:
+    calls: list[str] = []
+    hooks: dict[str, Hook] = {}
+    for tag in "abc":
+        hooks[tag] = emu.bus.hook("write16", tagged(calls, hooks, tag))
+
+    emu.bus.write16(0x2000, 1)
+    assert calls == ["c", "b", "a"]  # the latest hook runs first
+
+    remaining = ["c", "b", "a"]
+    for tag in order:
+        hooks[tag].remove()
+        remaining.remove(tag)
+        calls.clear()
+        emu.bus.write16(0x2000, 2)
+        assert calls == remaining
+        assert emu.bus.peek16(0x2000) == 2
+
+    assert "write16" not in emu.bus.__dict__  # back to the class method
+    assert not emu.bus.__dict__["_hook_chains"]
+
+
+def test_remove_twice(emu: Emulator) -> None:
+    hooks: dict[str, Hook] = {}
+    hooks["a"] = emu.bus.hook("write16", tagged([], hooks, "a"))
+    hooks["a"].remove()
+    hooks["a"].remove()
+    assert "write16" not in emu.bus.__dict__
+
+
+def test_keeps_an_attribute_installed_by_hand(emu: Emulator) -> None:
+    # the bus's mmio callbacks are instance attributes from the start
+    original = emu.bus.mmio_read
+    hook = emu.bus.hook("mmio_read", lambda addr: hook.inner(addr))
+    hook.remove()
+    assert emu.bus.mmio_read is original
+
+
+def test_tools_stop_in_any_order(emu: Emulator) -> None:
+    tools = [
+        OpcodeStats(emu),
+        Profiler(emu),
+        MemoryHeatmap(emu.bus),
+        SyscallProfiler(emu, SymbolTable({"KERNEL__SYSCALL": 0x3000})),
+        History(emu),
+    ]
+    for tool in (tools[0], tools[2], tools[4], tools[1], tools[3]):
+        tool.stop()
+
+    assert emu.handlers == handler_map
+    for name in ("interrupt", "_execute", "_check_overrides", "reset"):
+        assert name not in emu.__dict__
+    for name in ("read16", "write16"):
+        assert name not in emu.bus.__dict__
+    assert emu.bus.mmio_read == emu.mmio_read
+
+
+def test_stats_stop_under_a_later_hook(machine) -> None:
+    # stopping opcode stats used to leave its timer in the chain, below the profiler's hooks
+    emu = machine("""
+        call function
+        halt
+    function:
+        ret
+    """)
+    stats = OpcodeStats(emu)
+    emu.profiler = profiler = Profiler(emu)
+    stats.stop()
+
+    emu.run(10)
+    assert not any(stats.counts)
+    assert profiler.stacks[(0x03,)] == 1  # the ret, sampled inside function
+
+    profiler.stop()
+    assert emu.handlers == handler_map
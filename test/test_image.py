@@ -0,0 +1,97 @@
+# test_image.py
+# emulators sharing one memory image only get their own copy of the pages they write.
+# josiah bergen, october 2026
+
+import ctypes
+import mmap
+import os
+
+import pytest
+
+from emulator.emulator import Emulator
+from emulator.events import StopReason
+from emulator.image import MemoryImage
+from emulator.util.logger import logger
+from jasm.jasm import assemble_string
+
+# a program that runs on past rom, so a reset has a page of it to wipe
+PROGRAM = "    mov a, 1\n" * 0x100 + "    halt\n"
+
+
+def private_bytes(view: memoryview) -> int | None:
+    # how much of the mapping behind view this process has its own copy of (linux only).
+    # copies made on write are anonymous, file pages that are merely dirty in the page cache aren't
+    if not os.path.exists("/proc/self/smaps"):
+        return None
+    probe = ctypes.c_char.from_buffer(view)
+    address = ctypes.addressof(probe)
+    del probe  # an export would keep the mapping from closing
+
+    with open("/proc/self/smaps") as f:
+        inside = False
+        for line in f:
+            fields = line.split()
+            if "-" in fields[0] and not fields[0].endswith(":"):
+                start, end = (int(part, 16) for part in fields[0].split("-"))
+                inside = start <= address < end
+            elif inside and fields[0] == "Anonymous:":
+                return int(fields[1]) * 1024
+    return None
+
+
+def image_word(image: MemoryImage, address: int) -> int:
+    with open(image.path, "rb") as f:
+        f.seek(address * 2)
+        return int.from_bytes(f.read(2), "little")
+
+
+@pytest.fixture
+def image(tmp_path) -> MemoryImage:
+    return MemoryImage.build(assemble_string(PROGRAM, {"linkable": False}), 0, str(tmp_path))
+
+
+def test_emulators_diverge_only_where_they_write(image: MemoryImage) -> None:
+    first = Emulator(verbosity=logger.log_level.ERROR, memory_image=image)
+    second = Emulator(verbosity=logger.log_level.ERROR, memory_image=image)
+    original = first.snapshot().memory
+
+    first.bus.write16(0x2000, 0xBEEF)
+    assert first.bus.peek16(0x2000) == 0xBEEF
+    assert second.bus.peek16(0x2000) == 0  # still the image's page
+    assert second.snapshot().memory == original
+    changed = [offset for offset in range(0, len(original), 2) if first.bus.memory[offset:offset + 2] != original[offset:offset + 2]]
+    assert changed == [0x2000 * 2]
+
+    if (private := private_bytes(first.bus.memory)) is not None:
+        assert private == mmap.PAGESIZE  # the one page it wrote
+        assert private_bytes(second.bus.memory) == 0
+
+    with open(image.path, "rb") as f:
+        assert f.read(len(original)) == original  # the image itself never changes
+
+    first.close()
+    second.close()
+
+
+def test_reset_keeps_pages_shared(image: MemoryImage) -> None:
+    emu = Emulator(verbosity=logger.log_level.ERROR, memory_image=image)
+    assert emu.run(1000).reason is StopReason.HALTED
+    emu.reset()
+
+    # rom survives a reset, the program past it doesn't
+    assert emu.bus.peek16(0) == image_word(image, 0)
+    assert emu.bus.peek16(0x100) == 0
+
+    if (private := private_bytes(emu.bus.memory)) is not None:
+        # only pages that weren't zero already, i.e. the program past rom, not all 1.1 MiB
+        assert private <= 2 * mmap.PAGESIZE
+    emu.close()
+
+
+def test_close_unmaps_the_image(image: MemoryImage) -> None:
+    emu = Emulator(verbosity=logger.log_level.ERROR, memory_image=image)
+    memory = emu.bus.memory
+    emu.close()
+    with pytest.raises(ValueError):
+        memory[0]  # released
+    emu.close()  # twice is fine, shutdown() closes before __main__ does
@@ -0,0 +1,135 @@
+# test_interrupts.py
+# INT/IRET, the interrupt flag, and device IRQs through the interrupt controller.
+# josiah bergen, october 2026
+
+import pytest
+
+from emulator.conditions import Breakpoint
+from emulator.constants import FLAG_I, FLAG_Z
+from emulator.events import StopReason
+from emulator.exceptions import EmulatorException
+from emulator.interrupts import InterruptController
+
+SOFTWARE = """
+    mov a, handler
+    mov b, 0xff10
+    put [b], a          ; vector 0x10
+    mov a, 1
+    cmp a, 1            ; sets z, which iret has to bring back
+    int 0x10
+    add a, 1
+    halt
+handler:
+    mov a, 0x20
+    cmp a, 0            ; clears z
+    iret
+"""
+
+# a one-shot pit fires on its first tick, so the irq is pending from the start
+TIMER = """
+    mov a, handler
+    mov b, 0xff05
+    put [b], a          ; the pit's vector
+    mov a, 3
+    mov b, 0xfe11
+    put [b], a          ; enabled, one-shot
+    mov c, 0
+masked:
+    inc c
+    cmp c, 20
+    jnz masked
+    sti
+waiting:
+    cmp d, 0
+    jz waiting
+    halt
+handler:
+    inc d
+    iret
+"""
+
+
+def test_int_and_iret_round_trip(machine) -> None:
+    emu = machine(SOFTWARE)
+    emu.run(6)  # up to and including int
+    assert emu.pc.value == emu.bus.peek16(0xFF10)
+    assert emu.sp.value == 0xFDFF - 2  # flags and return address
+
+    emu.run(3)  # the handler, through iret
+    assert emu.pc.value == 0x0B  # the add after int
+    assert emu.sp.value == 0xFDFF
+    assert emu.flag_get(FLAG_Z)  # as it was before the interrupt
+
+    assert emu.run(100).reason is StopReason.HALTED
+    assert emu.reg_get(0) == 0x21
+
+
+def test_interrupt_masks_until_iret(machine) -> None:
+    emu = machine(SOFTWARE)
+    emu.flag_set(FLAG_I, True)
+    emu.run(6)
+    assert not emu.flag_get(FLAG_I)  # masked inside the handler
+
+    emu.run(3)
+    assert emu.flag_get(FLAG_I)  # and back on after iret
+
+
+def test_irq_waits_for_sti(machine) -> None:
+    emu = machine(TIMER, enabled_devices={"pit": True})
+    emu.run(until=lambda e: e.reg_get(2) == 20)
+
+    assert emu.interrupts.pending == 1 << 0x05
+    assert emu.reg_get(3) == 0  # d, nothing was delivered while i was clear
+
+    result = emu.run(200)
+    assert result.reason is StopReason.HALTED
+    assert emu.reg_get(3) == 1  # exactly one delivery, the pit was one-shot
+    assert emu.interrupts.pending == 0
+    assert emu.flag_get(FLAG_I)  # restored by iret
+
+
+def test_until_stops_on_the_handler(machine) -> None:
+    emu = machine(TIMER, enabled_devices={"pit": True})
+    emu.run(until=lambda e: e.reg_get(2) == 20)
+    handler = emu.bus.peek16(0xFF05)
+
+    result = emu.run(500, until=handler)
+    assert result.reason is StopReason.UNTIL
+    assert emu.pc.value == handler
+    assert emu.reg_get(3) == 0  # stopped before the handler's first instruction
+
+
+def test_breakpoints_around_an_irq(machine) -> None:
+    emu = machine(TIMER, enabled_devices={"pit": True})
+    emu.run(until=lambda e: e.reg_get(2) == 20)
+    handler = emu.bus.peek16(0xFF05)
+    waiting = handler - 5  # cmp d, 0 and jz waiting are two words each, halt is one
+    emu.breakpoints[handler] = Breakpoint(handler)
+    emu.breakpoints[waiting] = Breakpoint(waiting)
+
+    # the irq is taken right after sti, before waiting's first instruction runs
+    assert emu.run(500).reason is StopReason.BREAKPOINT
+    assert emu.pc.value == handler
+
+    del emu.breakpoints[handler]
+    assert emu.run(500).reason is StopReason.BREAKPOINT
+    assert emu.pc.value == waiting and emu.reg_get(3) == 1
+
+    # step off it as the repl does, and run to the end
+    breakpoint = emu.breakpoints.pop(waiting)
+    emu.step()
+    emu.breakpoints[waiting] = breakpoint
+    assert emu.run(500).reason is StopReason.HALTED
+    assert breakpoint.hits == 1  # waiting ran once, it isn't hit again on the way back from iret
+
+
+def test_controller_acknowledges_lowest_vector_first() -> None:
+    controller = InterruptController()
+    for vector in (0x20, 0x05, 0x11):
+        controller.request(vector)
+
+    assert [controller.acknowledge() for _ in range(3)] == [0x05, 0x11, 0x20]
+    assert controller.pending == 0
+
+    with pytest.raises(EmulatorException):
+        controller.request(0x100)
@@ -0,0 +1,43 @@
+# test_profiler.py
+# per-function instruction counts are exact, whatever the sampling interval.
+# josiah bergen, october 2026
+
+import pytest
+
+from emulator.profiler import Profiler
+
+PROGRAM = """
+    call outer
+    halt
+outer:
+    call inner
+    call inner
+    ret
+inner:
+    mov a, 1
+    ret
+"""
+OUTER, INNER = 0x03, 0x08
+
+
+@pytest.mark.parametrize("interval", [1, 7, 1000])
+def test_by_function_counts_every_instruction(machine, interval: int) -> None:
+    emu = machine(PROGRAM)
+    emu.profiler = profiler = Profiler(emu, interval)
+    emu.run(100)
+
+    assert profiler.by_function() == [
+        (OUTER, 7, 3),  # its two calls and ret, plus both runs of inner
+        (INNER, 4, 4),
+        (None, 2, 2),  # the first call and the halt
+    ]
+
+
+def test_report_names_functions_by_address(machine) -> None:
+    emu = machine(PROGRAM)
+    emu.profiler = profiler = Profiler(emu, 5)
+    emu.run(100)
+
+    lines = profiler.report(None)
+    assert lines[1] == "top functions (inclusive, exclusive, of 9 instructions):"
+    assert lines[2].endswith("0x0003") and lines[4].endswith("(outside any call)")
@@ -0,0 +1,34 @@
+# test_remote.py
+# a guest running in the cpu process, driven from this one, headless.
+# josiah bergen, october 2026
+
+from emulator.__main__ import EmulatorArgumentParser
+from emulator.events import RunResult, StopReason
+from emulator.remote import RemoteCPU, RemoteREPL
+from emulator.repl import CommandRequest
+from emulator.util.logger import logger
+
+PROGRAM = """
+    mov a, 0x1234
+    mov b, 0x2000
+    put [b], a
+    halt
+"""
+
+
+def test_run_in_the_cpu_process(binary) -> None:
+    args = EmulatorArgumentParser(underscores_to_dashes=True).parse_args([binary(PROGRAM), "--unlimited", "--verbosity", str(logger.log_level.ERROR)])
+
+    cpu = RemoteCPU(args.as_dict(), window=False)
+    try:
+        repl = RemoteREPL(cpu, None)
+        repl.execute(CommandRequest("run"))
+        result = repl.lines.get(timeout=30)  # the run's result, handed over as the repl's next line
+
+        assert isinstance(result, RunResult) and result.reason is StopReason.HALTED
+        assert result.instructions == 3
+        memory = cpu.storage.view(0x2000 * 2, 0x2001 * 2)
+        assert int.from_bytes(memory, "little") == 0x1234  # written by the other process
+        assert not cpu.busy and repl.result_due
+    finally:
+        cpu.close()
@@ -0,0 +1,49 @@
+# test_replay.py
+# a recorded run replays to exactly the same state.
+# josiah bergen, october 2026
+
+from emulator.devices.keyboard import Keyboard
+from emulator.events import StopReason
+
+# logs every key with the loop count it arrived at and the rtc's seconds
+PROGRAM = """
+    mov d, 0x2000
+    mov c, 0
+poll:
+    inc c
+    mov b, 0xfe30
+    get e, [b]
+    mov b, 0xfe02
+    get a, [b]
+    cmp a, 0
+    jz poll
+    mov b, 0xfe01
+    get a, [b]
+    put [d], a
+    inc d
+    put [d], c
+    inc d
+    put [d], e
+    inc d
+    cmp c, 0
+    jnz poll            ; c is never 0 here, jasm won't take a jmp to a label without linking
+"""
+
+
+def test_replay_matches_recording(machine, tmp_path) -> None:
+    path = str(tmp_path / "keys.jrpl")
+
+    recorded = machine(PROGRAM, record=path, enabled_devices={"rtc": True})
+    recorded.devices.append(Keyboard(recorded.key_queue))  # headless recordings have no window to type into
+    for keys, count in ((b"", 500), (b"ab", 731), (b"", 64), (b"c", 409)):
+        recorded.inputs.keys.extend(keys)
+        recorded.run(count)
+    recorded.close()
+    expected = recorded.snapshot()
+    assert recorded.bus.peek16(0x2006) == ord("c")
+
+    replayed = machine(PROGRAM, replay=path, enabled_devices={"rtc": True})
+    result = replayed.run(10_000)
+
+    assert result.reason is StopReason.REPLAY_END
+    assert replayed.snapshot() == expected
@@ -0,0 +1,27 @@
+# test_startup.py
+# import-time budget for the emulator, see emulator/startup.py.
+# josiah bergen, october 2026
+
+import os
+
+import pytest
+
+from emulator.startup import BUDGETS, measure
+
+# wall-clock budgets flake on shared runners, so they only run when asked for.
+# `make startup` checks them on their own.
+TIMED = os.environ.get("JAIDE_STARTUP_BUDGET") == "1"
+
+
+@pytest.mark.parametrize(("module", "budget", "forbidden"), BUDGETS, ids=[module for module, _, _ in BUDGETS])
+def test_import_stays_lazy(module: str, budget: float, forbidden: tuple[str, ...]) -> None:
+    _, loaded = measure(module, runs=0)
+    pulled_in = [name for name in forbidden if name in loaded]
+    assert not pulled_in, f"{module} imported {', '.join(pulled_in)}, which should only load on demand."
+
+
+@pytest.mark.skipif(not TIMED, reason="set JAIDE_STARTUP_BUDGET=1 to check import times")
+@pytest.mark.parametrize(("module", "budget", "forbidden"), BUDGETS, ids=[module for module, _, _ in BUDGETS])
+def test_import_budget(module: str, budget: float, forbidden: tuple[str, ...]) -> None:
+    elapsed, _ = measure(module, runs=5)
+    assert elapsed <= budget, f"{module} took {elapsed:.1f} ms to import, over its {budget:.0f} ms budget."
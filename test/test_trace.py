@@ -0,0 +1,70 @@
+# test_trace.py
+# traces read back the way they were written, compressed or not, with writes tagged by bank.
+# josiah bergen, october 2026
+
+import pytest
+
+from emulator import trace
+from emulator.trace import TraceWriter, diff, dump, search, summarize
+
+pytest.importorskip("numpy")
+
+# the same address written in main memory and in bank 2, and a plain write while bank 2 is selected
+PROGRAM = """
+    mov a, 0x1234
+    mov b, 0x7000
+    put [b], a
+    mov mb, 2
+    put [b], a
+    mov b, 0x2000
+    put [b], a
+    halt
+"""
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    # a few records per chunk, so reading and diffing cross chunk boundaries
+    monkeypatch.setattr(trace, "CHUNK_RECORDS", 3)
+
+
+def record(machine, path: str, compress: bool, source: str = PROGRAM) -> str:
+    emu = machine(source)
+    writer = TraceWriter(emu, path, compress)
+    emu.run(100)
+    writer.close()
+    return path
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_round_trip(machine, tmp_path, compress: bool) -> None:
+    path = record(machine, str(tmp_path / "run.jtrc"), compress)
+
+    summary = summarize(path)
+    assert summary[0].endswith("8 instructions, 4 register changes, 3 memory writes")
+    assert summary[-3:] == ["bank window writes:", f"{1:>14,}  main memory", f"{1:>14,}  bank 2"]
+
+    assert search(path, pc=0x0007) == ["#4            0x0007: PUT A B"]
+    assert search(path, write=0x7000) == ["#2              [0x7000] = 0x1234", "#4              [0x7000 bank 2] = 0x1234"]
+    assert search(path, write=0x7000, bank=2) == ["#4              [0x7000 bank 2] = 0x1234"]
+    assert search(path, write=0x7000, bank=0) == ["#2              [0x7000] = 0x1234"]
+
+    # bank 2 was selected, but 0x2000 is outside the window
+    assert search(path, write=0x2000, bank=0) == ["#6              [0x2000] = 0x1234"]
+    assert search(path, write=0x2000, bank=2) == []
+
+    lines = dump(path, 4, 1)
+    assert lines[0].startswith("#4") and lines[-1] == "                [0x7000 bank 2] = 0x1234"
+
+
+def test_diff(machine, tmp_path) -> None:
+    plain = record(machine, str(tmp_path / "plain.jtrc"), False)
+    packed = record(machine, str(tmp_path / "packed.jtrc"), True)
+    assert diff(plain, packed) == ["traces are identical (15 records)."]
+
+    changed = record(machine, str(tmp_path / "changed.jtrc"), True, PROGRAM.replace("mov mb, 2", "mov mb, 3"))
+    assert diff(plain, changed) == [
+        "traces diverge at record 6 (instruction #3):",
+        f"  {plain}: 0x0005: MOV MB 0002",
+        f"  {changed}: 0x0005: MOV MB 0003",
+    ]